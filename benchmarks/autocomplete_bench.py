@@ -0,0 +1,138 @@
+"""
+Benchmark and self-check for prefix_index.py (slash command autocomplete).
+
+Builds a PrefixIndex over N generated player names, then replays typing: every
+prefix of sampled names, one keystroke at a time, as Discord sends them. Times
+complete() per keystroke against the query autocomplete would otherwise run
+(an indexed NAME_KEY range scan plus a LIKE for later words, in SQLite).
+Checks that:
+  - every answer is right: only names matching the prefix, whole-name
+    matches first, and as many as there are (up to the 25-choice cap)
+  - add/remove leave the index identical to a rebuild
+
+Needs nothing beyond the repo.
+Usage: python benchmarks/autocomplete_bench.py [--players 1000 10000 100000] [--names 300]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from name_index_bench import make_names  # noqa: E402
+
+# Keystrokes replayed through the (slow) SQLite query and checked against a full scan
+CHECKED = 500
+
+
+def keystrokes(names: list[str]) -> list[str]:
+    """What Discord sends while each name is typed: "", "g", "go", "gor", ..."""
+    out = []
+    for name in names:
+        out.extend(name[:i] for i in range(len(name) + 1))
+    return out
+
+
+def sqlite_index(names: list[str]):
+    from player_identity import name_key
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE players (PLAYER TEXT, NAME_KEY TEXT)")
+    conn.executemany("INSERT INTO players VALUES (?, ?)", ((n, name_key(n)) for n in names))
+    conn.execute("CREATE INDEX idx_players_name_key ON players (NAME_KEY)")
+    return conn
+
+
+def sqlite_complete(conn, text: str, limit: int) -> list[str]:
+    from player_identity import name_key
+    prefix = name_key(text)
+    rows = conn.execute(
+        "SELECT PLAYER FROM players WHERE NAME_KEY >= ? AND NAME_KEY < ? ORDER BY NAME_KEY LIMIT ?",
+        (prefix, prefix + "￿", limit)
+    ).fetchall()
+    if len(rows) < limit:
+        rows += conn.execute(
+            "SELECT PLAYER FROM players WHERE NAME_KEY LIKE ? ORDER BY NAME_KEY LIMIT ?",
+            (f"% {prefix}%", limit - len(rows))
+        ).fetchall()
+    return [r[0] for r in rows]
+
+
+def timed(fn, queries) -> list[float]:
+    out = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        out.append((time.perf_counter() - start) * 1e6)
+    return sorted(out)
+
+
+def report(label: str, micros: list[float]):
+    p99 = micros[min(len(micros) - 1, int(len(micros) * 0.99))]
+    print(f"  {label:<30} p50 {statistics.median(micros):>9.1f} µs   p99 {p99:>9.1f} µs")
+
+
+def wrong(index, keyed: list[tuple[str, str, list[str]]], text: str) -> bool:
+    """Does complete(text) disagree with a scan of every (name, key, later-word keys)?"""
+    from player_identity import name_key
+    from prefix_index import CHOICES
+    prefix = name_key(text)
+    whole = {n for n, key, _ in keyed if key.startswith(prefix)}
+    later = {n for n, _, words in keyed if any(k.startswith(prefix) for k in words)} - whole
+    got = [value for _, value in index.complete(text)]
+    if len(got) != len(set(got)) or len(got) != min(CHOICES, len(whole) + len(later)):
+        return True
+    head = got[:min(len(got), len(whole))]
+    return not set(head) <= whole or not set(got[len(head):]) <= later
+
+
+def run(n: int, sample: int, rng: random.Random) -> int:
+    from player_identity import name_key
+    from prefix_index import CHOICES, PrefixIndex, word_keys
+
+    names = make_names(n, rng)
+    start = time.perf_counter()
+    index = PrefixIndex((name, name) for name in names)
+    build = time.perf_counter() - start
+    conn = sqlite_index(names)
+    print(f"\n{n} players (index built in {build * 1000:.0f} ms)")
+
+    typed = keystrokes(rng.sample(names, min(sample, n)))
+    report("complete(), per keystroke", timed(index.complete, typed))
+    report("SQLite range + LIKE", timed(lambda t: sqlite_complete(conn, t, CHOICES), typed[:CHECKED]))
+    conn.close()
+
+    keyed = [(name, name_key(name), word_keys(name_key(name))) for name in names]
+    bad = sum(wrong(index, keyed, t) for t in typed[:CHECKED])
+    print(f"  answers vs full scan: {'OK' if not bad else f'{bad} wrong'}")
+
+    removed = rng.sample(names, len(names) // 10)
+    added = [f"{name} the Younger" for name in removed[: len(removed) // 2]]
+    for name in removed:
+        index.remove(name)
+    for name in added:
+        index.add(name, name)
+    fresh = PrefixIndex((name, name) for name in set(names) - set(removed) | set(added))
+    same = index._labels == fresh._labels and index._whole == fresh._whole and index._words == fresh._words
+    print(f"  add/remove vs rebuild: {'OK' if same else 'MISMATCH'}")
+    return bad + (not same)
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    failures = 0
+    for n in args.players:
+        failures += run(n, args.names, rng)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--players", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--names", type=int, default=300, help="names to type out, one keystroke at a time")
+    parser.add_argument("--seed", type=int, default=1)
+    sys.exit(main(parser.parse_args()))
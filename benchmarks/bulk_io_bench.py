@@ -0,0 +1,253 @@
+"""
+Benchmark of bulk_io: streaming import/export of players and quests.
+
+For each format, generates N players and N quests in memory, imports them into
+a fresh database through Database.write (one transaction each, quest inserts
+also maintain the FTS index), exports them back, and checks the round trip
+reproduces the same rows. Also reports peak Python memory (tracemalloc) for
+import and export, times the one-row-per-transaction path !addPlayer takes
+for comparison, and checks that a file with one bad row imports nothing.
+
+Needs nothing beyond the repo (no Discord objects involved).
+Usage: python benchmarks/bulk_io_bench.py [--rows 100000] [--baseline-rows 2000]
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+WORDS = "goblin dragon caravan crypt shrine harbor smuggler ritual tower swamp relic escort".split()
+GUILD = 10**17  # every file is imported into / exported from this guild
+
+
+# ----------------
+# Input files
+# ----------------
+# Repo modules are imported lazily: config.py opens discord.log in the working
+# directory, and main() moves that into the temp dir first.
+
+def player_rows(n: int):
+    for i in range(n):
+        yield {"player": f"Player{i:06d}", "level": 2 + i % 18, "gp": i % 500, "sp": i % 10,
+               "cp": i % 7, "quest_points": i % 30}
+
+
+def quest_rows(n: int):
+    for i in range(n):
+        yield {"name": f"Quest {i} {WORDS[i % len(WORDS)]}", "type": "USM"[i % 3],
+               "description": " ".join(WORDS[(i + k) % len(WORDS)] for k in range(40))}
+
+
+def as_csv(rows) -> bytes:
+    out = io.StringIO()
+    writer = None
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(out, fieldnames=list(row))
+            writer.writeheader()
+        writer.writerow(row)
+    return out.getvalue().encode()
+
+
+def as_json(rows) -> bytes:
+    return json.dumps(list(rows)).encode()
+
+
+def make_schema(path: str):
+    import migrations
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("BEGIN")
+    migrations.migrate(conn)
+    conn.execute("COMMIT")
+    conn.close()
+
+
+def table_rows(path: str, spec) -> list[tuple]:
+    conn = sqlite3.connect(path)
+    cols = ", ".join(f.column for f in spec.fields)
+    rows = conn.execute(f"SELECT {cols} FROM {spec.table} ORDER BY {cols}").fetchall()
+    conn.close()
+    return rows
+
+
+def fts_consistent(path: str) -> bool:
+    """quest_search indexes exactly the quests (bulk imports index them outside the trigger)."""
+    import quest_search
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute(f"INSERT INTO {quest_search.QUEST_SEARCH_TABLE} ({quest_search.QUEST_SEARCH_TABLE}, rank) "
+                     f"VALUES ('integrity-check', 1)")
+        return len(quest_search.search(conn, GUILD, "goblin", limit=1)) == 1
+    except sqlite3.DatabaseError:
+        return False
+    finally:
+        conn.close()
+
+
+# ----------------
+# Runs
+# ----------------
+
+async def run_format(fmt: str, n: int, tmp: str, files: dict) -> bool:
+    import bulk_io
+    from database import Database
+
+    ok = True
+    for spec in (bulk_io.PLAYERS, bulk_io.QUESTS):
+        data = files[(spec.name, fmt)]
+        path = os.path.join(tmp, f"{spec.name}-{fmt}.db")
+        make_schema(path)
+        db = Database(path)
+
+        start = time.perf_counter()
+        result = await db.write(bulk_io.import_rows, spec, GUILD, io.BytesIO(data), fmt)
+        import_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fp, count, size = await db.read(bulk_io.export_rows, spec, GUILD, fmt)
+        export_s = time.perf_counter() - start
+        exported = fp.read()
+        fp.close()
+        db.close()
+
+        # Round trip: the export imports into an identical table
+        again = os.path.join(tmp, f"{spec.name}-{fmt}-again.db")
+        make_schema(again)
+        db = Database(again)
+        await db.write(bulk_io.import_rows, spec, GUILD, io.BytesIO(exported), fmt)
+        db.close()
+        same = result.inserted == n == count and table_rows(path, spec) == table_rows(again, spec)
+        if spec is bulk_io.QUESTS:
+            same &= fts_consistent(path)
+        ok &= same
+
+        print(f"{spec.name:<8} {fmt:<5} {len(data) / 1e6:>7.1f} MB  import {import_s:>6.2f}s "
+              f"({n / import_s:>9,.0f} rows/s)  export {export_s:>6.2f}s ({size / 1e6:.1f} MB)  "
+              f"round trip {'OK' if same else 'MISMATCH'}")
+    return ok
+
+
+async def run_memory(n: int, tmp: str, files: dict):
+    """Peak traced Python memory of importing / exporting the players CSV, vs the file size."""
+    import bulk_io
+    from database import Database
+
+    data = files[("players", "csv")]
+    path = os.path.join(tmp, "memory.db")
+    make_schema(path)
+    db = Database(path)
+    stream = io.BytesIO(data)
+
+    tracemalloc.start()
+    await db.write(bulk_io.import_rows, bulk_io.PLAYERS, GUILD, stream, "csv")
+    _, import_peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    fp, _, size = await db.read(bulk_io.export_rows, bulk_io.PLAYERS, GUILD, "csv")
+    _, export_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    fp.close()
+    db.close()
+    # The name set used to skip existing/duplicate players is the one O(N) structure
+    print(f"\npeak Python memory, {n} players: import {import_peak / 1e6:.1f} MB, "
+          f"export {export_peak / 1e6:.1f} MB (file {size / 1e6:.1f} MB)")
+
+
+async def run_baseline(n: int, tmp: str):
+    """!addPlayer's path: existence check + INSERT, one transaction per player."""
+    from config import PLAYER_INFO_TABLE
+    from database import Database
+
+    path = os.path.join(tmp, "baseline.db")
+    make_schema(path)
+    db = Database(path)
+
+    def add(conn, name):
+        exists = conn.execute(f"SELECT 1 FROM {PLAYER_INFO_TABLE} WHERE GUILD_ID = ? AND PLAYER = ?", (GUILD, name))
+        if exists.fetchone():
+            return False
+        conn.execute(
+            f"INSERT INTO {PLAYER_INFO_TABLE} (GUILD_ID, PLAYER, LEVEL, GOLD, SILVER, COPPER, QUEST_POINTS) "
+            f"VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (GUILD, name, 2, 10, 0, 0, 0)
+        )
+        return True
+
+    start = time.perf_counter()
+    for i in range(n):
+        await db.write(add, f"Player{i:06d}")
+    elapsed = time.perf_counter() - start
+    db.close()
+    print(f"\none !addPlayer transaction per row: {n} players in {elapsed:.2f}s ({n / elapsed:,.0f} rows/s)")
+
+
+async def run_rejects(tmp: str) -> bool:
+    """One bad row in the middle: nothing is inserted, and the error says where."""
+    import bulk_io
+    import quest_search
+    from database import Database
+
+    rows = list(player_rows(1000))
+    rows[500]["level"] = "twelve"
+    rows[700]["player"] = rows[10]["player"]
+    path = os.path.join(tmp, "rejects.db")
+    make_schema(path)
+    db = Database(path)
+    try:
+        await db.write(bulk_io.import_rows, bulk_io.PLAYERS, GUILD, io.BytesIO(as_csv(rows)), "csv")
+        errors = []
+    except bulk_io.BulkImportError as e:
+        errors = e.errors
+
+    # A rejected quest import must also put back the FTS insert trigger it dropped
+    quests = list(quest_rows(1000))
+    quests[900]["name"] = " "
+    try:
+        await db.write(bulk_io.import_rows, bulk_io.QUESTS, GUILD, io.BytesIO(as_csv(quests)), "csv")
+    except bulk_io.BulkImportError as e:
+        errors += e.errors
+    db.close()
+    conn = sqlite3.connect(path)
+    trigger = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = ?",
+                           (f"{quest_search.QUEST_SEARCH_TABLE}_ai",)).fetchone()
+    conn.close()
+    left = len(table_rows(path, bulk_io.PLAYERS)) + len(table_rows(path, bulk_io.QUESTS))
+    ok = len(errors) == 3 and left == 0 and trigger is not None
+    print(f"\nbad rows: {'OK' if ok else 'FAILED'} ({left} rows left, errors: {errors})")
+    return ok
+
+
+async def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        # config.py opens discord.log in the working directory; keep it out of the repo
+        os.chdir(tmp)
+        files = {
+            ("players", "csv"): as_csv(player_rows(args.rows)),
+            ("players", "json"): as_json(player_rows(args.rows)),
+            ("quests", "csv"): as_csv(quest_rows(args.rows)),
+            ("quests", "json"): as_json(quest_rows(args.rows)),
+        }
+        print(f"{args.rows} rows per table\n")
+        ok = True
+        for fmt in ("csv", "json"):
+            ok &= await run_format(fmt, args.rows, tmp, files)
+        await run_memory(args.rows, tmp, files)
+        await run_baseline(args.baseline_rows, tmp)
+        ok &= await run_rejects(tmp)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--baseline-rows", type=int, default=2000)
+    sys.exit(asyncio.run(main(parser.parse_args())))
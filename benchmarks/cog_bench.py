@@ -0,0 +1,356 @@
+"""
+Offline benchmark of the cog commands, no Discord connection needed.
+
+For each N, seeds a temporary SQLite database with N players and N quests,
+loads PlayerInfo, Quests and AdminCommands against it (real cog code, real
+discord.py objects such as Embed and View) and drives their commands through
+fake ctx/channel/member objects. Checks and converters are bypassed: each
+command's callback is awaited directly, so the numbers are the command body
+plus SQLite, with Discord API calls costing ~0.
+
+Reports p50/p99 latency and throughput per command, and writes everything to a
+JSON file. Pass --compare to diff against an earlier run.
+
+Usage: python benchmarks/cog_bench.py [--sizes 10 1000 100000] [--iterations 200]
+                                      [--out results.json] [--compare old.json]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_SIZES = [10, 1000, 10000, 100000]
+DEFAULT_OUT = os.path.join(ROOT, "benchmarks", "results", "cog_bench.json")
+# Respondents on the poll closed by the "closePoll" case (capped so N=100k stays quick)
+MAX_POLL_RESPONDENTS = 2000
+
+_ids = itertools.count(10**17)
+
+
+# ----------------
+# Fake Discord objects
+# ----------------
+
+class FakeRole:
+    def __init__(self, id: int):
+        self.id = id
+
+
+class FakeMessage:
+    def __init__(self, channel=None):
+        self.id = next(_ids)
+        self.channel = channel
+
+    async def add_reaction(self, emoji):
+        pass
+
+    async def delete(self):
+        pass
+
+    async def edit(self, **kwargs):
+        pass
+
+
+class FakeMember:
+    def __init__(self, name: str, roles=(), id: int = None):
+        self.id = id if id is not None else next(_ids)
+        self.name = self.display_name = name
+        self.roles = list(roles)
+        self.bot = False
+        self.mention = f"<@{self.id}>"
+
+    async def send(self, content=None, **kwargs):
+        return FakeMessage()
+
+
+class FakeGuild:
+    def __init__(self, roles=()):
+        self.id = next(_ids)
+        self.name = f"Guild {self.id}"
+        self.members: dict[int, FakeMember] = {}
+        self.roles = {r.id: r for r in roles}
+
+    def get_role(self, role_id):
+        return self.roles.get(role_id)
+
+    def get_member(self, uid):
+        return self.members.get(uid)
+
+    async def query_members(self, user_ids=(), limit=None, cache=True):
+        return [self.members[u] for u in user_ids if u in self.members]
+
+
+class FakeChannel:
+    def __init__(self, id: int, guild: FakeGuild):
+        self.id = id
+        self.guild = guild
+
+    async def send(self, content=None, **kwargs):
+        return FakeMessage(self)
+
+    def get_partial_message(self, message_id):
+        return FakeMessage(self)
+
+
+class FakeCommand:
+    def __init__(self, name: str):
+        self.name = self.qualified_name = name
+
+    def __str__(self):
+        return self.name
+
+
+class FakeContext:
+    def __init__(self, bot, author: FakeMember, channel: FakeChannel, command: str):
+        self.bot = bot
+        self.author = author
+        self.channel = channel
+        self.guild = channel.guild
+        self.command = FakeCommand(command)
+
+    async def reply(self, content=None, **kwargs):
+        return FakeMessage(self.channel)
+
+    async def send(self, content=None, **kwargs):
+        return FakeMessage(self.channel)
+
+
+class FakeBot:
+    """Just the attributes the cogs touch."""
+
+    def __init__(self, db, guild: FakeGuild):
+        from guild_config import GuildConfigs
+        from metrics import Metrics
+        from outbox import Outbox
+        from scheduler import Scheduler
+        from watchdog import LoopWatchdog
+        self.db = db
+        self.guild_configs = GuildConfigs(db)
+        self.scheduler = Scheduler(db)
+        self.metrics = Metrics()
+        self.watchdog = LoopWatchdog()
+        # No pacing: the fake channels answer instantly and aren't rate limited
+        self.outbox = Outbox(route_rate=1e9, route_burst=10**9, global_rate=1e9, global_burst=10**9)
+        self.user = FakeMember("Rattlepost")
+        self.guild = guild
+        self.channels: dict[int, FakeChannel] = {}
+
+    def get_channel(self, channel_id):
+        return self.channels.setdefault(channel_id, FakeChannel(channel_id, self.guild))
+
+    async def fetch_channel(self, channel_id):
+        return self.get_channel(channel_id)
+
+    async def fetch_user(self, user_id):
+        return self.guild.members.get(user_id) or FakeMember(str(user_id), id=user_id)
+
+    async def wait_until_ready(self):
+        pass
+
+
+# ----------------
+# Seeding + cases
+# ----------------
+# Repo modules are imported lazily: config.py opens discord.log in the working
+# directory, and main() moves that into the temp dir first.
+
+def seed(path: str, n: int):
+    from config import PLAYER_INFO_TABLE, QUEST_BOARD_TABLE
+    conn = sqlite3.connect(path)
+    conn.execute(f"CREATE TABLE {PLAYER_INFO_TABLE} (PLAYER TEXT, LEVEL INTEGER, GOLD INTEGER, QUEST_POINTS INTEGER)")
+    conn.execute(f"CREATE TABLE {QUEST_BOARD_TABLE} (NAME TEXT, TYPE TEXT, DESCRIPTION TEXT)")
+    conn.executemany(
+        f"INSERT INTO {PLAYER_INFO_TABLE} VALUES (?, ?, 1000, 10)",
+        ((f"Player{i:06d}", 2 + i % 18) for i in range(n))
+    )
+    words = "goblin dragon caravan crypt shrine harbor smuggler ritual tower swamp relic escort".split()
+    conn.executemany(
+        f"INSERT INTO {QUEST_BOARD_TABLE} VALUES (?, 'U', ?)",
+        ((f"Quest {i} {words[i % len(words)]}", " ".join(words[(i + k) % len(words)] for k in range(40)))
+         for i in range(n))
+    )
+    conn.commit()
+    conn.close()
+
+
+def cases(n: int, player_info, quests, admin, gm_ctx, player_ctx, poll_state):
+    """(name, coroutine factory) for every benchmarked command. Each factory gets the iteration number."""
+    from cogs.admin_commands import ACTION_BY_KEY
+    emoji_keys = list(ACTION_BY_KEY)
+
+    def player(i):
+        return f"Player{i % n:06d}"
+
+    def pair(i):
+        return player(i), player(i + 1)
+
+    members = {}
+
+    def as_player(i):
+        # One member per player, like a real guild (identity is keyed on member id);
+        # a fresh ctx per command, since the caller is resolved once per ctx
+        name = player(i)
+        member = members.get(name) or members.setdefault(name, FakeMember(name))
+        return FakeContext(player_ctx.bot, member, player_ctx.channel, "bench")
+
+    async def give(i):
+        giver, receiver = pair(i)
+        await player_info.giveMoney.callback(player_info, as_player(i), receiver, 1, "cp")
+
+    async def info(i):
+        await player_info.info.callback(player_info, as_player(i), player_name=player(i))
+
+    async def dta(i):
+        await admin.dta.callback(admin, gm_ctx, time="1")
+        poll_state.append(max(admin.tallies))
+
+    async def close_poll(i):
+        message_id = poll_state.pop() if poll_state else None
+        if message_id is None:
+            return
+        voters = list(gm_ctx.guild.members)[:MAX_POLL_RESPONDENTS]
+        admin.tallies[message_id] = {uid: {emoji_keys[uid % len(emoji_keys)]} for uid in voters}
+        await admin.close_weekly_job({"channel_id": gm_ctx.channel.id, "message_id": message_id,
+                                      "author_id": gm_ctx.author.id})
+
+    return [
+        ("info", info),
+        ("players", lambda i: player_info.players.callback(player_info, gm_ctx)),
+        ("addMoney", lambda i: player_info.addMoney.callback(player_info, gm_ctx, player(i), "5", "gp")),
+        ("addMoney x3", lambda i: player_info.addMoney.callback(player_info, gm_ctx, *pair(i), player(i + 2), "1", "sp")),
+        ("rmMoney", lambda i: player_info.rmMoney.callback(player_info, gm_ctx, player(i), 1, "cp")),
+        ("giveMoney", give),
+        ("convert", lambda i: player_info.convert.callback(player_info, gm_ctx, player(i), 1, "gp", "sp")),
+        ("addQP", lambda i: player_info.addQP.callback(player_info, gm_ctx, player(i), "1")),
+        ("ledger", lambda i: player_info.ledger.callback(player_info, gm_ctx, player(i))),
+        ("quests", lambda i: quests.quests.callback(quests, gm_ctx, None)),
+        ("questSearch", lambda i: quests.questSearch.callback(quests, gm_ctx, terms="goblin crypt")),
+        ("quest", lambda i: quests.quest.callback(quests, gm_ctx, 1 + i % n)),
+        ("dta", dta),
+        ("closePoll", close_poll),
+        ("pollStatus", lambda i: admin.pollStatus.callback(admin, gm_ctx)),
+    ]
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def run_size(n: int, iterations: int, tmp: str) -> dict:
+    from config import GM_ROLE
+    from database import Database
+    import migrations
+    from cogs.player_info import PlayerInfo
+    from cogs.quests import Quests
+    from cogs.admin_commands import AdminCommands
+
+    path = os.path.join(tmp, f"bench-{n}.db")
+    start = time.perf_counter()
+    seed(path, n)
+    seed_s = time.perf_counter() - start
+
+    # The seeded rows predate multi-guild support; the guild with the old GM role claims them
+    gm_role = FakeRole(GM_ROLE)
+    guild = FakeGuild(roles=[gm_role])
+    for i in range(min(n, MAX_POLL_RESPONDENTS)):
+        member = FakeMember(f"Player{i:06d}")
+        guild.members[member.id] = member
+    db = Database(path)
+    bot = FakeBot(db, guild)
+    player_info, quests, admin = PlayerInfo(bot), Quests(bot), AdminCommands(bot)
+
+    start = time.perf_counter()
+    await migrations.run(db)  # adopts the seeded pre-versioning tables, like a real upgrade
+    await bot.guild_configs.load()
+    await bot.guild_configs.adopt(guild)
+    for cog in (player_info, quests, admin):
+        await cog.cog_load()
+    await player_info.players_of(guild.id)  # what the guild's first command would load
+    await bot.scheduler.start()
+    load_s = time.perf_counter() - start
+
+    gm = FakeMember("GM", roles=[gm_role])
+    channel = bot.get_channel(next(_ids))
+    results = {"players": n, "quests": n, "seed_s": round(seed_s, 3), "cog_load_s": round(load_s, 3), "commands": {}}
+
+    for name, factory in cases(n, player_info, quests, admin, FakeContext(bot, gm, channel, "bench"),
+                               FakeContext(bot, FakeMember("Player000000"), channel, "bench"), []):
+        timings = []
+        loop_start = time.perf_counter()
+        for i in range(iterations):
+            start = time.perf_counter()
+            await factory(i)
+            timings.append(time.perf_counter() - start)
+        total = time.perf_counter() - loop_start
+        timings.sort()
+        results["commands"][name] = {
+            "calls": iterations,
+            "p50_ms": round(percentile(timings, 0.50) * 1000, 3),
+            "p99_ms": round(percentile(timings, 0.99) * 1000, 3),
+            "mean_ms": round(statistics.fmean(timings) * 1000, 3),
+            "per_sec": round(iterations / total, 1),
+        }
+    await bot.scheduler.stop()
+    db.close()
+    return results
+
+
+def print_size(result: dict, baseline: dict = None):
+    print(f"\nN = {result['players']}  (seed {result['seed_s']}s, cog_load {result['cog_load_s']}s)")
+    header = f"{'command':<14} {'p50 ms':>9} {'p99 ms':>9} {'per sec':>10}"
+    print(header + ("  p50 vs baseline" if baseline else ""))
+    for name, r in result["commands"].items():
+        line = f"{name:<14} {r['p50_ms']:>9.3f} {r['p99_ms']:>9.3f} {r['per_sec']:>10.1f}"
+        old = (baseline or {}).get("commands", {}).get(name)
+        if old and old["p50_ms"]:
+            line += f"  {(r['p50_ms'] / old['p50_ms'] - 1) * 100:+.0f}%"
+        print(line)
+
+
+async def main(args):
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "iterations": args.iterations,
+        "sizes": [],
+    }
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {r["players"]: r for r in json.load(f)["sizes"]}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # config.py opens discord.log in the working directory; keep it out of the repo
+        os.chdir(tmp)
+        for n in args.sizes:
+            result = await run_size(n, args.iterations, tmp)
+            report["sizes"].append(result)
+            print_size(result, baseline.get(n))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved {args.out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    parser.add_argument("--compare")
+    args = parser.parse_args()
+    args.out = os.path.abspath(args.out)
+    args.compare = os.path.abspath(args.compare) if args.compare else None
+    asyncio.run(main(args))
@@ -0,0 +1,240 @@
+"""
+Microbenchmark and self-check for currency.py.
+
+Times CurrencySystem.make_change / to_base / from_base against a copy of the
+hand-written gp/sp/cp helpers they replaced, then checks make_change over
+every (target unit, coin mix) in a grid plus random wallets:
+  - total worth never changes
+  - no coin count goes negative
+  - the target amount is reached whenever the wallet is worth enough AND the
+    smaller coins alone could cover it (the only case that needs no change back)
+  - for the stock gp/sp/cp table, it succeeds wherever the old helper did
+
+Also builds a few other chain tables (pp/gp/sp/cp, a base-12 homebrew) to make
+sure nothing is tied to powers of ten. Needs nothing beyond the repo.
+Usage: python benchmarks/currency_bench.py [--iterations 200000] [--random 20000]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from currency import CURRENCY, CurrencySystem, Denomination, DENOMINATIONS
+
+
+# ----------------
+# The helpers currency.py replaced (cogs/player_info.py before the table)
+# ----------------
+
+def legacy_to_cp(gp: int, sp: int, cp: int) -> int:
+    return gp * 100 + sp * 10 + cp
+
+
+def legacy_from_cp(total_cp: int) -> tuple[int, int, int]:
+    gp = total_cp // 100
+    rem = total_cp % 100
+    return gp, rem // 10, rem % 10
+
+
+def legacy_make_change(target: str, amt: int, counts: dict) -> list[str]:
+    notes = []
+    def break_gp_to_sp(u):
+        use = min(math.ceil(u/10), counts["gp"])
+        if use > 0:
+            counts["gp"] -= use
+            counts["sp"] += use * 10
+            notes.append(f"broke {use}gp → {use * 10}sp")
+
+    def break_sp_to_cp(u):
+        use = min(math.ceil(u/10), counts["sp"])
+        if use > 0:
+            counts["sp"] -= use
+            counts["cp"] += use * 10
+            notes.append(f"broke {use}sp → {use * 10}cp")
+
+    def combine_cp_to_sp(u):
+        use = min(u, counts["cp"] // 10)
+        if use > 0:
+            counts["cp"] -= use * 10
+            counts["sp"] += use
+            notes.append(f"combined {use*10}cp → {use}sp")
+
+    def combine_sp_to_gp(u):
+        use = min(u, counts["sp"] // 10)
+        if use > 0:
+            counts["sp"] -= use * 10
+            counts["gp"] += use
+            notes.append(f"combined {use*10}sp → {use}gp")
+
+    if target == "cp":
+        deficit = max(0, amt - counts["cp"])
+        if deficit > 0:
+            break_sp_to_cp(deficit)
+            deficit = max(0, amt - counts["cp"])
+        if deficit > 0:
+            use = min(math.ceil(deficit / 100), counts["gp"])
+            if use > 0:
+                counts["gp"] -= use
+                counts["cp"] += use * 100
+                notes.append(f"broke {use}gp → {use * 100}cp")
+    elif target == "sp":
+        deficit = max(0, amt - counts["sp"])
+        if deficit > 0:
+            break_gp_to_sp(deficit)
+            deficit = max(0, amt - counts["sp"])
+        if deficit > 0:
+            combine_cp_to_sp(deficit)
+    elif target == "gp":
+        deficit = max(0, amt - counts["gp"])
+        if deficit > 0:
+            combine_sp_to_gp(deficit)
+            deficit = max(0, amt - counts["gp"])
+        if deficit > 0:
+            combine_cp_to_sp(deficit * 10)
+            combine_sp_to_gp(deficit)
+    return notes
+
+
+# ----------------
+# Self-check
+# ----------------
+
+EXTRA_TABLES = {
+    "pp/gp/sp/cp": (Denomination("pp", "PLATINUM", "platinum", 1000), *DENOMINATIONS),
+    "base 12": (
+        Denomination("crown", "CROWNS", "crowns", 144),
+        Denomination("shilling", "SHILLINGS", "shillings", 12),
+        Denomination("penny", "PENNIES", "pennies", 1),
+    ),
+    "uneven chain": (
+        Denomination("bar", "BARS", "bars", 60),
+        Denomination("ring", "RINGS", "rings", 20),
+        Denomination("bead", "BEADS", "beads", 5),
+        Denomination("chip", "CHIPS", "chips", 1),
+    ),
+}
+
+
+def feasible(system: CurrencySystem, counts: dict, target: str, amount: int) -> bool:
+    """Can counts hold `amount` of target with no change owed back? (bigger coins break exactly)"""
+    total = system.to_base(counts)
+    return total >= amount * system.value[target]
+
+
+def check_one(system, counts, target, amount, legacy=False) -> list[str]:
+    before = dict(counts)
+    work = dict(counts)
+    system.make_change(work, target, amount)
+    problems = []
+    if system.to_base(work) != system.to_base(before):
+        problems.append("worth changed")
+    if min(work.values()) < 0:
+        problems.append("negative coins")
+    if feasible(system, before, target, amount) and work[target] < amount:
+        problems.append(f"short: has {work[target]}{target}")
+    if legacy:
+        old = dict(before)
+        legacy_make_change(target, amount, old)
+        if old[target] >= amount > work[target]:
+            problems.append("old helper succeeded where the table failed")
+    return [f"{before} need {amount}{target}: {p}" for p in problems]
+
+
+def self_check(name: str, system: CurrencySystem, rng: random.Random, randoms: int) -> int:
+    cases, problems = 0, []
+    legacy = system is CURRENCY
+    grid = range(0, 13)
+    for target in system.units:
+        for amount in (1, 2, 3, 7, 10, 11, 25):
+            # every small mix of the (up to) three coins around the target
+            for a in grid:
+                for b in grid:
+                    for c in grid:
+                        counts = dict.fromkeys(system.units, 0)
+                        for unit, n in zip(system.units, (a, b, c)):
+                            counts[unit] = n
+                        problems += check_one(system, counts, target, amount, legacy)
+                        cases += 1
+    for _ in range(randoms):
+        counts = {u: rng.randint(0, 400) for u in system.units}
+        target = rng.choice(system.units)
+        problems += check_one(system, counts, target, rng.randint(1, 500), legacy)
+        cases += 1
+
+    # from_base / to_base round trip and normalization
+    for total in range(0, 5000):
+        coins = system.from_base(total)
+        if system.to_base(coins) != total:
+            problems.append(f"from_base({total}) round trip")
+        if any(coins[u] * system.value[u] >= system.value[big]
+               for big, u in zip(system.units, system.units[1:])):
+            problems.append(f"from_base({total}) not normalized: {coins}")
+        cases += 1
+
+    print(f"  {name:<14} {cases:>9} cases  " + ("OK" if not problems else f"{len(problems)} FAILED"))
+    for p in problems[:5]:
+        print(f"    - {p}")
+    return len(problems)
+
+
+# ----------------
+# Timing
+# ----------------
+
+def bench(label: str, fn, iterations: int):
+    seconds = timeit.timeit(fn, number=iterations)
+    print(f"  {label:<34} {seconds / iterations * 1e9:>8.0f} ns/op")
+
+
+def run_bench(iterations: int):
+    wallets = [
+        ({"gp": 3, "sp": 0, "cp": 0}, "cp", 25),     # break gp → cp
+        ({"gp": 0, "sp": 4, "cp": 95}, "gp", 1),     # combine sp + cp → gp
+        ({"gp": 5, "sp": 5, "cp": 5}, "sp", 3),      # already enough
+    ]
+    for counts, target, amount in wallets:
+        print(f"make_change {counts} → {amount}{target}")
+        bench("legacy (closures, per-unit branches)",
+              lambda: legacy_make_change(target, amount, dict(counts)), iterations)
+        bench("CurrencySystem.make_change",
+              lambda: CURRENCY.make_change(dict(counts), target, amount), iterations)
+
+    print("to_base / from_base (1234 cp)")
+    coins = {"gp": 12, "sp": 3, "cp": 4}
+    bench("legacy _to_cp", lambda: legacy_to_cp(12, 3, 4), iterations)
+    bench("CurrencySystem.to_base", lambda: CURRENCY.to_base(coins), iterations)
+    bench("legacy _from_cp", lambda: legacy_from_cp(1234), iterations)
+    bench("CurrencySystem.from_base", lambda: CURRENCY.from_base(1234), iterations)
+
+
+def main(args):
+    run_bench(args.iterations)
+
+    print("\nself-check")
+    rng = random.Random(args.seed)
+    failed = self_check("gp/sp/cp", CURRENCY, rng, args.random)
+    for name, table in EXTRA_TABLES.items():
+        failed += self_check(name, CurrencySystem(table), rng, args.random)
+
+    for bad in ((Denomination("a", "A", "a", 15), Denomination("b", "B", "b", 10), Denomination("c", "C", "c", 1)),
+                (Denomination("a", "A", "a", 10), Denomination("b", "B", "b", 2))):
+        try:
+            CurrencySystem(bad)
+        except ValueError:
+            continue
+        print(f"  accepted a table that isn't a chain: {[d.value for d in bad]}")
+        failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--random", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    sys.exit(main(parser.parse_args()))
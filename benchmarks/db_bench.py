@@ -0,0 +1,115 @@
+"""
+Before/after benchmark for the shared database layer.
+
+Runs N concurrent addMoney-style commands (SELECT the row, UPDATE it) two ways:
+  before: sqlite3.connect(timeout=5) per command, blocking calls on the loop
+  after:  database.Database (pooled connections, writer thread)
+
+and reports commands/second plus the worst and total event-loop stall seen by a
+1 ms ticker task running alongside.
+
+Usage: python benchmarks/db_bench.py [concurrency] [players]
+"""
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import Database  # noqa: E402
+
+TABLE = "player_info"
+
+
+def seed(path: str, players: int):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        f"CREATE TABLE {TABLE} (PLAYER TEXT, LEVEL INTEGER, GOLD INTEGER, "
+        f"SILVER INTEGER NOT NULL DEFAULT 0, COPPER INTEGER NOT NULL DEFAULT 0, QUEST_POINTS INTEGER)"
+    )
+    conn.executemany(
+        f"INSERT INTO {TABLE} VALUES (?, 2, 10, 0, 0, 0)",
+        [(f"Player{i}",) for i in range(players)],
+    )
+    conn.commit()
+    conn.close()
+
+
+class StallMeter:
+    """Ticks every 1 ms and records how late each wakeup was."""
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.worst = 0.0
+        self.total = 0.0
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            late = loop.time() - start - self.interval
+            if late > 0:
+                self.worst = max(self.worst, late)
+                self.total += late
+
+    def __enter__(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    def __exit__(self, *exc):
+        self._task.cancel()
+
+
+async def before_cmd(path: str, name: str):
+    conn = sqlite3.connect(path, timeout=5)
+    conn.row_factory = sqlite3.Row
+    cur = conn.cursor()
+    cur.execute(f"SELECT GOLD FROM {TABLE} WHERE PLAYER = ?", (name,))
+    row = cur.fetchone()
+    cur.execute(f"UPDATE {TABLE} SET GOLD = ? WHERE PLAYER = ?", (row["GOLD"] + 1, name))
+    conn.commit()
+    conn.close()
+    await asyncio.sleep(0)  # the reply
+
+
+async def after_cmd(db: Database, name: str):
+    def apply(conn):
+        row = conn.execute(f"SELECT GOLD FROM {TABLE} WHERE PLAYER = ?", (name,)).fetchone()
+        conn.execute(f"UPDATE {TABLE} SET GOLD = ? WHERE PLAYER = ?", (row["GOLD"] + 1, name))
+    await db.write(apply)
+    await asyncio.sleep(0)
+
+
+async def run(label: str, make_cmd, concurrency: int, players: int):
+    with StallMeter() as meter:
+        await asyncio.sleep(0.01)
+        start = time.perf_counter()
+        await asyncio.gather(*(make_cmd(f"Player{i % players}") for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    print(
+        f"{label:<7} {concurrency / elapsed:>10.0f} cmd/s   "
+        f"worst stall {meter.worst * 1000:>7.2f} ms   total stall {meter.total * 1000:>8.1f} ms"
+    )
+
+
+async def main(concurrency: int, players: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        seed(path, players)
+        await run("before", lambda n: before_cmd(path, n), concurrency, players)
+
+        db = Database(path)
+        try:
+            await run("after", lambda n: after_cmd(db, n), concurrency, players)
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    players = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    asyncio.run(main(concurrency, players))
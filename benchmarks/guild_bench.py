@@ -0,0 +1,209 @@
+"""
+Command latency with many guilds sharing one bot and one database.
+
+Seeds G guilds (each with its own GM role in guild_config, P players and Q
+quests, imported through bulk_io like !importPlayers would), loads PlayerInfo
+and Quests, and drives their commands with cog_bench's fake Discord objects
+(callbacks awaited directly, checks bypassed). Reports p50/p99 for:
+  - the first command a guild runs, which loads its players (GuildPlayers)
+  - info / addMoney / giveMoney / quests / questSearch, all in one guild
+  - the same commands, each in a random guild
+If partitioning works, the random-guild numbers stay close to the one-guild
+ones: every query is bounded by its guild's rows, not the whole table. Also
+checks that no command's writes leak into another guild.
+
+Needs discord.py installed.
+Usage: python benchmarks/guild_bench.py [--guilds 1000] [--players 200] [--quests 200] [--iterations 500]
+"""
+import argparse
+import asyncio
+import io
+import os
+import random
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from cog_bench import FakeBot, FakeChannel, FakeContext, FakeGuild, FakeMember, FakeRole, _ids  # noqa: E402
+
+WORDS = "goblin dragon caravan crypt shrine harbor smuggler ritual tower swamp relic escort".split()
+SYLLABLES = "ka ro mi den tal vor esh ul bri gan tho sel mar ny qua fen dro lis".split()
+STARTING_GOLD = 1000
+
+
+# ----------------
+# Seeding
+# ----------------
+# Repo modules are imported lazily: config.py opens discord.log in the working
+# directory, and main() moves that into the temp dir first.
+
+def players_csv(n: int) -> bytes:
+    lines = ["player,level,gp"] + [f"Player{i:05d},{2 + i % 18},{STARTING_GOLD}" for i in range(n)]
+    return "\n".join(lines).encode()
+
+
+def vocabulary(rng: random.Random) -> list[str]:
+    """The theme words plus ~5000 made-up ones, so a search term matches ~1% of quests like real text."""
+    made_up = {"".join(rng.choices(SYLLABLES, k=3)) for _ in range(8000)}
+    return WORDS + sorted(made_up)[:5000]
+
+
+def quests_csv(n: int, words: list[str], rng: random.Random) -> bytes:
+    lines = ["name,type,description"]
+    for i in range(n):
+        lines.append(f"Quest {i} {rng.choice(WORDS)},U,{' '.join(rng.choices(words, k=40))}")
+    return "\n".join(lines).encode()
+
+
+async def seed(bot, guilds: list, players: int, quests: int, rng: random.Random):
+    import bulk_io
+    roster = players_csv(players)
+    words = vocabulary(rng)
+    for guild in guilds:
+        await bot.guild_configs.set(guild.id, gm_role=guild.gm.roles[0].id)
+        await bot.db.write(bulk_io.import_rows, bulk_io.PLAYERS, guild.id, io.BytesIO(roster), "csv")
+        board = quests_csv(quests, words, rng)
+        await bot.db.write(bulk_io.import_rows, bulk_io.QUESTS, guild.id, io.BytesIO(board), "csv")
+
+
+def leaks(path: str, guilds: list, players: int) -> list[str]:
+    """Every guild still has exactly its own players, and only its own players' coins moved."""
+    from config import PLAYER_INFO_TABLE
+    import ledger
+    conn = sqlite3.connect(path)
+    problems = []
+    counts = dict(conn.execute(f"SELECT GUILD_ID, COUNT(*) FROM {PLAYER_INFO_TABLE} GROUP BY GUILD_ID"))
+    for guild in guilds:
+        if counts.get(guild.id) != players:
+            problems.append(f"guild {guild.id} has {counts.get(guild.id)} players, expected {players}")
+        total = conn.execute(
+            f"SELECT SUM(GOLD * 100 + SILVER * 10 + COPPER) FROM {PLAYER_INFO_TABLE} WHERE GUILD_ID = ?", (guild.id,)
+        ).fetchone()[0]
+        moved = conn.execute(
+            f"SELECT COALESCE(SUM(DELTA_CP), 0) FROM {ledger.LEDGER_TABLE} WHERE GUILD_ID = ?", (guild.id,)
+        ).fetchone()[0]
+        # The import opened every player's ledger with their starting coins
+        if total != moved:
+            problems.append(f"guild {guild.id}: balances and its ledger disagree")
+    conn.close()
+    return problems
+
+
+# ----------------
+# Runs
+# ----------------
+
+def cases(player_info, quests, players: int):
+    """(name, coroutine factory) per command. Each factory gets the guild and the iteration number."""
+    def player(i):
+        return f"Player{i % players:05d}"
+
+    def as_player(guild, i):
+        # One member per player per guild (identity is keyed on member id)
+        name = player(i)
+        member = guild.player_members.get(name) or guild.player_members.setdefault(name, FakeMember(name))
+        return FakeContext(guild.bot, member, guild.channel, "bench")
+
+    def as_gm(guild):
+        return FakeContext(guild.bot, guild.gm, guild.channel, "bench")
+
+    return [
+        ("info", lambda g, i: player_info.info.callback(player_info, as_player(g, i), player_name=player(i))),
+        ("addMoney", lambda g, i: player_info.addMoney.callback(player_info, as_gm(g), player(i), "5", "gp")),
+        ("giveMoney", lambda g, i: player_info.giveMoney.callback(player_info, as_player(g, i), player(i + 1), 1,
+                                                                  "cp")),
+        ("quests", lambda g, i: quests.quests.callback(quests, as_gm(g), None)),
+        ("questSearch", lambda g, i: quests.questSearch.callback(quests, as_gm(g), terms="goblin crypt")),
+    ]
+
+
+async def timed(calls) -> list[float]:
+    out = []
+    for factory, args in calls:
+        start = time.perf_counter()
+        await factory(*args)
+        out.append((time.perf_counter() - start) * 1000)
+    return sorted(out)
+
+
+def report(label: str, ms: list[float]):
+    p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+    print(f"{label:<30} {ms[len(ms) // 2]:>9.3f} {p99:>9.3f}")
+
+
+async def main(args):
+    from database import Database
+    import migrations
+    from cogs.player_info import PlayerInfo
+    from cogs.quests import Quests
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        # config.py opens discord.log in the working directory; keep it out of the repo
+        os.chdir(tmp)
+        path = os.path.join(tmp, "guilds.db")
+        db = Database(path)
+        guilds = []
+        for _ in range(args.guilds):
+            role = FakeRole(next(_ids))
+            guild = FakeGuild(roles=[role])
+            guild.gm = FakeMember("GM", roles=[role])
+            guild.player_members = {}
+            guild.channel = FakeChannel(next(_ids), guild)
+            guilds.append(guild)
+        bot = FakeBot(db, guilds[0])
+        for guild in guilds:
+            guild.bot = bot
+
+        start = time.perf_counter()
+        await migrations.run(db)
+        await bot.guild_configs.load()
+        await seed(bot, guilds, args.players, args.quests, rng)
+        seed_s = time.perf_counter() - start
+        player_info, quests = PlayerInfo(bot), Quests(bot)
+        for cog in (player_info, quests):
+            await cog.cog_load()
+        print(f"{args.guilds} guilds x {args.players} players + {args.quests} quests "
+              f"(seeded in {seed_s:.1f}s), {args.iterations} calls per command\n")
+        print(f"{'':<30} {'p50 ms':>9} {'p99 ms':>9}")
+
+        # First command per guild: loads that guild's players; later ones reuse them
+        commands = cases(player_info, quests, args.players)
+        info = commands[0][1]
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        report("first command (loads guild)", await timed((info, (g, i)) for i, g in enumerate(guilds)))
+        grown = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss
+        report("same command, guild loaded", await timed((info, (g, i)) for i, g in enumerate(guilds)))
+
+        for name, factory in commands:
+            one = await timed((factory, (guilds[0], i)) for i in range(args.iterations))
+            spread = await timed((factory, (rng.choice(guilds), i)) for i in range(args.iterations))
+            report(f"{name}, one guild", one)
+            report(f"{name}, random guild", spread)
+
+        # ru_maxrss is in KiB on Linux
+        print(f"\npeak RSS grew {grown / 1024:.1f} MB loading {len(player_info.guilds)} guilds' players "
+              f"(~{grown / max(1, len(player_info.guilds)):.0f} KiB per guild)")
+        await bot.scheduler.stop()
+        db.close()
+        problems = leaks(path, guilds, args.players)
+
+    print("guild isolation: " + ("OK" if not problems else "VIOLATED"))
+    for p in problems[:5]:
+        print(f"  - {p}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--guilds", type=int, default=1000)
+    parser.add_argument("--players", type=int, default=200)
+    parser.add_argument("--quests", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,288 @@
+"""
+Concurrent load generator for the player economy commands.
+
+Starts a real commands.Bot (never logged in) with PlayerInfo loaded against a
+temporary database, then fires thousands of "!command" messages from many
+simulated members at once: GMs running addMoney/rmMoney/convert, players
+paying each other with giveMoney and checking info/players. Each message goes
+through the bot's normal command path (get_context -> invoke: parsing,
+converters, role checks, invoke hooks, cog error handler); only the Discord
+side is replaced by in-memory members/channels that record what would be sent.
+
+Afterwards it checks the economy's invariants against the ledger:
+  - conservation: sum of balances == starting sum + sum of ledger deltas
+  - per player:   balance == ledger balance (a lost update breaks this)
+  - no negative coin counts
+and reports throughput, error rate and "database is locked" occurrences.
+
+Needs discord.py installed.
+Usage: python benchmarks/loadgen.py [--messages 5000] [--members 200] [--players 100] [--concurrency 500]
+"""
+import argparse
+import asyncio
+import collections
+import itertools
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+import discord
+from discord.ext import commands
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+STARTING_GOLD = 100
+GM_COUNT = 3
+# Share of messages per command
+MIX = [
+    ("giveMoney", 0.50),
+    ("addMoney", 0.15),
+    ("rmMoney", 0.10),
+    ("convert", 0.05),
+    ("info", 0.15),
+    ("players", 0.05),
+]
+
+_ids = itertools.count(10**17)
+
+
+class FakeRole:
+    def __init__(self, id: int):
+        self.id = id
+
+
+class FakeMember:
+    def __init__(self, name: str, roles=()):
+        self.id = next(_ids)
+        self.name = self.display_name = name
+        self.roles = list(roles)
+        self.bot = False
+        self.sent = 0
+
+    def get_role(self, role_id):
+        return discord.utils.get(self.roles, id=role_id)
+
+    async def send(self, content=None, **kwargs):
+        self.sent += 1
+
+
+class FakeGuild:
+    def __init__(self, roles=()):
+        self.id = next(_ids)
+        self.name = f"Guild {self.id}"
+        self.roles = list(roles)
+
+    def get_role(self, role_id):
+        return discord.utils.get(self.roles, id=role_id)
+
+
+class FakeChannel:
+    def __init__(self, guild: FakeGuild):
+        self.id = next(_ids)
+        self.guild = guild
+        self.sent = 0
+
+    async def send(self, content=None, **kwargs):
+        self.sent += 1
+
+
+class FakeMessage:
+    """Just enough of discord.Message for Bot.get_context."""
+
+    def __init__(self, state, author: FakeMember, channel: FakeChannel, content: str):
+        self._state = state
+        self.id = next(_ids)
+        self.author = author
+        self.channel = channel
+        self.guild = channel.guild
+        self.content = content
+        self.attachments = []
+
+
+class LoadContext(commands.Context):
+    """Replies go to an in-memory counter instead of the Discord API."""
+
+    async def reply(self, content=None, **kwargs):
+        self.bot.replies += 1
+
+    async def send(self, content=None, **kwargs):
+        self.bot.replies += 1
+
+
+class LoadBot(commands.Bot):
+    def __init__(self, sink: FakeChannel):
+        super().__init__(command_prefix="!", intents=discord.Intents.none(), help_command=None)
+        self.sink = sink
+        self.replies = 0
+        self.errors = collections.Counter()     # command -> errors
+        self.locked = 0                         # "database is locked" seen
+        self.error_samples: list[str] = []
+
+    def get_channel(self, channel_id):
+        return self.sink
+
+    async def on_command_error(self, ctx, error):
+        original = getattr(error, "original", error)
+        self.errors[ctx.command.qualified_name if ctx.command else "?"] += 1
+        if isinstance(original, sqlite3.OperationalError) and "locked" in str(original):
+            self.locked += 1
+        if len(self.error_samples) < 5:
+            self.error_samples.append(f"{ctx.message.content}: {original!r}")
+
+
+def seed(path: str, players: int):
+    from config import PLAYER_INFO_TABLE
+    conn = sqlite3.connect(path)
+    conn.execute(f"CREATE TABLE {PLAYER_INFO_TABLE} (PLAYER TEXT, LEVEL INTEGER, GOLD INTEGER, QUEST_POINTS INTEGER)")
+    conn.executemany(
+        f"INSERT INTO {PLAYER_INFO_TABLE} VALUES (?, 2, ?, 0)",
+        ((f"Player{i:04d}", STARTING_GOLD) for i in range(players))
+    )
+    conn.commit()
+    conn.close()
+
+
+def script(rng: random.Random, count: int, players: list[FakeMember], gms: list[FakeMember]):
+    """The (author, content) of every message, drawn from MIX."""
+    names, weights = zip(*MIX)
+    out = []
+    for name in rng.choices(names, weights, k=count):
+        player = rng.choice(players)
+        other = rng.choice(players).display_name
+        unit = rng.choice(["gp", "sp", "cp"])
+        if name == "giveMoney":
+            out.append((player, f"!giveMoney {other} {rng.randint(1, 20)} {unit}"))
+        elif name == "addMoney":
+            out.append((rng.choice(gms), f"!addMoney {other} {rng.randint(1, 10)} {unit}"))
+        elif name == "rmMoney":
+            out.append((rng.choice(gms), f"!rmMoney {other} {rng.randint(1, 10)} {unit}"))
+        elif name == "convert":
+            out.append((rng.choice(gms), f"!convert {other} 1 gp sp"))
+        elif name == "info":
+            out.append((player, f"!info {player.display_name}"))
+        else:
+            out.append((player, "!players"))
+    return out
+
+
+def check_invariants(path: str, guild_id: int, starting_total: int) -> list[str]:
+    from config import PLAYER_INFO_TABLE
+    import ledger
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    problems = []
+
+    rows = conn.execute(f"SELECT PLAYER, GOLD, SILVER, COPPER FROM {PLAYER_INFO_TABLE} WHERE GUILD_ID = ?",
+                        (guild_id,)).fetchall()
+    if len(rows) != conn.execute(f"SELECT COUNT(*) FROM {PLAYER_INFO_TABLE}").fetchone()[0]:
+        problems.append("some players were not adopted by the guild")
+    total = sum(r["GOLD"] * 100 + r["SILVER"] * 10 + r["COPPER"] for r in rows)
+    ledger_sum = conn.execute(f"SELECT COALESCE(SUM(DELTA_CP), 0) FROM {ledger.LEDGER_TABLE}").fetchone()[0]
+    if total != starting_total + ledger_sum:
+        problems.append(f"conservation: balances sum to {total} cp, ledger says {starting_total + ledger_sum} cp")
+
+    mismatched = []
+    for r in rows:
+        expected = ledger.balance(conn, guild_id, r["PLAYER"])
+        actual = r["GOLD"] * 100 + r["SILVER"] * 10 + r["COPPER"]
+        if expected is not None and expected != actual:
+            mismatched.append(f"{r['PLAYER']} has {actual} cp, ledger {expected} cp")
+        if min(r["GOLD"], r["SILVER"], r["COPPER"]) < 0:
+            problems.append(f"negative coins: {r['PLAYER']} {r['GOLD']}gp {r['SILVER']}sp {r['COPPER']}cp")
+    if mismatched:
+        problems.append(f"{len(mismatched)} player(s) disagree with the ledger, e.g. {mismatched[0]}")
+    conn.close()
+    return problems
+
+
+async def main(args):
+    from config import GM_ROLE
+    from database import Database
+    from guild_config import GuildConfigs
+    import migrations
+    from outbox import Outbox
+    from cogs.player_info import PlayerInfo
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # config.py opens discord.log in the working directory; keep it out of the repo
+        os.chdir(tmp)
+        path = os.path.join(tmp, "load.db")
+        seed(path, args.players)
+        starting_total = args.players * STARTING_GOLD * 100
+
+        # The seeded rows predate multi-guild support; the guild with the old GM role claims them
+        guild = FakeGuild(roles=[FakeRole(GM_ROLE)])
+        bot = LoadBot(FakeChannel(guild))
+        async with bot:
+            bot._connection.user = FakeMember("Rattlepost")  # get_context compares authors against it
+            bot.db = Database(path)
+            await migrations.run(bot.db)
+            bot.guild_configs = GuildConfigs(bot.db)
+            # No pacing: the sink isn't rate limited (command replies go to LoadContext anyway)
+            bot.outbox = Outbox(route_rate=1e9, route_burst=10**9, global_rate=1e9, global_burst=10**9)
+            await bot.guild_configs.load()
+            await bot.guild_configs.adopt(guild)
+            await bot.add_cog(PlayerInfo(bot))
+
+            rng = random.Random(args.seed)
+            # Several senders may share a player, but each player is one member (identity is by member id)
+            by_name: dict[str, FakeMember] = {}
+            players = [by_name.setdefault(name, FakeMember(name))
+                       for name in (f"Player{i % args.players:04d}" for i in range(args.members))]
+            gms = [FakeMember(f"GM{i}", roles=[FakeRole(GM_ROLE)]) for i in range(GM_COUNT)]
+            channels = [FakeChannel(guild) for _ in range(8)]
+            messages = [
+                FakeMessage(bot._connection, author, rng.choice(channels), content)
+                for author, content in script(rng, args.messages, players, gms)
+            ]
+
+            limiter = asyncio.Semaphore(args.concurrency)
+            latencies: dict[str, list[float]] = collections.defaultdict(list)
+
+            async def deliver(message: FakeMessage):
+                async with limiter:
+                    start = time.perf_counter()
+                    ctx = await bot.get_context(message, cls=LoadContext)
+                    await bot.invoke(ctx)
+                    latencies[ctx.command.qualified_name].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(deliver(m) for m in messages))
+            elapsed = time.perf_counter() - start
+            await asyncio.sleep(0.2)  # let dispatched on_command_error tasks finish
+            bot.db.close()
+
+        problems = check_invariants(path, guild.id, starting_total)
+
+    errors = sum(bot.errors.values())
+    print(f"{args.messages} messages from {args.members} members ({GM_COUNT} GMs), "
+          f"{args.players} players, concurrency {args.concurrency}")
+    print(f"throughput: {args.messages / elapsed:.0f} msg/s ({elapsed:.2f}s)")
+    print(f"errors: {errors} ({errors / args.messages:.2%}), database is locked: {bot.locked}")
+    print(f"\n{'command':<10} {'count':>6} {'errors':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, values in sorted(latencies.items()):
+        values.sort()
+        p50 = values[len(values) // 2] * 1000
+        p99 = values[min(len(values) - 1, int(len(values) * 0.99))] * 1000
+        print(f"{name:<10} {len(values):>6} {bot.errors[name]:>7} {p50:>8.2f} {p99:>8.2f}")
+    for sample in bot.error_samples:
+        print(f"  error: {sample}")
+
+    print("\ninvariants: " + ("OK" if not problems else "VIOLATED"))
+    for p in problems:
+        print(f"  - {p}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--members", type=int, default=200)
+    parser.add_argument("--players", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    sys.exit(asyncio.run(main(parser.parse_args())))
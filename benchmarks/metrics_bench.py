@@ -0,0 +1,92 @@
+"""
+Per-command overhead of the metrics hooks.
+
+Times N no-op "commands" on the event loop with and without
+Metrics.before_invoke/after_invoke around them (plus one Database.read each,
+with and without the query timer active), and reports microseconds added per
+command. Also prints the size and render time of the resulting /metrics body.
+
+Usage: python benchmarks/metrics_bench.py [commands]
+"""
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import Database  # noqa: E402
+from metrics import Metrics  # noqa: E402
+
+COMMAND_NAMES = ["giveMoney", "players", "dta", "info", "addMoney", "quests"]
+
+
+class FakeCommand:
+    def __init__(self, name: str):
+        self.qualified_name = name
+
+
+class FakeContext:
+    def __init__(self, command: FakeCommand):
+        self.command = command
+        self.command_failed = False
+
+
+async def bare(ctxs):
+    for ctx in ctxs:
+        pass
+
+
+async def hooked(metrics: Metrics, ctxs):
+    for ctx in ctxs:
+        await metrics.before_invoke(ctx)
+        await metrics.after_invoke(ctx)
+
+
+async def db_calls(db: Database, n: int, metrics: Metrics = None):
+    ctx = FakeContext(FakeCommand("info"))
+    for _ in range(n):
+        if metrics:
+            await metrics.before_invoke(ctx)
+        await db.fetchone("SELECT 1")
+        if metrics:
+            await metrics.after_invoke(ctx)
+
+
+async def main(n: int):
+    commands = [FakeCommand(name) for name in COMMAND_NAMES]
+    ctxs = [FakeContext(commands[i % len(commands)]) for i in range(n)]
+    metrics = Metrics()
+
+    start = time.perf_counter()
+    await bare(ctxs)
+    base = time.perf_counter() - start
+    start = time.perf_counter()
+    await hooked(metrics, ctxs)
+    with_hooks = time.perf_counter() - start
+    print(f"hooks only:      {(with_hooks - base) / n * 1e6:.2f} µs/command over {n} commands")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        sqlite3.connect(path).close()
+        db = Database(path)
+        m = max(n // 20, 1000)
+        await db_calls(db, 200)  # warm up the pool
+        start = time.perf_counter()
+        await db_calls(db, m)
+        plain = time.perf_counter() - start
+        start = time.perf_counter()
+        await db_calls(db, m, metrics)
+        timed = time.perf_counter() - start
+        db.close()
+    print(f"hooks + DB read: {(timed - plain) / m * 1e6:.2f} µs/command over {m} commands "
+          f"(DB read alone {plain / m * 1e6:.0f} µs; noisy)")
+
+    start = time.perf_counter()
+    body = metrics.render()
+    print(f"render:          {(time.perf_counter() - start) * 1000:.2f} ms, {len(body)} bytes")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000))
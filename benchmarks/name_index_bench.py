@@ -0,0 +1,189 @@
+"""
+Benchmark and self-check for name_index.py (typo-tolerant player lookup).
+
+Builds a NameIndex over N generated player names, then times resolve() for
+exact names, case variants and one-typo names (a letter swapped, dropped,
+doubled or replaced), plus resolve_many() over a 6-name command, against a
+brute-force scan scoring every name. Checks that:
+  - exact and case-variant names always resolve to themselves
+  - with CANDIDATE_CAP lifted, search() returns exactly what the brute-force
+    scan does (and reports how often the cap changes the answer)
+  - add/remove leave the index identical to a rebuild
+and reports how often a typo is auto-resolved, only suggested, or resolved to
+a different player (generated names are much denser than a real roster, so
+a typo often spells something close to another player).
+
+Needs nothing beyond the repo.
+Usage: python benchmarks/name_index_bench.py [--players 10000 50000] [--queries 2000]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+ONSETS = "b bl br c ch cl cr d dr f fl fr g gl gr h j k kh kr l m n p ph pl pr qu r s sh sk sl st t th tr v w wr y z zh".split()
+VOWELS = "a e i o u y ae ai au ea ee ei ia io oa oo ou".split()
+CODAS = ["", "", "", "n", "r", "l", "th", "s", "k", "m", "ck", "nd", "x", "rn", "lt", "sh", "ss", "ff", "ng", "rd", "st"]
+TITLES = ["Sir", "Lady", "Brother", "Old", "Captain"]
+
+
+# ----------------
+# Names and typos
+# ----------------
+
+def make_names(n: int, rng: random.Random) -> list[str]:
+    names = set()
+    while len(names) < n:
+        word = "".join(rng.choice(ONSETS) + rng.choice(VOWELS) for _ in range(rng.randint(1, 3)))
+        word = (word + rng.choice(CODAS)).capitalize()
+        roll = rng.random()
+        if roll < 0.15:
+            word = f"{rng.choice(TITLES)} {word}"
+        elif roll < 0.25:
+            word = f"{word}{rng.randint(1, 99)}"
+        names.add(word)
+    return sorted(names)
+
+
+def typo(name: str, rng: random.Random) -> str:
+    i = rng.randrange(len(name))
+    kind = rng.choice(("swap", "drop", "double", "replace"))
+    if kind == "swap" and i < len(name) - 1:
+        return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+    if kind == "drop" and len(name) > 3:
+        return name[:i] + name[i + 1:]
+    if kind == "double":
+        return name[:i] + name[i] + name[i:]
+    return name[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + name[i + 1:]
+
+
+# ----------------
+# Brute force
+# ----------------
+
+def scan(index, names: list[str], query: str, limit: int, threshold: float):
+    from name_index import trigrams
+    from player_identity import name_key
+    q = trigrams(name_key(query))
+    scored = []
+    for name in names:
+        grams = index._grams[name]
+        shared = len(q & grams)
+        score = shared / (len(q) + len(grams) - shared)
+        if score >= threshold:
+            scored.append((-score, name))
+    scored.sort()
+    return [(name, -s) for s, name in scored[:limit]]
+
+
+def timed(fn, queries) -> list[float]:
+    out = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        out.append((time.perf_counter() - start) * 1e6)
+    return out
+
+
+def report(label: str, micros: list[float]):
+    micros = sorted(micros)
+    p99 = micros[min(len(micros) - 1, int(len(micros) * 0.99))]
+    print(f"  {label:<28} p50 {statistics.median(micros):>9.1f} µs   p99 {p99:>9.1f} µs")
+
+
+# ----------------
+# Runs
+# ----------------
+
+def run(n: int, queries: int, rng: random.Random, brute: int) -> int:
+    import name_index
+    from name_index import NameIndex, SUGGEST_SCORE, SUGGESTIONS
+    from player_identity import name_key
+
+    names = make_names(n, rng)
+    start = time.perf_counter()
+    index = NameIndex(names)
+    build = time.perf_counter() - start
+    print(f"\n{n} players (index built in {build * 1000:.0f} ms)")
+
+    sample = rng.sample(names, min(queries, n))
+    exact = sample
+    cased = [s.lower() if rng.random() < 0.5 else s.upper() for s in sample]
+    typos = [(typo(s, rng), s) for s in sample]
+    commands = [[t for t, _ in rng.sample(typos, 6)] for _ in range(max(1, queries // 6))]
+
+    report("resolve exact", timed(index.resolve, exact))
+    report("resolve case variant", timed(index.resolve, cased))
+    report("resolve one typo", timed(index.resolve, [t for t, _ in typos]))
+    report("resolve_many, 6 typos", timed(index.resolve_many, commands))
+    report("brute-force scan, one typo",
+           timed(lambda q: scan(index, names, q, SUGGESTIONS, SUGGEST_SCORE), [t for t, _ in typos[:brute]]))
+
+    failures = 0
+    for s, c in zip(exact, cased):
+        if index.resolve(s).name != s:
+            failures += 1
+        res = index.resolve(c)
+        if res.name not in (None, s) or (res.name is None and s not in res.suggestions):
+            failures += 1
+    if failures:
+        print(f"  exact / case-variant names: {failures} FAILED")
+    auto = suggested = other = 0
+    for t, s in typos:
+        res = index.resolve(t)
+        if res.name == s:
+            auto += 1
+        elif res.name is not None and name_key(t) not in index._by_key:
+            other += 1  # the typo is closer to someone else (typing another real name doesn't count)
+        elif s in res.suggestions:
+            suggested += 1
+    print(f"  typos: {auto / len(typos):.0%} auto-resolved, {suggested / len(typos):.0%} suggested, "
+          f"{other / len(typos):.1%} resolved to another player")
+
+    checked = [t for t, _ in typos[:brute]]
+    want = [scan(index, names, t, SUGGESTIONS, SUGGEST_SCORE) for t in checked]
+    got = [index.search(t) for t in checked]
+    capped = sum(g != w for g, w in zip(got, want))
+    best_moved = sum(g[:1] != w[:1] for g, w in zip(got, want))
+    cap, name_index.CANDIDATE_CAP = name_index.CANDIDATE_CAP, len(names)
+    mismatched = sum(index.search(t) != w for t, w in zip(checked, want))
+    name_index.CANDIDATE_CAP = cap
+    print(f"  search vs brute force, uncapped: {'OK' if not mismatched else f'{mismatched} differ'}; "
+          f"CANDIDATE_CAP={cap} changed {capped} of {len(checked)} answers ({best_moved} best matches)")
+    failures += mismatched
+
+    # Incremental upkeep ends where a rebuild would
+    removed = rng.sample(names, len(names) // 10)
+    added = [f"{n} the Younger" for n in removed[: len(removed) // 2]]
+    for name in removed:
+        index.remove(name)
+    for name in added:
+        index.add(name)
+    fresh = NameIndex(set(names) - set(removed) | set(added))
+    same = (index._grams == fresh._grams and dict(index._postings) == dict(fresh._postings)
+            and dict(index._by_key) == dict(fresh._by_key))
+    print(f"  add/remove vs rebuild: {'OK' if same else 'MISMATCH'}")
+    failures += not same
+    return failures
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    failures = 0
+    for n in args.players:
+        failures += run(n, args.queries, rng, args.brute)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--players", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--brute", type=int, default=200, help="queries to check against the brute-force scan")
+    parser.add_argument("--seed", type=int, default=1)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,284 @@
+"""
+Benchmark and self-check for outbox.py (rate-limited, chunking message queue).
+
+Runs on scaled time (--speed simulated seconds per real second) against fake
+channels that enforce Discord's message limits: 5 creates per channel per 5 s,
+50 API calls per second for the whole bot, and --rtt per call. Each scenario
+is sent two ways:
+  - direct: every message is its own API call, as discord.py alone would make
+    them: one at a time per channel, and after a 429, none until retry_after
+  - outbox: through Outbox.send()
+and reports API calls, 429s, sends rejected as too long, p50/p99 delivery
+latency and time to drain.
+
+Scenarios:
+  - burst: hundreds of short replies (addMoney-style) to one channel at once
+  - stream: the same volume arriving steadily, faster than a channel allows
+  - fanout: a few messages (text and embeds) to each of many channels, which
+    the global limit paces
+  - long: one addMoney result over 200 players, split at 2000 characters
+Checks that, through the outbox, every message arrives exactly once, in order
+per channel, with no send over 2000 characters and no text lost in splitting.
+
+Needs discord.py installed.
+Usage: python benchmarks/outbox_bench.py [--messages 500] [--channels 200] [--speed 50] [--rtt 0.1]
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CHANNEL_WINDOW = 5.0        # Discord: 5 messages per channel per 5 seconds
+CHANNEL_CALLS = 5
+GLOBAL_CALLS = 50           # per second, whole bot
+
+_ids = itertools.count(10**17)
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+
+
+class TooLong(Exception):
+    """Discord's 400 for content over 2000 characters."""
+
+
+class Clock:
+    """Simulated seconds, running `speed` times faster than the real ones."""
+
+    def __init__(self, speed: float):
+        self.speed = speed
+        self.start = time.monotonic()
+
+    def __call__(self) -> float:
+        return (time.monotonic() - self.start) * self.speed
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds / self.speed)
+
+
+class Discord:
+    """The API's limits: a fixed window per channel and one per second for everything."""
+
+    def __init__(self, clock: Clock, rtt: float):
+        self.clock = clock
+        self.rtt = rtt
+        self.calls = 0
+        self.limited = 0
+        self.rejected = 0
+        self.windows: dict[int, tuple[float, int]] = {}     # channel id -> (window start, calls)
+        self.second = (0, 0)                                # (second, calls)
+
+    async def create_message(self, channel, content, kwargs):
+        now = self.clock()
+        self.calls += 1
+        start, used = self.windows.get(channel.id, (now, 0))
+        if now - start >= CHANNEL_WINDOW:
+            start, used = now, 0
+        second, in_second = self.second
+        if int(now) != second:
+            second, in_second = int(now), 0
+        if used >= CHANNEL_CALLS or in_second >= GLOBAL_CALLS:
+            self.limited += 1
+            raise RateLimited(start + CHANNEL_WINDOW - now if used >= CHANNEL_CALLS else second + 1 - now)
+        if content is not None and len(content) > 2000:
+            self.rejected += 1
+            raise TooLong()
+        self.windows[channel.id] = (start, used + 1)
+        self.second = (second, in_second + 1)
+        await self.clock.sleep(self.rtt)
+        channel.received.append((content, kwargs))
+        return channel.received[-1]
+
+
+class FakeChannel:
+    def __init__(self, api: Discord):
+        self.id = next(_ids)
+        self.api = api
+        self.received: list[tuple] = []
+        self.lock = asyncio.Lock()      # discord.py's per-bucket lock, for the direct sends
+
+    async def send(self, content=None, **kwargs):
+        return await self.api.create_message(self, content, kwargs)
+
+
+# ----------------
+# Senders
+# ----------------
+
+async def send_direct(clock: Clock, channel: FakeChannel, content, **kwargs):
+    async with channel.lock:
+        while True:
+            try:
+                return await channel.send(content, **kwargs)
+            except RateLimited as e:
+                await clock.sleep(e.retry_after)
+
+
+def make_sender(how: str, clock: Clock):
+    if how == "direct":
+        return (lambda channel, content=None, **kwargs: send_direct(clock, channel, content, **kwargs)), None
+    from outbox import Outbox
+    outbox = Outbox(clock=clock, sleep=clock.sleep)
+    return outbox.send, outbox
+
+
+async def deliver(clock: Clock, send, plan: list[tuple[float, FakeChannel, str, dict]]) -> list[float]:
+    """Send each (at, channel, content, kwargs) at its simulated time; simulated seconds until each arrived."""
+    start = clock()
+
+    async def one(at, channel, content, kwargs):
+        wait = start + at - clock()
+        if wait > 0:
+            await clock.sleep(wait)
+        queued = clock()
+        try:
+            await send(channel, content, **kwargs)
+        except TooLong:
+            pass
+        return clock() - queued
+
+    # Created in plan order, so same-time messages queue in order too
+    return sorted(await asyncio.gather(*(one(*p) for p in plan)))
+
+
+def problems(plan, channels) -> list[str]:
+    """Each channel got its messages exactly once and in order; no send too long."""
+    out = []
+    for channel in channels:
+        expected = [content for _, c, content, _ in plan if c is channel]
+        got = []
+        for content, _ in channel.received:
+            if content is not None and len(content) > 2000:
+                out.append(f"channel {channel.id}: a send of {len(content)} characters")
+            got.extend([None] if content is None else content.split("\n"))
+        flat = [line for content in expected for line in ([None] if content is None else content.split("\n"))]
+        if got != flat:
+            out.append(f"channel {channel.id}: {len(got)} lines arrived, expected {len(flat)} (or out of order)")
+    return out
+
+
+# ----------------
+# Scenarios
+# ----------------
+
+def burst(args, api):
+    channel = FakeChannel(api)
+    plan = [(0.0, channel, f"Added 5 gp to Player{i:04d}. Now at {1000 + i} gp.", {})
+            for i in range(args.messages)]
+    return plan, [channel]
+
+
+def stream(args, api):
+    """--messages spread over a minute: several a second into a channel that takes one."""
+    channel = FakeChannel(api)
+    gap = 60.0 / args.messages
+    plan = [(i * gap, channel, f"Player{i:04d} now has {i % 40} QP.", {}) for i in range(args.messages)]
+    return plan, [channel]
+
+
+def fanout(args, api):
+    import discord
+    channels = [FakeChannel(api) for _ in range(args.channels)]
+    plan = []
+    for round_ in range(3):
+        for channel in channels:
+            if round_ == 1:
+                plan.append((0.0, channel, None, {"embed": discord.Embed(title="Player info")}))
+            else:
+                plan.append((0.0, channel, f"Quest {round_} posted.", {}))
+    return plan, channels
+
+
+def long_result(args, api, rng: random.Random):
+    channel = FakeChannel(api)
+    lines = [f"Added {rng.randint(1, 500)} gp to Player{i:04d} ({rng.choice(['Sir ', 'Lady ', ''])}"
+             f"{'x' * rng.randint(5, 40)}). Now at {rng.randint(0, 10**6)} gp." for i in range(200)]
+    return [(0.0, channel, "\n".join(lines), {})], [channel]
+
+
+async def run_scenario(name: str, build, args):
+    print(f"\n{name}")
+    print(f"  {'':<8} {'API calls':>10} {'429s':>6} {'rejected':>9} {'p50 s':>8} {'p99 s':>8} {'drained s':>10}")
+    failures = 0
+    for how in ("direct", "outbox"):
+        clock = Clock(args.speed)
+        api = Discord(clock, args.rtt)
+        plan, channels = build(api)
+        send, outbox = make_sender(how, clock)
+        start = clock()
+        latency = await deliver(clock, send, plan)
+        if outbox is not None:
+            await outbox.flush()
+        drained = clock() - start
+        p99 = latency[min(len(latency) - 1, int(len(latency) * 0.99))]
+        print(f"  {how:<8} {api.calls:>10} {api.limited:>6} {api.rejected:>9} {statistics.median(latency):>8.2f} "
+              f"{p99:>8.2f} {drained:>10.1f}")
+        if outbox is not None:
+            found = problems(plan, channels)
+            for p in found[:3]:
+                print(f"    - {p}")
+            failures += len(found)
+    return failures
+
+
+def check_chunks(rng: random.Random) -> int:
+    """chunks() on awkward input: pieces fit, aren't blank, and lose nothing but the line breaks/spaces cut at."""
+    from outbox import MESSAGE_LIMIT, chunks
+    bad = 0
+    samples = [
+        "\n".join(f"line {i} " + "y" * rng.randint(0, 120) for i in range(400)),
+        "word " * 1000,                             # one long line with spaces
+        "z" * 4500,                                 # one long line without
+        "short",
+        ("a" * 1999 + "\n") * 3,
+    ]
+    for text in samples:
+        pieces = chunks(text)
+        if any(len(p) > MESSAGE_LIMIT or not p.strip() for p in pieces):
+            bad += 1
+        if "".join(text.split()) != "".join("".join(pieces).split()):
+            bad += 1
+    return bad
+
+
+async def main(args):
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        # config.py opens discord.log in the working directory; keep it out of the repo
+        os.chdir(tmp)
+        print(f"{args.messages} messages, {args.channels} channels, {args.rtt * 1000:.0f} ms per call, "
+              f"time x{args.speed:g}")
+        failures = 0
+        failures += await run_scenario(f"burst: {args.messages} replies to one channel at once",
+                                       lambda api: burst(args, api), args)
+        failures += await run_scenario(f"stream: {args.messages} replies to one channel over 60 s",
+                                       lambda api: stream(args, api), args)
+        failures += await run_scenario(f"fanout: 3 messages (1 embed) to each of {args.channels} channels",
+                                       lambda api: fanout(args, api), args)
+        failures += await run_scenario("long: one 200-player addMoney result",
+                                       lambda api: long_result(args, api, random.Random(args.seed)), args)
+        bad = check_chunks(rng)
+        print(f"\nchunks() on awkward input: {'OK' if not bad else f'{bad} wrong'}")
+        failures += bad
+    print("delivery: " + ("OK" if not failures else f"{failures} problem(s)"))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--channels", type=int, default=200)
+    parser.add_argument("--speed", type=float, default=50, help="simulated seconds per real second")
+    parser.add_argument("--rtt", type=float, default=0.1, help="simulated seconds per API call")
+    parser.add_argument("--seed", type=int, default=1)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,89 @@
+"""
+FTS5 quest search vs a plain LIKE '%term%' scan.
+
+Seeds N quests with random words, spread over G guilds, then times the same
+set of search terms, in one guild, through quest_search.search() and through
+the LIKE query players would otherwise need.
+
+Usage: python benchmarks/quest_search_bench.py [quests] [guilds]
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import quest_search  # noqa: E402
+from config import QUEST_BOARD_TABLE  # noqa: E402
+
+WORDS = (
+    "goblin dragon bandit caravan crypt shrine harbor smuggler ritual tower swamp relic "
+    "escort merchant wolves bridge mine lich orchard festival heist ferry beacon ruins "
+    "tithe plague serpent monastery census duel tournament famine ogre warlock"
+).split()
+QUERIES = ["goblin", "lich tower", "caravan escort", "plague", "smug", "zzzznothing"]
+REPEAT = 20
+
+
+def vocabulary(rng) -> list[str]:
+    """The theme words plus ~5000 made-up ones, so a term matches ~1% of quests like real text."""
+    syllables = "ka ro mi den tal vor esh ul bri gan tho sel mar ny qua fen dro lis".split()
+    made_up = {"".join(rng.choices(syllables, k=3)) for _ in range(8000)}
+    return WORDS + sorted(made_up)[:5000]
+
+
+def seed(conn, n: int, guilds: int):
+    rng = random.Random(1)
+    words = vocabulary(rng)
+    conn.execute(f"CREATE TABLE {QUEST_BOARD_TABLE} (NAME TEXT, TYPE TEXT, DESCRIPTION TEXT, GUILD_ID INTEGER)")
+    conn.executemany(
+        f"INSERT INTO {QUEST_BOARD_TABLE} VALUES (?, 'U', ?, ?)",
+        (
+            (" ".join(rng.choices(words, k=3)).title(), " ".join(rng.choices(words, k=60)), i % guilds)
+            for i in range(n)
+        )
+    )
+    conn.commit()
+
+
+def like_search(conn, guild_id: int, terms: str):
+    clauses, params = ["GUILD_ID = ?"], [guild_id]
+    for word in terms.split():
+        clauses.append("(NAME LIKE ? OR DESCRIPTION LIKE ?)")
+        params += [f"%{word}%", f"%{word}%"]
+    return conn.execute(
+        f"SELECT ID, NAME, TYPE FROM {QUEST_BOARD_TABLE} WHERE {' AND '.join(clauses)} LIMIT ?",
+        (*params, quest_search.RESULT_LIMIT)
+    ).fetchall()
+
+
+def timed(fn, conn, terms) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fn(conn, 0, terms)
+    return (time.perf_counter() - start) / REPEAT * 1000
+
+
+def main(n: int, guilds: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, "bench.db"))
+        conn.row_factory = sqlite3.Row
+        seed(conn, n, guilds)
+
+        start = time.perf_counter()
+        quest_search.add_quest_ids(conn)  # the table and index as migrations.py leaves them
+        conn.commit()
+        print(f"{n} quests in {guilds} guild(s), index build {time.perf_counter() - start:.2f}s\n")
+
+        print(f"{'query':<16} {'fts5 ms':>9} {'like ms':>9}")
+        for terms in QUERIES:
+            fts_ms = timed(quest_search.search, conn, terms)
+            like_ms = timed(like_search, conn, terms)
+            print(f"{terms:<16} {fts_ms:>9.3f} {like_ms:>9.3f}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000, int(sys.argv[2]) if len(sys.argv) > 2 else 1)
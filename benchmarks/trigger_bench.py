@@ -0,0 +1,88 @@
+"""
+Compiled trigger engine vs one `phrase in text` check per trigger.
+
+Builds N random trigger phrases and a stream of chat-sized messages (a small
+share of which contain a trigger), then reports messages/second through:
+  naive:    lowercase + `p in text` for every phrase (the old on_message shape)
+  compiled: trigger_engine.TriggerEngine.matches (one trie-shaped regex scan)
+
+Usage: python benchmarks/trigger_bench.py [triggers ...]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from trigger_engine import Trigger, TriggerEngine  # noqa: E402
+
+MESSAGES = 5000
+HIT_RATE = 0.05
+# Trigger phrases and ordinary chat draw on different syllables, so only the planted hits match
+TRIGGER_SYLLABLES = "ka ro mi den tal vor esh ul bri gan tho sel mar ny qua fen dro lis".split()
+CHAT_SYLLABLES = "the an pe wo sto ig ha le op un ce bo ri ad ju we".split()
+
+
+def word(rng, syllables: list[str]) -> str:
+    return "".join(rng.choices(syllables, k=rng.randint(2, 4)))
+
+
+def phrases(rng, n: int) -> list[str]:
+    out = set()
+    while len(out) < n:
+        out.add(" ".join(word(rng, TRIGGER_SYLLABLES) for _ in range(rng.randint(1, 3))))
+    return sorted(out)
+
+
+def messages(rng, pats: list[str]) -> list[str]:
+    out = []
+    for _ in range(MESSAGES):
+        words = [word(rng, CHAT_SYLLABLES) for _ in range(rng.randint(5, 30))]
+        if rng.random() < HIT_RATE:
+            words.insert(rng.randrange(len(words)), rng.choice(pats).upper())
+        out.append(" ".join(words))
+    return out
+
+
+def naive(pats: list[str], msgs: list[str]) -> int:
+    hits = 0
+    for m in msgs:
+        text = m.lower()
+        for p in pats:
+            if p in text:
+                hits += 1
+                break
+    return hits
+
+
+def compiled(engine: TriggerEngine, msgs: list[str]) -> int:
+    return sum(1 for m in msgs if engine.matches(m))
+
+
+def main(sizes: list[int]):
+    print(f"{MESSAGES} messages, {HIT_RATE:.0%} contain a trigger\n")
+    print(f"{'triggers':>9} {'compile ms':>11} {'naive msg/s':>12} {'compiled msg/s':>15} {'speedup':>8}")
+    for n in sizes:
+        rng = random.Random(n)
+        pats = phrases(rng, n)
+        msgs = messages(rng, pats)
+
+        engine = TriggerEngine()
+        start = time.perf_counter()
+        engine.compile(Trigger(i, p, "", 0) for i, p in enumerate(pats))
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        naive_hits = naive(pats, msgs)
+        naive_rate = MESSAGES / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        compiled_hits = compiled(engine, msgs)
+        compiled_rate = MESSAGES / (time.perf_counter() - start)
+
+        assert naive_hits == compiled_hits, (naive_hits, compiled_hits)
+        print(f"{n:>9} {compile_ms:>11.1f} {naive_rate:>12.0f} {compiled_rate:>15.0f} {compiled_rate / naive_rate:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10, 100, 1000, 5000])
@@ -0,0 +1,99 @@
+"""
+Startup time and memory: old threaded Flask keep-alive vs webserver.py (aiohttp).
+
+Each variant runs in a fresh interpreter that first imports discord (the bot
+pays that either way), then starts its web server. Reported: time from process
+start until GET / answers, resident memory and thread count once serving, and
+the same numbers for a discord-only baseline so the server's own cost shows.
+
+Needs discord.py, aiohttp and flask importable. Usage: python benchmarks/webserver_bench.py
+"""
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PORT = 18080
+RUNS = 3
+
+BASELINE = """
+import discord, time
+from http.server import HTTPServer, BaseHTTPRequestHandler
+# Stand-in listener so the harness can tell the interpreter is up; not counted as a web stack
+class H(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200); self.end_headers(); self.wfile.write(b"ok")
+    def log_message(self, *a): pass
+HTTPServer(("127.0.0.1", {port}), H).serve_forever()
+"""
+
+FLASK = """
+import discord, time
+from flask import Flask
+from threading import Thread
+
+app = Flask('')
+@app.route('/')
+def home():
+    return "Hello. I am alive!"
+
+Thread(target=lambda: app.run(host='127.0.0.1', port={port})).start()
+while True:
+    time.sleep(3600)
+"""
+
+AIOHTTP = """
+import sys; sys.path.insert(0, {root!r})
+import asyncio, discord
+from aiohttp import web
+import webserver
+
+async def main():
+    runner = web.AppRunner(webserver.create_app(None), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", {port}).start()
+    await asyncio.Event().wait()
+
+asyncio.run(main())
+"""
+
+
+def proc_status(pid: int) -> dict:
+    with open(f"/proc/{pid}/status") as f:
+        fields = dict(line.split(":", 1) for line in f)
+    return {"rss_mb": int(fields["VmRSS"].split()[0]) / 1024, "threads": int(fields["Threads"])}
+
+
+def measure(source: str) -> dict:
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-c", source.format(port=PORT, root=ROOT)],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{PORT}/", timeout=1).read()
+                break
+            except OSError:
+                if proc.poll() is not None:
+                    raise RuntimeError("server exited; are discord.py, aiohttp and flask installed?")
+                time.sleep(0.005)
+        ready = time.perf_counter() - start
+        time.sleep(0.2)
+        return {"ready_ms": ready * 1000, **proc_status(proc.pid)}
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def main():
+    print(f"{'variant':<10} {'ready ms':>9} {'RSS MB':>8} {'threads':>8}")
+    for name, source in (("baseline", BASELINE), ("flask", FLASK), ("aiohttp", AIOHTTP)):
+        runs = [measure(source) for _ in range(RUNS)]
+        best = min(runs, key=lambda r: r["ready_ms"])
+        print(f"{name:<10} {best['ready_ms']:>9.0f} {best['rss_mb']:>8.1f} {best['threads']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+import contextlib
+import csv
+import io
+import json
+import tempfile
+from typing import Any, Callable, Iterator, NamedTuple, Optional
+
+from config import PLAYER_INFO_TABLE, QUEST_BOARD_TABLE
+from currency import CURRENCY
+import ledger
+from player_identity import name_key
+import quest_search
+
+# bulk_io.py
+#
+# Bulk import/export of players and quests as CSV or JSON files.
+#
+# Imports are parsed as a stream (csv.reader / an incremental JSON decoder),
+# validated row by row and fed straight into ONE executemany inside the
+# caller's Database.write, so a whole campaign is a single transaction: any bad
+# row rolls everything back and the GM gets the first few problems with their
+# line/item numbers. Exports walk a cursor in batches into a spooled temp file
+# (memory until SPOOL_MAX_BYTES, disk after), so neither direction ever holds
+# the whole table as Python objects.
+#
+# Both tables are partitioned by GUILD_ID: a file is imported into, and
+# exported from, the guild the command ran in.
+
+# Discord caps attachments anyway; refuse anything bigger before downloading it
+MAX_IMPORT_BYTES = 25 * 1024 * 1024
+IMPORT_ERRORS_SHOWN = 10
+EXPORT_BATCH = 1000
+SPOOL_MAX_BYTES = 1024 * 1024
+JSON_CHUNK = 64 * 1024
+
+# Fields left out of an imported player row default to what !addPlayer gives
+NEW_PLAYER_LEVEL = 2
+NEW_PLAYER_COINS = {"gp": 10}
+# Who import_rows() records as the actor when not called for a command
+SCRIPT_ACTOR = (None, "import", "import")
+
+REQUIRED = object()
+
+
+class BulkImportError(ValueError):
+    """Import rejected (and rolled back). `errors` holds the first few problems."""
+
+    def __init__(self, errors: list[str], bad_rows: int = 1):
+        super().__init__(errors[0] if errors else "Import failed")
+        self.errors = errors
+        self.bad_rows = bad_rows
+
+
+class ImportResult(NamedTuple):
+    inserted: int
+    skipped: int    # rows whose key already exists in the table
+
+
+class Field(NamedTuple):
+    column: str
+    names: tuple            # accepted header/key spellings (lowercase); names[0] is what we export
+    parse: Callable[[Any], Any]
+    default: Any = REQUIRED
+
+
+class TableSpec(NamedTuple):
+    name: str
+    table: str
+    fields: tuple
+    key: Optional[str] = None     # column unique per guild; rows whose key exists are skipped
+    order_by: str = "ROWID"
+    export_extra: tuple = ()      # (header, SQL expression) exported before the fields, ignored on import
+    derived: tuple = ()           # (column, source column, fn) filled in on import from another field
+    bulk_insert: Optional[Callable] = None  # context manager (given conn) wrapped around the insert
+    after_insert: Optional[Callable] = None  # (conn, guild_id, max ROWID before the insert, *actor) once it's done
+
+
+# ----------------
+# Field parsers
+# ----------------
+
+def _text(value) -> str:
+    return str(value).strip()
+
+
+def _name(value) -> str:
+    text = _text(value)
+    if not text:
+        raise ValueError("must not be blank")
+    return text
+
+
+def _count(value) -> int:
+    if isinstance(value, bool):
+        raise ValueError(f"{value!r} is not a whole number")
+    try:
+        n = int(value) if not isinstance(value, str) else int(value.strip())
+    except (TypeError, ValueError):
+        raise ValueError(f"{value!r} is not a whole number") from None
+    if n < 0:
+        raise ValueError("must not be negative")
+    return n
+
+
+def _quest_type(value) -> str:
+    # Same rule as !addQuest
+    return _text(value).upper()[:1] or "U"
+
+
+PLAYERS = TableSpec(
+    name="players",
+    table=PLAYER_INFO_TABLE,
+    fields=(
+        Field("PLAYER", ("player", "name"), _name),
+        Field("LEVEL", ("level",), _count, NEW_PLAYER_LEVEL),
+        *(Field(d.column, (d.code, d.attr, d.column.lower()), _count, NEW_PLAYER_COINS.get(d.code, 0))
+          for d in CURRENCY.denominations),
+        Field("QUEST_POINTS", ("quest_points", "qp"), _count, 0),
+    ),
+    key="PLAYER",
+    order_by="PLAYER",
+    derived=(("NAME_KEY", "PLAYER", name_key),),
+    # Starting coins go on the ledger like !addPlayer's
+    after_insert=ledger.open_accounts,
+)
+
+QUESTS = TableSpec(
+    name="quests",
+    table=QUEST_BOARD_TABLE,
+    fields=(
+        Field("NAME", ("name", "title"), _name),
+        Field("TYPE", ("type",), _quest_type, "U"),
+        Field("DESCRIPTION", ("description",), _text, ""),
+    ),
+    order_by="ID",
+    export_extra=(("id", "ID"),),
+    bulk_insert=quest_search.bulk_insert,
+)
+
+TABLES = {spec.name: spec for spec in (PLAYERS, QUESTS)}
+FORMATS = ("csv", "json")
+
+
+# ----------------
+# Reading
+# ----------------
+
+def detect_format(filename: str, head: bytes) -> str:
+    """csv or json, from the extension, else from the first non-blank byte."""
+    ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if ext == "csv":
+        return "csv"
+    if ext in ("json", "jsonl", "ndjson"):
+        return "json"
+    return "json" if head.lstrip(b"\xef\xbb\xbf \t\r\n")[:1] in (b"[", b"{") else "csv"
+
+
+def _iter_csv(text) -> Iterator[tuple[str, dict]]:
+    reader = csv.reader(text)
+    header = next(reader, None)
+    if header is None:
+        return
+    keys = [h.strip().lower() for h in header]
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        if len(row) > len(keys):
+            raise BulkImportError([f"line {reader.line_num}: {len(row)} cells but {len(keys)} headers"])
+        yield f"line {reader.line_num}", dict(zip(keys, row))
+
+
+def _iter_json(text) -> Iterator[tuple[str, dict]]:
+    """
+    Each object of a top-level JSON array, or of a JSON Lines file, decoded
+    JSON_CHUNK characters at a time.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def more() -> bool:
+        nonlocal buf, pos, eof
+        chunk = "" if eof else text.read(JSON_CHUNK)
+        if not chunk:
+            eof = True
+            return False
+        buf, pos = buf[pos:] + chunk, 0
+        return True
+
+    def peek() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos].isspace():
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if not more():
+                return ""
+
+    array = peek() == "["
+    if array:
+        pos += 1
+    item = 0
+    while True:
+        c = peek()
+        if not c:
+            if array:
+                raise BulkImportError(["the JSON array is never closed"])
+            return
+        if array and c == "]" and item == 0:
+            return
+        item += 1
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as e:
+                if more():
+                    continue
+                raise BulkImportError([f"item {item}: invalid JSON ({e.msg})"]) from None
+            if end < len(buf) or eof or isinstance(value, (dict, list)):
+                break
+            more()  # a bare number may continue in the next chunk
+        pos = end
+        if not isinstance(value, dict):
+            raise BulkImportError([f"item {item}: expected an object, got {type(value).__name__}"])
+        yield f"item {item}", {str(k).strip().lower(): v for k, v in value.items()}
+
+        if array:
+            c = peek()
+            if c == ",":
+                pos += 1
+            elif c == "]":
+                return
+            else:
+                raise BulkImportError([f"item {item}: expected ',' or ']' after it"])
+
+
+def iter_records(stream, fmt: str) -> Iterator[tuple[str, dict]]:
+    """(where, {lowercased key: raw value}) for every row of a binary stream."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        yield from (_iter_csv(text) if fmt == "csv" else _iter_json(text))
+    except UnicodeDecodeError:
+        raise BulkImportError(["the file is not UTF-8 text"]) from None
+    except csv.Error as e:
+        raise BulkImportError([f"malformed CSV: {e}"]) from None
+    finally:
+        text.detach()
+
+
+def convert(spec: TableSpec, raw: dict) -> tuple:
+    """One row's column values, in spec.fields order. ValueError names the bad field."""
+    values = []
+    for field in spec.fields:
+        value = next((raw[n] for n in field.names if n in raw), None)
+        if value is None or value == "":
+            if field.default is REQUIRED:
+                raise ValueError(f"missing {field.names[0]}")
+            values.append(field.default)
+            continue
+        try:
+            values.append(field.parse(value))
+        except ValueError as e:
+            raise ValueError(f"{field.names[0]} {e}") from None
+    return tuple(values)
+
+
+# ----------------
+# Import / export (call inside Database.write / Database.read)
+# ----------------
+
+def import_rows(conn, spec: TableSpec, guild_id: int, stream, fmt: str,
+                actor: tuple = SCRIPT_ACTOR) -> ImportResult:
+    """
+    Validate and insert every row of `stream` in the caller's transaction.
+    Raises BulkImportError (so Database.write rolls back) if any row is bad.
+    `actor` is (actor_id, actor name, command), as for ledger.record.
+    """
+    columns = [f.column for f in spec.fields]
+    key_at = columns.index(spec.key) if spec.key else None
+    derived = [(columns.index(source), fn) for _, source, fn in spec.derived]
+    columns += [column for column, _, _ in spec.derived] + ["GUILD_ID"]
+    # Existing keys are left to the unique index (ON CONFLICT); only the file's own are tracked
+    on_conflict = f" ON CONFLICT (GUILD_ID, {spec.key}) DO NOTHING" if spec.key else ""
+    seen = set()
+    errors: list[str] = []
+    bad = valid = 0
+    if spec.after_insert:
+        last = conn.execute(f"SELECT COALESCE(MAX(ROWID), 0) FROM {spec.table}").fetchone()[0]
+
+    def rows():
+        nonlocal bad, valid
+        for where, raw in iter_records(stream, fmt):
+            try:
+                values = convert(spec, raw)
+                if key_at is not None:
+                    key = values[key_at]
+                    if key in seen:
+                        raise ValueError(f"{key} appears more than once")
+                    seen.add(key)
+            except ValueError as e:
+                bad += 1
+                if len(errors) < IMPORT_ERRORS_SHOWN:
+                    errors.append(f"{where}: {e}")
+                continue
+            valid += 1
+            if not bad:
+                # keep validating after the first error, but stop inserting
+                yield values + tuple(fn(values[at]) for at, fn in derived) + (guild_id,)
+
+    with spec.bulk_insert(conn) if spec.bulk_insert else contextlib.nullcontext():
+        cur = conn.executemany(
+            f"INSERT INTO {spec.table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+            f"{on_conflict}",
+            rows()
+        )
+    if bad:
+        raise BulkImportError(errors, bad)
+    if spec.after_insert:
+        spec.after_insert(conn, guild_id, last, *actor)
+    inserted = max(cur.rowcount, 0)
+    return ImportResult(inserted, valid - inserted)
+
+
+def export_rows(conn, spec: TableSpec, guild_id: int, fmt: str):
+    """
+    One guild's rows as a CSV/JSON file, written a batch at a time into a
+    spooled temp file. Returns (binary file positioned at 0, row count, size in bytes).
+    """
+    headers = [h for h, _ in spec.export_extra] + [f.names[0] for f in spec.fields]
+    exprs = [e for _, e in spec.export_extra] + [f.column for f in spec.fields]
+    cur = conn.execute(
+        f"SELECT {', '.join(exprs)} FROM {spec.table} WHERE GUILD_ID = ? ORDER BY {spec.order_by}", (guild_id,)
+    )
+
+    out = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="")
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(text)
+        writer.writerow(headers)
+        while batch := cur.fetchmany(EXPORT_BATCH):
+            writer.writerows(tuple(r) for r in batch)
+            count += len(batch)
+    else:
+        text.write("[")
+        while batch := cur.fetchmany(EXPORT_BATCH):
+            text.write(("," if count else "") + "\n" + ",\n".join(
+                json.dumps(dict(zip(headers, r)), ensure_ascii=False) for r in batch
+            ))
+            count += len(batch)
+        text.write("\n]\n")
+    text.flush()
+    text.detach()
+    size = out.tell()
+    out.seek(0)
+    return out, count, size
+
+
+# ----------------
+# Discord glue
+# ----------------
+
+async def import_attachment(db, ctx, spec: TableSpec, attachment=None) -> Optional[ImportResult]:
+    """
+    Import a CSV/JSON file into `spec`'s table (ctx's guild) in one transaction:
+    `attachment` (a discord.Attachment, e.g. a slash command's file option), else
+    the first file attached to ctx.message. Replies with the problem and returns
+    None if it can't.
+    """
+    if attachment is None:
+        if not ctx.message.attachments:
+            await ctx.reply(f"Attach a CSV or JSON file of {spec.name} to import.")
+            return None
+        attachment = ctx.message.attachments[0]
+    if attachment.size > MAX_IMPORT_BYTES:
+        await ctx.reply(f"`{attachment.filename}` is too big ({attachment.size // 1024 // 1024} MB).")
+        return None
+
+    data = await attachment.read()
+    fmt = detect_format(attachment.filename, data[:64])
+    try:
+        actor = (ctx.author.id, str(ctx.author.display_name), str(ctx.command))
+        return await db.write(import_rows, spec, ctx.guild.id, io.BytesIO(data), fmt, actor)
+    except BulkImportError as e:
+        shown = "\n".join(f"• {msg}" for msg in e.errors)
+        more = e.bad_rows - len(e.errors)
+        await ctx.reply(
+            f"Nothing imported from `{attachment.filename}`:\n{shown}"
+            + (f"\n…and {more} more bad row(s)." if more > 0 else "")
+        )
+        return None
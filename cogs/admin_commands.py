@@ -1,8 +1,67 @@
 from discord.ext import commands
 import discord
 import asyncio
+import time
 from datetime import datetime, timedelta
-from config import GM_ROLE, logging, DETROIT, DATE_FORMAT, THE_CROSSROADS
+from config import (logging, DETROIT, DATE_FORMAT, LEGACY_GUILD,
+                    DOWNTIME_POLL_TABLE, DOWNTIME_VOTE_TABLE)
+from database import Database
+from guild_config import SETTINGS, gm_only, mention, parse_id
+from scheduler import Scheduler
+import bulk_io
+
+# Scheduler job kind that closes a downtime poll
+POLL_CLOSE_JOB = "downtime_poll_close"
+
+ACTIONS = [
+    ("🛠️", "Train a Trade"),
+    ("🎲", "Odd Job"),
+    ("🔮", "Craft an Item"),
+    ("🪙", "Do Your Day Job"),
+    ("💞", "Build Relationships"),
+]
+
+def _emoji_key(emoji) -> str:
+    """Reaction emoji as a comparable string (Discord may drop the U+FE0F variation selector)."""
+    return str(emoji).replace("\ufe0f", "")
+
+# Normalized emoji -> (emoji, label)
+ACTION_BY_KEY = {_emoji_key(e): (e, label) for e, label in ACTIONS}
+# Emoji -> position in ACTIONS, for ordering each user's choices
+ACTION_ORDER = {e: i for i, (e, _) in enumerate(ACTIONS)}
+
+# !perf listing sizes
+PERF_STALLS_SHOWN = 3
+PERF_COMMANDS_SHOWN = 5
+
+# Guild.query_members accepts at most 100 user ids per request
+MEMBER_QUERY_CHUNK = 100
+MEMBER_QUERY_CONCURRENCY = 3
+
+def _load_open_polls(conn):
+    polls = {r[0]: (r[1], r[2]) for r in conn.execute(
+        f"SELECT MESSAGE_ID, CLOSES_AT, GUILD_ID FROM {DOWNTIME_POLL_TABLE} WHERE CLOSED = 0"
+    )}
+    votes = conn.execute(
+        f"SELECT v.MESSAGE_ID, v.USER_ID, v.EMOJI FROM {DOWNTIME_VOTE_TABLE} v "
+        f"JOIN {DOWNTIME_POLL_TABLE} p ON p.MESSAGE_ID = v.MESSAGE_ID WHERE p.CLOSED = 0"
+    ).fetchall()
+    return polls, votes
+
+def _load_votes(conn, message_id: int) -> dict[int, set[str]]:
+    votes: dict[int, set[str]] = {}
+    for uid, key in conn.execute(
+        f"SELECT USER_ID, EMOJI FROM {DOWNTIME_VOTE_TABLE} WHERE MESSAGE_ID = ?", (message_id,)
+    ):
+        votes.setdefault(uid, set()).add(key)
+    return votes
+
+def _replace_votes(conn, message_id: int, votes: dict[int, set[str]]):
+    conn.execute(f"DELETE FROM {DOWNTIME_VOTE_TABLE} WHERE MESSAGE_ID = ?", (message_id,))
+    conn.executemany(
+        f"INSERT INTO {DOWNTIME_VOTE_TABLE} (MESSAGE_ID, USER_ID, EMOJI) VALUES (?, ?, ?)",
+        [(message_id, uid, key) for uid, keys in votes.items() for key in keys]
+    )
 
 
 class AdminCommands(commands.Cog, name="Admin Commands"):
@@ -10,22 +69,311 @@ class AdminCommands(commands.Cog, name="Admin Commands"):
 
     def __init__(self, bot):
         self.bot = bot
+        self.db: Database = bot.db
+        self.scheduler: Scheduler = bot.scheduler
+        # Closing is a persisted job, so polls still close after a restart
+        self.scheduler.register(POLL_CLOSE_JOB, self.close_weekly_job)
+
+        # Live tallies for open polls: message_id -> user_id -> {emoji key}
+        # Kept current from raw reaction events and mirrored to DOWNTIME_VOTE_TABLE.
+        self.tallies: dict[int, dict[int, set[str]]] = {}
+        self.closes_at: dict[int, float] = {}
+        self.poll_guild: dict[int, int] = {}    # message_id -> guild it was posted in
+        # Polls carried over from a previous run may have missed events while we were offline
+        self._unreconciled: set[int] = set()
+
+    async def cog_load(self):
+        polls, votes = await self.db.read(_load_open_polls)
+        self.closes_at = {mid: closes for mid, (closes, _) in polls.items()}
+        self.poll_guild = {mid: guild_id for mid, (_, guild_id) in polls.items()}
+        self.tallies = {mid: {} for mid in polls}
+        for mid, uid, key in votes:
+            self.tallies[mid].setdefault(uid, set()).add(key)
+        self._unreconciled = set(polls)
+
+    # ----------------
+    # Live reaction tally
+    # ----------------
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+        votes = self.tallies.get(payload.message_id)
+        key = _emoji_key(payload.emoji)
+        if votes is None or key not in ACTION_BY_KEY:
+            return
+        if payload.user_id == self.bot.user.id or (payload.member and payload.member.bot):
+            return
+        votes.setdefault(payload.user_id, set()).add(key)
+        await self.db.execute(
+            f"INSERT OR IGNORE INTO {DOWNTIME_VOTE_TABLE} (MESSAGE_ID, USER_ID, EMOJI) VALUES (?, ?, ?)",
+            (payload.message_id, payload.user_id, key)
+        )
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
+        votes = self.tallies.get(payload.message_id)
+        key = _emoji_key(payload.emoji)
+        if votes is None or key not in votes.get(payload.user_id, ()):
+            return
+        votes[payload.user_id].discard(key)
+        if not votes[payload.user_id]:
+            del votes[payload.user_id]
+        await self.db.execute(
+            f"DELETE FROM {DOWNTIME_VOTE_TABLE} WHERE MESSAGE_ID = ? AND USER_ID = ? AND EMOJI = ?",
+            (payload.message_id, payload.user_id, key)
+        )
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # Catch up on anything that happened while we were offline
+        for message_id in list(self._unreconciled):
+            row = await self.db.fetchone(
+                f"SELECT CHANNEL_ID FROM {DOWNTIME_POLL_TABLE} WHERE MESSAGE_ID = ?", (message_id,)
+            )
+            if row is None:
+                continue
+            try:
+                await self.reconcile(row["CHANNEL_ID"], message_id)
+            except Exception as e:
+                logging.exception("Failed to reconcile poll %s: %s", message_id, e)
+
+    async def reconcile(self, channel_id: int, message_id: int):
+        """Rebuild one poll's tally from a full refetch of its reactions (slow path)."""
+        channel = self.bot.get_channel(channel_id) or await self.bot.fetch_channel(channel_id)
+        poll_message = await channel.fetch_message(message_id)
+
+        votes: dict[int, set[str]] = {}
+        for react in poll_message.reactions:
+            key = _emoji_key(react.emoji)
+            if key not in ACTION_BY_KEY:
+                continue
+            async for user in react.users(limit=None):
+                if getattr(user, "bot", False):
+                    continue
+                votes.setdefault(user.id, set()).add(key)
+
+        self.tallies[message_id] = votes
+        self._unreconciled.discard(message_id)
+        await self.db.write(_replace_votes, message_id, votes)
+
+    async def _resolve_members(self, guild, user_ids) -> dict[int, discord.Member]:
+        """
+        Resolve many user ids to members: member cache first, then the rest in
+        chunked gateway queries (a few at a time) instead of one HTTP fetch each.
+        """
+        if guild is None:
+            return {}
+        found: dict[int, discord.Member] = {}
+        missing = []
+        for uid in user_ids:
+            member = guild.get_member(uid)
+            if member is not None:
+                found[uid] = member
+            else:
+                missing.append(uid)
+        if not missing:
+            return found
+
+        limiter = asyncio.Semaphore(MEMBER_QUERY_CONCURRENCY)
+
+        async def query(chunk):
+            async with limiter:
+                try:
+                    return await guild.query_members(user_ids=chunk, limit=len(chunk), cache=True)
+                except Exception as e:
+                    logging.exception("Member query failed for %d user(s): %s", len(chunk), e)
+                    return []
+
+        chunks = [missing[i:i + MEMBER_QUERY_CHUNK] for i in range(0, len(missing), MEMBER_QUERY_CHUNK)]
+        for members in await asyncio.gather(*(query(c) for c in chunks)):
+            for member in members:
+                found[member.id] = member
+        return found
+
+    @commands.Cog.listener()
+    async def on_guild_adopt(self, guild):
+        # Polls from before multi-guild support belong to the guild that just claimed them
+        for message_id, guild_id in self.poll_guild.items():
+            if guild_id == LEGACY_GUILD:
+                self.poll_guild[message_id] = guild.id
+
+    @commands.command()
+    @gm_only()
+    async def pollStatus(self, ctx):
+        """(GM only) Live vote counts for every open downtime poll on this server."""
+        polls = [mid for mid in self.tallies if self.poll_guild.get(mid) == ctx.guild.id]
+        if not polls:
+            await ctx.reply("No downtime polls are open.")
+            return
+
+        embed = discord.Embed(title="Open Downtime Polls", color=0xFF8800)
+        for message_id in polls:
+            votes = self.tallies[message_id]
+            counts = {key: 0 for key in ACTION_BY_KEY}
+            for keys in votes.values():
+                for key in keys:
+                    counts[key] += 1
+            closes = datetime.fromtimestamp(self.closes_at[message_id], DETROIT).strftime("%I:%M %p")
+            lines = [f"{ACTION_BY_KEY[k][0]} {ACTION_BY_KEY[k][1]}: **{n}**" for k, n in counts.items()]
+            lines.append(f"Respondents: **{len(votes)}** • Closes {closes} ET")
+            if message_id in self._unreconciled:
+                lines.append("_Counts may be stale (not yet reconciled after restart)._")
+            embed.add_field(name=f"Poll {message_id}", value="\n".join(lines), inline=False)
+        await ctx.reply(embed=embed, mention_author=False)
+
+    @commands.command()
+    @gm_only()
+    async def perf(self, ctx):
+        """(GM only) Event-loop lag, recent stalls and the slowest commands."""
+        watchdog = self.bot.watchdog
+        embed = discord.Embed(title="Bot Performance", color=0xFF8800)
+        embed.add_field(
+            name="Event loop",
+            value=(
+                f"Lag: **{watchdog.last_lag * 1000:.1f} ms** now, **{watchdog.max_lag * 1000:.1f} ms** worst\n"
+                f"Stalls over {watchdog.stall_threshold * 1000:.0f} ms: **{watchdog.stall_count}**"
+            ),
+            inline=False
+        )
+        outbox = self.bot.outbox
+        embed.add_field(
+            name="Outbox",
+            value=(
+                f"Queued now: **{outbox.backlog()}**\n"
+                f"Messages: **{outbox.queued}** in, **{outbox.sent}** sends, **{outbox.failed}** failed"
+            ),
+            inline=False
+        )
+
+        recent = list(watchdog.stalls)[-PERF_STALLS_SHOWN:]
+        if recent:
+            lines = []
+            for stall in reversed(recent):
+                when = datetime.fromtimestamp(stall.at, DETROIT).strftime("%m-%d %I:%M:%S %p")
+                took = f"{stall.duration * 1000:.0f} ms" if stall.duration is not None else "ongoing"
+                top = stall.stack.strip().splitlines()[-2:] if stall.stack else []
+                lines.append(f"`{when}` **{stall.culprit}** ({took})\n```{chr(10).join(top)[-300:]}```")
+            embed.add_field(name="Recent stalls", value="\n".join(lines)[:1024], inline=False)
+
+        stats = sorted(self.bot.metrics.commands.items(), key=lambda kv: kv[1].latency.total, reverse=True)
+        if stats:
+            lines = []
+            for name, s in stats[:PERF_COMMANDS_SHOWN]:
+                mean_ms = s.latency.total / s.latency.count * 1000
+                db_share = s.db.total / s.latency.total if s.latency.total else 0
+                lines.append(
+                    f"**{name}**: {s.calls} calls, {s.errors} errors, avg {mean_ms:.1f} ms, "
+                    f"p99 ≤ {s.latency.quantile(0.99) * 1000:g} ms, {db_share:.0%} DB"
+                )
+            embed.add_field(name="Slowest commands (by total time)", value="\n".join(lines)[:1024], inline=False)
+
+        await ctx.reply(embed=embed, mention_author=False)
+
+    # ----------------
+    # Server settings
+    # ----------------
+
+    @commands.command(name="guildConfig")
+    @commands.guild_only()
+    @commands.has_guild_permissions(manage_guild=True)
+    async def guildConfig(self, ctx, setting: str = None, value: str = None):
+        """
+        (Manage Server) Show or change this server's bot settings.
+        Usage:
+          !guildConfig                         → show them
+          !guildConfig gm_role @GM             → the role that counts as GM
+          !guildConfig poll_channel #downtime  → where !dta posts polls
+          !guildConfig gm_channel #gm-only     → where GM views of !info go (none = DM)
+        """
+        configs = self.bot.guild_configs
+        quiet = discord.AllowedMentions.none()
+        if setting is None:
+            cfg = configs.get(ctx.guild.id)
+            lines = [f"**{name}**: {mention(kind, getattr(cfg, name))}" for name, kind in SETTINGS.items()]
+            await ctx.reply("\n".join(lines), allowed_mentions=quiet)
+            return
+
+        setting = setting.lower()
+        kind = SETTINGS.get(setting)
+        if kind is None or value is None:
+            await ctx.reply(f"Usage: !guildConfig [{'|'.join(SETTINGS)} <@role|#channel|none>]")
+            return
+        try:
+            snowflake = parse_id(value)
+        except ValueError as e:
+            await ctx.reply(f"❌ {e}.")
+            return
+        if snowflake is not None:
+            found = ctx.guild.get_role(snowflake) if kind == "role" else ctx.guild.get_channel(snowflake)
+            if found is None:
+                await ctx.reply(f"❌ This server has no {kind} with id {snowflake}.")
+                return
+
+        await configs.set(ctx.guild.id, **{setting: snowflake})
+        await ctx.reply(f"✅ {setting} → {mention(kind, snowflake)}", allowed_mentions=quiet)
+
+    @commands.command(name="syncCommands")
+    @commands.is_owner()
+    async def syncCommands(self, ctx, scope: str = None):
+        """
+        (Bot owner) Publish the slash commands to Discord, after adding or changing any.
+        Usage:
+          !syncCommands       → every server (can take up to an hour to show up)
+          !syncCommands here  → this server only, right away (for trying changes out)
+        """
+        tree = self.bot.tree
+        if scope == "here" and ctx.guild is not None:
+            tree.copy_global_to(guild=ctx.guild)
+            synced = await tree.sync(guild=ctx.guild)
+        else:
+            synced = await tree.sync()
+        where = "to this server" if scope == "here" and ctx.guild is not None else "globally"
+        await ctx.reply(f"✅ Synced {len(synced)} slash command(s) {where}.")
+
+    @commands.command()
+    @gm_only()
+    async def export(self, ctx, what: str, fmt: str = "csv"):
+        """
+        (GM only) Download a table as a file: !export <players|quests> [csv|json]
+        The file can be fed back to !importPlayers / !importQuests.
+        """
+        spec = bulk_io.TABLES.get(what.lower())
+        fmt = fmt.lower()
+        if spec is None or fmt not in bulk_io.FORMATS:
+            await ctx.reply(f"Usage: !export <{'|'.join(bulk_io.TABLES)}> [{'|'.join(bulk_io.FORMATS)}]")
+            return
+
+        fp, count, size = await self.db.read(bulk_io.export_rows, spec, ctx.guild.id, fmt)
+        limit = ctx.guild.filesize_limit
+        if size > limit:
+            fp.close()
+            await ctx.reply(f"The {spec.name} export is {size // 1024} KB, over this server's {limit // 1024} KB upload limit.")
+            return
+
+        stamp = datetime.now(DETROIT).strftime("%Y%m%d")
+        await ctx.reply(
+            f"{count} {spec.name}.",
+            file=discord.File(fp, filename=f"{spec.name}-{stamp}.{fmt}"),
+            mention_author=False
+        )
 
     @commands.command()
-    @commands.has_role(GM_ROLE)
+    @gm_only()
     async def dta(self, ctx, *, time:str):
         """Post a downtime poll, collect all reactions, DM a summary."""
-        await self.run_weekly_job(ctx.author, duration=float(time))
-    async def run_weekly_job(self, author, duration: float):
-        actions = [
-            ("🛠️", "Train a Trade"),
-            ("🎲", "Odd Job"),
-            ("🔮", "Craft an Item"),
-            ("🪙", "Do Your Day Job"),
-            ("💞", "Build Relationships"),
-        ]
+        channel_id = self.bot.guild_configs.get(ctx.guild.id).poll_channel
+        if channel_id is None:
+            await ctx.reply("No poll channel set. A server manager can set one with "
+                            "`!guildConfig poll_channel #channel`.")
+            return
+        await self.run_weekly_job(ctx.author, channel_id, duration=float(time))
+
+    async def run_weekly_job(self, author, channel_id: int, duration: float):
+        """Post the poll in channel_id and schedule its close `duration` hours from now."""
+        actions = ACTIONS
 
-        close_time = (datetime.now(DETROIT) + timedelta(hours=duration)).strftime("%I:%M %p")
+        closes_at = datetime.now(DETROIT) + timedelta(hours=duration)
+        close_time = closes_at.strftime("%I:%M %p")
         desc_lines = [
             f"This poll will close at {close_time} (Eastern Time).",
             "",
@@ -39,39 +387,66 @@ class AdminCommands(commands.Cog, name="Admin Commands"):
             color=0xFF8800,
         )
 
-        channel = self.bot.get_channel(THE_CROSSROADS)
+        channel = self.bot.get_channel(channel_id)
         if channel is None:
-            channel = await self.bot.fetch_channel(THE_CROSSROADS)
+            channel = await self.bot.fetch_channel(channel_id)
+
+        poll_message = await self.bot.outbox.send(channel, embed=embed)
+
+        # Start tallying before our own reactions go on, so no early vote is missed
+        self.tallies[poll_message.id] = {}
+        self.closes_at[poll_message.id] = closes_at.timestamp()
+        self.poll_guild[poll_message.id] = channel.guild.id
+        await self.db.execute(
+            f"INSERT INTO {DOWNTIME_POLL_TABLE} (MESSAGE_ID, CHANNEL_ID, AUTHOR_ID, CLOSES_AT, GUILD_ID) "
+            f"VALUES (?, ?, ?, ?, ?)",
+            (poll_message.id, channel.id, author.id, closes_at.timestamp(), channel.guild.id)
+        )
 
-        poll_message = await channel.send(embed=embed)
-        
         for emoji, _ in actions:
             await poll_message.add_reaction(emoji)
-        
 
-        # ----- TEST WAIT -----
-        await asyncio.sleep(duration*60*60)  # only 10 seconds instead of all day
+        await self.scheduler.schedule(POLL_CLOSE_JOB, closes_at.timestamp(), {
+            "channel_id": channel.id,
+            "message_id": poll_message.id,
+            "author_id": author.id,
+        })
+
+    async def close_weekly_job(self, job: dict):
+        """
+        Scheduler handler: tally the poll, DM the summary to its author, close it.
+        Raises (so the scheduler retries later) until the poll is marked closed.
+        A poll or channel that is gone, or that we lost access to, is closed on
+        the votes saved so far, since no retry would bring it back.
+        """
+        await self.bot.wait_until_ready()
+        message_id = job["message_id"]
 
+        channel = self.bot.get_channel(job["channel_id"])
+        gone = False
         try:
-            poll_message = await channel.fetch_message(poll_message.id)
-        except Exception as e:
-            logging.exception("Failed to refetch poll message: %s", e)
-            return
+            if channel is None:
+                channel = await self.bot.fetch_channel(job["channel_id"])
+            # Normally the live tally is already complete; only refetch if we can't trust it
+            if message_id in self._unreconciled or message_id not in self.tallies:
+                await self.reconcile(channel.id, message_id)
+        except (discord.NotFound, discord.Forbidden) as e:
+            logging.warning("Poll %s can't be fetched (%s); closing it on its saved votes", message_id, e)
+            gone = True
 
         # Map: user_id -> set of (emoji, label)
-        user_choices: dict[int, set[tuple[str, str]]] = {}
-
-        for emoji, label in actions:
-            react = discord.utils.get(poll_message.reactions, emoji=emoji)
-            if not react:
-                continue
-            try:
-                async for user in react.users(limit=None):
-                    if getattr(user, "bot", False):
-                        continue
-                    user_choices.setdefault(user.id, set()).add((emoji, label))
-            except Exception as e:
-                logging.exception("Error reading users for %s: %s", emoji, e)
+        votes = self.tallies.pop(message_id, None)
+        if votes is None:
+            votes = await self.db.read(_load_votes, message_id)
+        self._unreconciled.discard(message_id)
+        self.closes_at.pop(message_id, None)
+        self.poll_guild.pop(message_id, None)
+        user_choices: dict[int, set[tuple[str, str]]] = {
+            uid: {ACTION_BY_KEY[key] for key in keys} for uid, keys in votes.items() if keys
+        }
+        await self.db.execute(
+            f"UPDATE {DOWNTIME_POLL_TABLE} SET CLOSED = 1 WHERE MESSAGE_ID = ?", (message_id,)
+        )
 
         date_str = datetime.now(DETROIT).strftime(DATE_FORMAT)
 
@@ -79,26 +454,25 @@ class AdminCommands(commands.Cog, name="Admin Commands"):
         if not user_choices:
             summary_text = f"No participants reacted today. ({date_str})"
         else:
-            # Per-user lines (try to include display name)
-            per_user_lines = []
+            started = time.perf_counter()
+            members = await self._resolve_members(getattr(channel, "guild", None), user_choices.keys())
+
+            # Per-user lines, sorted by display name (falls back to the id for members who left)
+            per_user = []
             for uid, choices in user_choices.items():
                 # Order their choices by our actions order
-                order_index = {e: i for i, (e, _) in enumerate(actions)}
-                ordered = sorted(choices, key=lambda x: order_index.get(x[0], 999))
+                ordered = sorted(choices, key=lambda x: ACTION_ORDER.get(x[0], 999))
                 pretty = ", ".join(f"{e} {l}" for e, l in ordered)
+                member = members.get(uid)
+                sort_key = (member.display_name if member else str(uid)).lower()
+                per_user.append((sort_key, f"- <@{uid}>: {pretty}"))
 
-                name = f"<@{uid}>"
-                try:
-                    member = channel.guild.get_member(uid) or await channel.guild.fetch_member(uid)
-                    if member and member.display_name:
-                        name = f"<@{uid}>"
-                except Exception:
-                    pass
-
-                per_user_lines.append(f"- {name}: {pretty}")
-
-            per_user_lines.sort(key=lambda s: s.lower())
-
+            per_user.sort()
+            per_user_lines = [line for _, line in per_user]
+            logging.info(
+                "Built downtime summary for %d respondent(s) in %.1f ms (%d resolved)",
+                len(user_choices), (time.perf_counter() - started) * 1000, len(members)
+            )
 
             summary_text = "\n".join([
                 f"## Downtime Actions for {date_str}",
@@ -107,28 +481,31 @@ class AdminCommands(commands.Cog, name="Admin Commands"):
                 *per_user_lines
             ])
 
-        # --- 6) DM the summary to the target user ---
+        # --- 6) DM the summary to the target user (split into several DMs if it's long) ---
         try:
-            target_user = await self.bot.fetch_user(author.id)
-            await target_user.send(summary_text)
+            target_user = await self.bot.fetch_user(job["author_id"])
+            await self.bot.outbox.send(target_user, summary_text)
         except discord.Forbidden:
             logging.warning("Cannot DM target user (Forbidden).")
         except Exception as e:
             logging.exception("Failed to DM summary: %s", e)
 
-    
-
-        try:
-            await poll_message.delete()
-        except discord.Forbidden:
-            logging.warning("Bot doesn't have permission to delete the poll message.")
-        except Exception as e:
-            logging.exception("Failed to delete poll message: %s", e)
+        if channel is None:
+            return
+        if not gone:
+            try:
+                await channel.get_partial_message(message_id).delete()
+            except discord.Forbidden:
+                logging.warning("Bot doesn't have permission to delete the poll message.")
+            except Exception as e:
+                logging.exception("Failed to delete poll message: %s", e)
 
         try:
-            await channel.send(f"Downtime Actions for {date_str} have closed.")
-            await channel.send(f"If you missed them, you will have to wait for next week.")
-            
+            await self.bot.outbox.send(
+                channel,
+                f"Downtime Actions for {date_str} have closed.\n"
+                "If you missed them, you will have to wait for next week."
+            )
         except Exception as e:
             logging.exception("Failed to send closing notice: %s", e)
 
@@ -1,175 +1,497 @@
 from discord.ext import commands
+from discord import app_commands
 import discord
+import asyncio
 import sqlite3
-from config import GM_ROLE, DM_HUSH_HUT, DATABASE_PATH, PLAYER_INFO_TABLE
-import math
+from config import PLAYER_INFO_TABLE, PLAYER_CACHE_SIZE, DETROIT, DATE_FORMAT, logging
+from database import Database
+from guild_config import gm_only, is_gm
+from player_cache import PlayerCache, PlayerRecord, COLUMNS as PLAYER_COLUMNS
+from roster import Roster
+from player_locks import PlayerLocks
+from player_identity import PlayerIdentity, name_key
+from name_index import NameIndex, did_you_mean
+from prefix_index import PrefixIndex
+import slash
+from currency import CURRENCY
+import bulk_io
+import ledger
+from ledger import LedgerEntry
+from datetime import datetime
+from typing import Optional
 
 # =========================
-# Currency helpers & schema
+# Currency helpers
 # =========================
 
-# Base-10 denominations: 1 gp = 10 sp = 100 cp
-DENOMS = {"gp": 100, "sp": 10, "cp": 1}
-
-def _parse_unit(unit: str) -> str:
-    u = (unit or "").lower().strip()
-    if u in ("g", "gp"): return "gp"
-    if u in ("s", "sp"): return "sp"
-    if u in ("c", "cp"): return "cp"
-    raise ValueError("Unit must be gp, sp, or cp")
-
-def _to_cp(gp: int, sp: int, cp: int) -> int:
-    return gp * 100 + sp * 10 + cp
-
-def _from_cp(total_cp: int) -> tuple[int, int, int]:
-    if total_cp < 0:
-        raise ValueError("Negative currency")
-    gp = total_cp // 100
-    rem = total_cp % 100
-    sp = rem // 10
-    cp = rem % 10
-    return gp, sp, cp
-
-def _ensure_currency_columns(conn, table: str):
-    """Adds SILVER and COPPER columns to PLAYER_INFO_TABLE if missing (idempotent)."""
-    cur = conn.cursor()
-    cur.execute(f"PRAGMA table_info({table})")
-    cols = {r[1].upper() for r in cur.fetchall()}
-    if "SILVER" not in cols:
-        cur.execute(f"ALTER TABLE {table} ADD COLUMN SILVER INTEGER NOT NULL DEFAULT 0;")
-    if "COPPER" not in cols:
-        cur.execute(f"ALTER TABLE {table} ADD COLUMN COPPER INTEGER NOT NULL DEFAULT 0;")
-    conn.commit()
-
-def _get_player_row(cur, player_name: str):
-    cur.execute(
-        f"SELECT PLAYER, LEVEL, GOLD, SILVER, COPPER, QUEST_POINTS FROM {PLAYER_INFO_TABLE} WHERE PLAYER = ?",
-        (player_name,)
+def _get_player_row(conn, guild_id: int, player_name: str):
+    row = conn.execute(
+        f"SELECT {PLAYER_COLUMNS} FROM {PLAYER_INFO_TABLE} WHERE GUILD_ID = ? AND PLAYER = ?",
+        (guild_id, player_name)
+    ).fetchone()
+    return PlayerRecord.from_row(row) if row else None
+
+def _apply_player_deltas(conn, guild_id: int, set_sql: str, guard_sql: str, deltas: dict[str, int]):
+    """
+    Apply a per-player delta to many of a guild's players in ONE guarded UPDATE.
+
+    `set_sql` and `guard_sql` may refer to `d.delta`. Players failing the guard
+    are left untouched. Returns (updated {name: PlayerRecord}, names that exist
+    but failed the guard); anything in neither was not found.
+    """
+    values = ", ".join("(?, ?)" for _ in deltas)
+    params = [x for item in deltas.items() for x in item]
+    rows = conn.execute(
+        f"UPDATE {PLAYER_INFO_TABLE} SET {set_sql} "
+        f"FROM (SELECT column1 AS name, column2 AS delta FROM (VALUES {values})) AS d "
+        f"WHERE {PLAYER_INFO_TABLE}.GUILD_ID = ? AND {PLAYER_INFO_TABLE}.PLAYER = d.name AND {guard_sql} "
+        f"RETURNING {PLAYER_COLUMNS}",
+        params + [guild_id]
+    ).fetchall()
+    updated = {r["PLAYER"]: PlayerRecord.from_row(r) for r in rows}
+
+    blocked = set()
+    skipped = [n for n in deltas if n not in updated]
+    if skipped:
+        marks = ", ".join("?" for _ in skipped)
+        blocked = {r[0] for r in conn.execute(
+            f"SELECT PLAYER FROM {PLAYER_INFO_TABLE} WHERE GUILD_ID = ? AND PLAYER IN ({marks})", [guild_id, *skipped]
+        )}
+    return updated, blocked
+
+def _apply_currency_deltas(conn, guild_id: int, set_sql: str, guard_sql: str, deltas: dict[str, int],
+                           ledger_deltas: dict[str, int], reason: str, actor: tuple):
+    """_apply_player_deltas for money, plus a ledger entry per updated player in the same transaction."""
+    updated, blocked = _apply_player_deltas(conn, guild_id, set_sql, guard_sql, deltas)
+    ledger.record(conn, guild_id, [
+        LedgerEntry(name, ledger_deltas[name], CURRENCY.total(rec), reason)
+        for name, rec in updated.items()
+    ], *actor)
+    return updated, blocked
+
+def _set_coins_guarded(conn, guild_id: int, before: PlayerRecord, counts: dict) -> PlayerRecord:
+    """Write new coin counts for one player, only if the row still holds `before`'s coins."""
+    columns = [CURRENCY.column[u] for u in CURRENCY.units]
+    old = CURRENCY.counts(before)
+    row = conn.execute(
+        f"UPDATE {PLAYER_INFO_TABLE} SET {', '.join(f'{c} = ?' for c in columns)} "
+        f"WHERE GUILD_ID = ? AND PLAYER = ? AND {' AND '.join(f'{c} = ?' for c in columns)} "
+        f"RETURNING {PLAYER_COLUMNS}",
+        (*(counts[u] for u in CURRENCY.units), guild_id, before.player, *(old[u] for u in CURRENCY.units))
+    ).fetchone()
+    if row is None:
+        # Can't happen inside BEGIN IMMEDIATE; raising rolls the whole transfer back
+        raise sqlite3.OperationalError(f"{before.player} changed during transfer")
+    return PlayerRecord.from_row(row)
+
+def _transfer(conn, guild_id: int, giver: str, receiver: str, amount: int, unit: str, actor: tuple):
+    """
+    The whole of giveMoney in ONE write transaction: read both balances, make
+    change, write both rows (guarded on the values read) and the ledger.
+    Returns (problem, giver record, receiver record, change notes), where
+    problem is None on success or "giver" / "receiver" / "funds" / "change".
+    """
+    g = _get_player_row(conn, guild_id, giver)
+    if g is None:
+        return "giver", None, None, []
+    r = _get_player_row(conn, guild_id, receiver)
+    if r is None:
+        return "receiver", None, None, []
+
+    g_counts = CURRENCY.counts(g)
+    r_counts = CURRENCY.counts(r)
+
+    need_cp = amount * CURRENCY.value[unit]
+    if CURRENCY.total(g) < need_cp:
+        return "funds", g, r, []
+
+    notes = CURRENCY.make_change(g_counts, unit, amount)
+    if g_counts[unit] < amount:
+        return "change", g, r, notes
+
+    # Apply the transfer in the requested unit (no normalization)
+    g_counts[unit] -= amount
+    r_counts[unit] += amount
+    g_new = _set_coins_guarded(conn, guild_id, g, g_counts)
+    r_new = _set_coins_guarded(conn, guild_id, r, r_counts)
+    ledger.record(conn, guild_id, [
+        LedgerEntry(giver, -need_cp, CURRENCY.total(g_new),
+                    f"sent {amount}{unit} to {receiver}"),
+        LedgerEntry(receiver, need_cp, CURRENCY.total(r_new),
+                    f"received {amount}{unit} from {giver}"),
+    ], *actor)
+    return None, g_new, r_new, notes
+
+def _actor(ctx) -> tuple:
+    """(actor_id, actor name, command) for ledger.record."""
+    return ctx.author.id, str(ctx.author.display_name), str(ctx.command)
+
+def _add_player(conn, guild_id: int, player: str, level: int, actor: tuple) -> bool:
+    """Insert a player with the starting coins and open their ledger. False if the name is taken."""
+    cur = conn.execute(
+        f"INSERT INTO {PLAYER_INFO_TABLE} (GUILD_ID, PLAYER, LEVEL, GOLD, SILVER, COPPER, QUEST_POINTS, NAME_KEY) "
+        f"VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (GUILD_ID, PLAYER) DO NOTHING",
+        (guild_id, player, level, 10, 0, 0, 0, name_key(player))
     )
-    return cur.fetchone()
+    if not cur.rowcount:
+        return False
+    # A removed player's history under this name isn't the new player's
+    ledger.forget(conn, guild_id, player)
+    start = CURRENCY.to_base({"gp": 10})
+    ledger.record(conn, guild_id, [LedgerEntry(player, start, start, ledger.OPENING)], *actor)
+    return True
+
+def _remove_player(conn, guild_id: int, player: str) -> bool:
+    """Delete a player and their ledger history. False if there's no such player."""
+    cur = conn.execute(f"DELETE FROM {PLAYER_INFO_TABLE} WHERE GUILD_ID = ? AND PLAYER = ?", (guild_id, player))
+    if not cur.rowcount:
+        return False
+    ledger.forget(conn, guild_id, player)
+    return True
+
+# ============
+# Roster
+# ============
+
+# Rendered roster embeds kept in memory, keyed by page token
+ROSTER_EMBED_CACHE = 128
+
+def _gm_roster_line(r: PlayerRecord) -> str:
+    # Show EXACT stored counts (no normalization)
+    return f"Lvl {r.level} | 💰 {r.gold}gp {r.silver}sp {r.copper}cp | 🧭 {r.quest_points} QP"
+
+def _player_roster_line(r: PlayerRecord) -> str:
+    return "_Hidden (GM-only data)_"
+
+
+class RosterView(discord.ui.View):
+    """Prev/Next buttons for one !players message. Only the invoker can page it."""
+
+    def __init__(self, players: "GuildPlayers", author_id: int, is_gm: bool):
+        super().__init__(timeout=180)
+        self.players = players
+        self.author_id = author_id
+        self.is_gm = is_gm
+        self.index = 0
+        self.message: Optional[discord.Message] = None
+
+    def _sync_buttons(self, pages: int):
+        self.prev_page.disabled = self.index <= 0
+        self.next_page.disabled = self.index >= pages - 1
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("Run `!players` to get your own roster.", ephemeral=True)
+            return False
+        return True
+
+    async def _show(self, interaction: discord.Interaction):
+        embed, pages = await self.players.roster_page(self.is_gm, self.index)
+        if embed is None:
+            await interaction.response.edit_message(content="No players found in the database.", embed=None, view=None)
+            return
+        # The roster may have shrunk since the last click
+        self.index = min(self.index, pages - 1)
+        self._sync_buttons(pages)
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(label="◀ Prev", style=discord.ButtonStyle.secondary)
+    async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.index = max(self.index - 1, 0)
+        await self._show(interaction)
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.index += 1
+        await self._show(interaction)
+
+    async def on_timeout(self):
+        for child in self.children:
+            child.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
+# ============
+# Per-guild state
+# ============
+
+class GuildPlayers:
+    """
+    One guild's players in memory: the cache, member links, name index and
+    roster pages, all kept in step through cache notifications. Loaded on the
+    guild's first command (ready()).
+    """
+
+    def __init__(self, db: Database, guild_id: int):
+        self.guild_id = guild_id
+        self.cache = PlayerCache(db, PLAYER_INFO_TABLE, PLAYER_CACHE_SIZE, guild_id)
+        # Held by giveMoney for both players while it reads, makes change and writes
+        self.locks = PlayerLocks()
+        # Which player each member is (DISCORD_ID / NAME_KEY lookups, cached per member)
+        self.identity = PlayerIdentity(db, self.cache)
+        # Typo-tolerant name lookup for commands that name players, and slash command
+        # autocomplete, both kept in step with the cache
+        self.names = NameIndex()
+        self.prefixes = PrefixIndex()
+        self._names_stale = True
+        self._names_version = 0
+        # One paged roster per view type, kept in step with the cache
+        self.rosters = {True: Roster(_gm_roster_line), False: Roster(_player_roster_line)}
+        self._roster_stale = True
+        self._roster_version = 0
+        # (is_gm, page token, page index, page count) -> embed
+        self._roster_embeds: dict[tuple, discord.Embed] = {}
+        self.cache.subscribe(self._on_player_change)
+        self.cache.subscribe(self._on_name_change)
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+
+    async def ready(self) -> "GuildPlayers":
+        """Load the cache and name index once; concurrent first commands wait for the same load."""
+        if not self._loaded:
+            async with self._load_lock:
+                if not self._loaded:
+                    await self.cache.load()
+                    await self.name_index()
+                    self._loaded = True
+        return self
+
+    # ----------------
+    # Roster pages
+    # ----------------
+
+    def _on_player_change(self, name: Optional[str], rec: Optional[PlayerRecord]):
+        self._roster_version += 1
+        if self._roster_stale:
+            return  # rebuilt in full on next use
+        if name is None:
+            self._roster_stale = True
+            return
+        for roster in self.rosters.values():
+            if rec is None:
+                roster.remove(name)
+            else:
+                roster.upsert(rec)
+
+    async def _roster(self, is_gm: bool) -> Roster:
+        while self._roster_stale:
+            version = self._roster_version
+            records = await self.cache.all()
+            if version != self._roster_version:
+                continue  # a write landed while reading; read again
+            for roster in self.rosters.values():
+                roster.load(records)
+            self._roster_embeds.clear()
+            self._roster_stale = False
+        return self.rosters[is_gm]
+
+    async def roster_page(self, is_gm: bool, index: int):
+        """Render one roster page (clamped to the last page). Returns (embed, page count) or (None, 0)."""
+        roster = await self._roster(is_gm)
+        pages = len(roster.pages)
+        if not pages:
+            return None, 0
+        index = min(index, pages - 1)
+        pg = roster.pages[index]
+
+        key = (is_gm, pg.token, index, pages)
+        embed = self._roster_embeds.get(key)
+        if embed is not None:
+            return embed, pages
+
+        embed = discord.Embed(title="🏰 Player Roster", color=discord.Color.purple())
+        for name, value in roster.page(index):
+            embed.add_field(name=name, value=value, inline=False)
+        embed.set_footer(text=f"Use !info <your name> to see your details. • Page {index + 1} of {pages}")
+
+        if len(self._roster_embeds) >= ROSTER_EMBED_CACHE:
+            # Drop pages whose content has changed since they were rendered
+            live = {(gm, token) for gm, r in self.rosters.items() for token in r.tokens()}
+            self._roster_embeds = {
+                k: e for k, e in self._roster_embeds.items() if (k[0], k[1]) in live and k[3] == len(self.rosters[k[0]].pages)
+            }
+            if len(self._roster_embeds) >= ROSTER_EMBED_CACHE:
+                self._roster_embeds.clear()
+        self._roster_embeds[key] = embed
+        return embed, pages
+
+    # ----------------
+    # Name resolution
+    # ----------------
+
+    def _on_name_change(self, name: Optional[str], rec: Optional[PlayerRecord]):
+        self._names_version += 1
+        if self._names_stale:
+            return
+        if name is None:
+            self._names_stale = True
+        elif rec is None:
+            self.names.remove(name)
+            self.prefixes.remove(name)
+        else:
+            self.names.add(name)
+            self.prefixes.add(name, name)
+
+    async def name_index(self) -> NameIndex:
+        while self._names_stale:
+            version = self._names_version
+            records = await self.cache.all()
+            if version != self._names_version:
+                continue  # a write landed while reading; read again
+            self.names.rebuild(r.player for r in records)
+            self.prefixes.rebuild((r.player, r.player) for r in records)
+            self._names_stale = False
+        return self.names
+
+    async def complete(self, text: str) -> list[tuple[str, str]]:
+        """Autocomplete (name, name) pairs for a player option."""
+        await self.name_index()
+        return self.prefixes.complete(text)
+
+    async def resolve_names(self, names) -> tuple[dict[str, str], list[str]]:
+        """
+        Resolve every typed name of a multi-player command in one pass. Returns
+        ({typed: player} for the names that resolved, reply lines for names that
+        were corrected or not found).
+        """
+        index = await self.name_index()
+        resolved, notes = {}, []
+        for typed, res in index.resolve_many(names).items():
+            if res.name is None:
+                notes.append(f"❌ `{typed}` not found.{did_you_mean(res)}")
+                continue
+            resolved[typed] = res.name
+            if res.corrected:
+                notes.append(f"🔎 `{typed}` → `{res.name}`")
+        return resolved, notes
+
+    async def resolve_name(self, ctx, player_name: str, fuzzy: bool = True, label: str = "Player") -> Optional[str]:
+        """
+        The player a typed name means, or None after replying with suggestions.
+        With fuzzy=False a misspelling is only suggested, never used (for
+        commands that can't be taken back, or that a player runs).
+        """
+        res = (await self.name_index()).resolve(player_name)
+        if res.corrected and not fuzzy:
+            res = res._replace(name=None, suggestions=(res.name,))
+        if res.name is None:
+            await ctx.reply(f"{label} `{player_name}` not found.{did_you_mean(res)}")
+        return res.name
 
 # ============
 # Player Cog
 # ============
 
+NOT_LINKED = "You aren't linked to a player yet. Ask a GM to `!linkPlayer <player> @you`."
+UNIT_CHOICES = [app_commands.Choice(name=u, value=u) for u in CURRENCY.units]
+
 class PlayerInfo(commands.Cog, name="Player Info"):
     """Commands for player info: level, gold/silver/copper, quest points."""
 
     def __init__(self, bot):
         self.bot = bot
-        # Run a safe migration at startup to add SILVER/COPPER if missing
-        conn = self.get_db_connection(DATABASE_PATH)
-        if conn:
-            try:
-                _ensure_currency_columns(conn, PLAYER_INFO_TABLE)
-            finally:
-                conn.close()
-
-    def get_db_connection(self, db_path: str):
-        try:
-            conn = sqlite3.connect(db_path, timeout=5)
-            conn.row_factory = sqlite3.Row
-            return conn
-        except sqlite3.Error:
-            return None
+        self.db: Database = bot.db
+        # guild id -> that guild's players, created on its first command. Each is
+        # bounded by PLAYER_CACHE_SIZE; guilds nobody uses never cost anything.
+        self.guilds: dict[int, GuildPlayers] = {}
+
+    async def players_of(self, guild_id: int) -> GuildPlayers:
+        players = self.guilds.get(guild_id)
+        if players is None:
+            players = self.guilds[guild_id] = GuildPlayers(self.db, guild_id)
+        return await players.ready()
+
+    async def cog_check(self, ctx):
+        # Players live in a guild; there's no "whose players?" answer in a DM
+        if ctx.guild is None:
+            raise commands.NoPrivateMessage()
+        return True
+
+    async def cog_command_error(self, ctx, error):
+        original = getattr(error, "original", None)
+        if isinstance(original, sqlite3.Error):
+            logging.exception("Database error in %s", ctx.command, exc_info=original)
+            await ctx.reply("Database error. See logs for details.")
+
+    @commands.Cog.listener()
+    async def on_guild_adopt(self, guild):
+        # Rows just moved into this guild (guild_config.py); reload on its next command
+        self.guilds.pop(guild.id, None)
 
     # ----------------
     # Info & Roster
     # ----------------
 
+    async def _target(self, ctx, players: GuildPlayers, player_name: Optional[str]) -> Optional[str]:
+        """Canonical name of the player a command is about (the caller's own if none given). Replies if unknown."""
+        if player_name is None:
+            target = await players.identity.caller(ctx)
+            if target is None:
+                await ctx.reply(NOT_LINKED)
+            return target
+        # Only GMs get a typo corrected: a player's would point at someone else
+        return await players.resolve_name(ctx, player_name, fuzzy=is_gm(ctx))
+
     @commands.command()
-    async def info(self, ctx, *, player_name: str):
-        """Get player info. Users can only view their own."""
-        requester = str(ctx.author.display_name)
-        rq_role = discord.utils.get(ctx.author.roles, id=GM_ROLE)
-        if rq_role is not None:
-            await self.player_info(ctx, player_name=player_name, view_type="GM")
-        elif requester == player_name:
-            await self.player_info(ctx, player_name=player_name, view_type="USER")
+    async def info(self, ctx, *, player_name: str = None):
+        """Get player info (`!info` alone for your own). Users can only view their own."""
+        players = await self.players_of(ctx.guild.id)
+        target = await self._target(ctx, players, player_name)
+        if target is None:
+            return
+        if is_gm(ctx):
+            await self.player_info(ctx, players, player_name=target, view_type="GM")
+        elif await players.identity.caller(ctx) == target:
+            await self.player_info(ctx, players, player_name=target, view_type="USER")
         else:
             await ctx.reply("You can only view your own info. GMs can view anyone's info.")
 
-    async def player_info(self, ctx, player_name: str, view_type: str):
-        conn = self.get_db_connection(DATABASE_PATH)
-        if not conn:
-            await ctx.reply("Database connection failed. See logs for details.")
-            return
-
-        cur = conn.cursor()
-        cur.execute(
-            f"SELECT LEVEL, GOLD, SILVER, COPPER, QUEST_POINTS FROM {PLAYER_INFO_TABLE} WHERE PLAYER = ?",
-            (player_name,)
-        )
-        row = cur.fetchone()
-        conn.close()
+    async def player_info(self, ctx, players: GuildPlayers, player_name: str, view_type: str):
+        rec = await players.cache.get(player_name)
 
-        if row is None:
+        if rec is None:
             await ctx.reply(f"No player named `{player_name}` found.")
             return
 
         embed = discord.Embed(title=f"{player_name}", color=discord.Color.blue())
-        embed.add_field(name="Level", value=str(row["LEVEL"]), inline=True)
-        embed.add_field(name="Gold", value=f"{row['GOLD']} gp", inline=True)
-        embed.add_field(name="Silver", value=f"{row['SILVER']} sp", inline=True)
-        embed.add_field(name="Copper", value=f"{row['COPPER']} cp", inline=True)
-        embed.add_field(name="QP", value=str(row["QUEST_POINTS"]), inline=True)
-
-        if view_type == "GM":
-            channel = self.bot.get_channel(DM_HUSH_HUT)
-            await channel.send(embed=embed)
+        embed.add_field(name="Level", value=str(rec.level), inline=True)
+        embed.add_field(name="Gold", value=f"{rec.gold} gp", inline=True)
+        embed.add_field(name="Silver", value=f"{rec.silver} sp", inline=True)
+        embed.add_field(name="Copper", value=f"{rec.copper} cp", inline=True)
+        embed.add_field(name="QP", value=str(rec.quest_points), inline=True)
+
+        gm_channel = self.bot.guild_configs.get(ctx.guild.id).gm_channel
+        if view_type == "GM" and gm_channel is not None:
+            channel = self.bot.get_channel(gm_channel)
+            await self.bot.outbox.send(channel, embed=embed)
         else:
-            await ctx.author.send(embed=embed)
+            await self.bot.outbox.send(ctx.author, embed=embed)
             await ctx.reply("I've sent your info in a DM!")
 
     @commands.command(name="players")
     async def players(self, ctx):
         """
-        Show a summary of all players.
+        Show a summary of all players, one page at a time.
         GMs see exact stored balances; regular users see names only.
         """
-        conn = self.get_db_connection(DATABASE_PATH)
-        if not conn:
-            await ctx.reply("Database connection failed.")
-            return
+        players = await self.players_of(ctx.guild.id)
+        gm = is_gm(ctx)
 
-        cur = conn.cursor()
-        cur.execute(
-            f"SELECT PLAYER, LEVEL, GOLD, SILVER, COPPER, QUEST_POINTS "
-            f"FROM {PLAYER_INFO_TABLE} "
-            f"ORDER BY PLAYER ASC"
-        )
-        rows = cur.fetchall()
-        conn.close()
-
-        if not rows:
+        embed, pages = await players.roster_page(gm, 0)
+        if embed is None:
             await ctx.reply("No players found in the database.")
             return
 
-        is_gm = discord.utils.get(ctx.author.roles, id=GM_ROLE) is not None
-
-        embed = discord.Embed(title="🏰 Player Roster", color=discord.Color.purple())
-
-        for r in rows:
-            if is_gm:
-                # Show EXACT stored counts (no normalization)
-                embed.add_field(
-                    name=r["PLAYER"],
-                    value=(
-                        f"Lvl {r['LEVEL']} | "
-                        f"💰 {r['GOLD']}gp {r['SILVER']}sp {r['COPPER']}cp | "
-                        f"🧭 {r['QUEST_POINTS']} QP"
-                    ),
-                    inline=False
-                )
-            else:
-                embed.add_field(
-                    name=r["PLAYER"],
-                    value="_Hidden (GM-only data)_",
-                    inline=False
-                )
+        if pages == 1:
+            await ctx.reply(embed=embed, mention_author=False)
+            return
 
-        embed.set_footer(text="Use !info <your name> to see your details.")
-        await ctx.reply(embed=embed, mention_author=False)
+        view = RosterView(players, ctx.author.id, gm)
+        view._sync_buttons(pages)
+        view.message = await ctx.reply(embed=embed, view=view, mention_author=False)
 
 
     # ----------------
@@ -179,7 +501,7 @@ class PlayerInfo(commands.Cog, name="Player Info"):
     from typing import List
 
     @commands.command()
-    @commands.has_role(GM_ROLE)
+    @gm_only()
     async def addMoney(self, ctx, *args):
         """
         Usage:
@@ -197,7 +519,7 @@ class PlayerInfo(commands.Cog, name="Player Info"):
 
         # try to figure out if the *last* arg is a unit
         maybe_unit = args[-1].lower()
-        has_unit = maybe_unit in ("g", "gp", "s", "sp", "c", "cp")
+        has_unit = CURRENCY.is_unit(maybe_unit)
 
         if has_unit:
             unit_raw = maybe_unit
@@ -217,7 +539,7 @@ class PlayerInfo(commands.Cog, name="Player Info"):
 
         # normalize unit
         try:
-            unit = _parse_unit(unit_raw)  # your helper
+            unit = CURRENCY.parse_unit(unit_raw)
         except ValueError as e:
             await ctx.reply(str(e))
             return
@@ -227,87 +549,82 @@ class PlayerInfo(commands.Cog, name="Player Info"):
             await ctx.reply("You must specify at least one player name.")
             return
 
-        conn = self.get_db_connection(DATABASE_PATH)
-        if not conn:
-            await ctx.reply("Database connection failed.")
-            return
-
-        cur = conn.cursor()
-
-        results = []   # to show per-player outcome
-        for player_name in name_parts:
-            row = _get_player_row(cur, player_name)
-            if not row:
+        # Repeated names get the award once per mention, all in one statement
+        players = await self.players_of(ctx.guild.id)
+        resolved, results = await players.resolve_names(name_parts)
+        deltas: dict[str, int] = {}
+        for typed in name_parts:
+            player_name = resolved.get(typed)
+            if player_name is not None:
+                deltas[player_name] = deltas.get(player_name, 0) + amount * CURRENCY.value[unit]
+
+        updated, blocked = {}, set()
+        if deltas:
+            new_total = f"({CURRENCY.total_sql} + d.delta)"
+            updated, blocked = await self.db.write(
+                _apply_currency_deltas, ctx.guild.id, CURRENCY.normalized_set_sql(new_total), f"{new_total} >= 0",
+                deltas, deltas, f"GM added {amount}{unit}", _actor(ctx)
+            )
+            players.cache.put_many(updated.values())
+
+        # per-player outcome, after any corrected / unknown names
+        for player_name in deltas:
+            rec = updated.get(player_name)
+            if rec:
+                results.append(
+                    f"✅ Added {amount}{unit} to `{player_name}` → {rec.gold}gp {rec.silver}sp {rec.copper}cp"
+                )
+            elif player_name in blocked:
+                results.append(f"❌ `{player_name}` doesn’t have enough funds to remove {-amount}{unit}.")
+            else:
                 # don't early-return — just note the failure for this name
                 results.append(f"❌ `{player_name}` not found.")
-                continue
-
-            total_cp = _to_cp(row["GOLD"], row["SILVER"], row["COPPER"]) + amount * DENOMS[unit]
-            gp, sp, cp = _from_cp(total_cp)
-
-            cur.execute(
-                f"UPDATE {PLAYER_INFO_TABLE} SET GOLD=?, SILVER=?, COPPER=? WHERE PLAYER=?",
-                (gp, sp, cp, player_name)
-            )
-
-            results.append(f"✅ Added {amount}{unit} to `{player_name}` → {gp}gp {sp}sp {cp}cp")
-
-        conn.commit()
-        conn.close()
 
         # send a combined result
         msg = "\n".join(results)
         await ctx.reply(msg)
 
     @commands.command()
-    @commands.has_role(GM_ROLE)
+    @gm_only()
     async def rmMoney(self, ctx, player_name: str, amount: int, unit: str = "gp"):
         """Usage: !rmMoney <player> <amount> [gp|sp|cp]"""
         try:
-            unit = _parse_unit(unit)
+            unit = CURRENCY.parse_unit(unit)
         except ValueError as e:
             await ctx.reply(str(e))
             return
-
-        conn = self.get_db_connection(DATABASE_PATH)
-        if not conn:
-            await ctx.reply("Database connection failed.")
+        players = await self.players_of(ctx.guild.id)
+        player_name = await players.resolve_name(ctx, player_name)
+        if player_name is None:
             return
-        cur = conn.cursor()
 
-        row = _get_player_row(cur, player_name)
-        if not row:
-            conn.close()
-            await ctx.reply(f"Player `{player_name}` not found.")
-            return
-
-        total_cp = _to_cp(row["GOLD"], row["SILVER"], row["COPPER"])
-        delta = amount * DENOMS[unit]
-        if total_cp < delta:
-            conn.close()
-            await ctx.reply(f"❌ {player_name} doesn’t have enough funds to remove {amount}{unit}.")
-            return
-
-        total_cp -= delta
-        gp, sp, cp = _from_cp(total_cp)
-        cur.execute(
-            f"UPDATE {PLAYER_INFO_TABLE} SET GOLD=?, SILVER=?, COPPER=? WHERE PLAYER=?",
-            (gp, sp, cp, player_name)
+        new_total = f"({CURRENCY.total_sql} - d.delta)"
+        delta = amount * CURRENCY.value[unit]
+        updated, blocked = await self.db.write(
+            _apply_currency_deltas, ctx.guild.id, CURRENCY.normalized_set_sql(new_total), f"{new_total} >= 0",
+            {player_name: delta}, {player_name: -delta}, f"GM removed {amount}{unit}", _actor(ctx)
         )
-        conn.commit()
-        conn.close()
+        rec = updated.get(player_name)
+        if rec is None:
+            if player_name in blocked:
+                await ctx.reply(f"❌ {player_name} doesn’t have enough funds to remove {amount}{unit}.")
+            else:
+                await ctx.reply(f"Player `{player_name}` not found.")
+            return
 
+        players.cache.put(rec)
+        gp, sp, cp = rec.gold, rec.silver, rec.copper
         await ctx.reply(f"Removed {amount}{unit} from {player_name} → {gp}gp {sp}sp {cp}cp")
 
     # Back-compat aliases (gold-only)
     @commands.command()
-    @commands.has_role(GM_ROLE)
+    @gm_only()
     async def addGold(self, ctx, player_name: str, amount: int):
         """Alias: gold-only add. Usage: !addGold <player> <amount>"""
         await self.addMoney(ctx, player_name, amount, "gp")
 
     @commands.command()
-    @commands.has_role(GM_ROLE)
+    @gm_only()
     async def rmGold(self, ctx, player_name: str, amount: int):
         """Alias: gold-only remove. Usage: !rmGold <player> <amount>"""
         await self.rmMoney(ctx, player_name, amount, "gp")
@@ -325,7 +642,7 @@ class PlayerInfo(commands.Cog, name="Player Info"):
         !giveMoney Bob 3 gp     (will combine sp/cp to gp if exact multiples exist)
         """
         try:
-            unit = _parse_unit(unit)  # gp|sp|cp
+            unit = CURRENCY.parse_unit(unit)  # gp|sp|cp
         except ValueError as e:
             await ctx.reply(str(e))
             return
@@ -333,154 +650,43 @@ class PlayerInfo(commands.Cog, name="Player Info"):
             await ctx.reply("Amount must be positive.")
             return
 
-        giver = str(ctx.author.display_name)
+        players = await self.players_of(ctx.guild.id)
+        giver = await players.identity.caller(ctx)
+        if giver is None:
+            await ctx.reply(NOT_LINKED)
+            return
+        receiver = await players.resolve_name(ctx, receiver, fuzzy=False, label="Receiver")
+        if receiver is None:
+            return
         if giver == receiver:
             await ctx.reply("You can’t pay yourself.")
             return
 
-        conn = self.get_db_connection(DATABASE_PATH)
-        if not conn:
-            await ctx.reply("Database connection failed.")
-            return
-        cur = conn.cursor()
+        async with players.locks.hold(giver, receiver):
+            try:
+                problem, g, r, notes = await self.db.write(
+                    _transfer, ctx.guild.id, giver, receiver, amount, unit, _actor(ctx)
+                )
+            except sqlite3.Error as e:
+                await ctx.reply(f"Transfer failed: {e}")
+                return
+            if problem is None:
+                players.cache.put(g)
+                players.cache.put(r)
 
-        # Fetch both rows
-        cur.execute(
-            f"SELECT PLAYER, GOLD, SILVER, COPPER FROM {PLAYER_INFO_TABLE} WHERE PLAYER IN (?, ?)",
-            (giver, receiver)
-        )
-        rows = {r["PLAYER"]: r for r in cur.fetchall()}
-        if giver not in rows:
-            conn.close()
+        if problem == "giver":
             await ctx.reply(f"Giver `{giver}` not found in the database.")
             return
-        if receiver not in rows:
-            conn.close()
+        if problem == "receiver":
             await ctx.reply(f"Receiver `{receiver}` not found in the database.")
             return
-
-        g = rows[giver]
-        r = rows[receiver]
-
-        # Work on mutable copies
-        g_counts = {"gp": g["GOLD"], "sp": g["SILVER"], "cp": g["COPPER"]}
-        r_counts = {"gp": r["GOLD"], "sp": r["SILVER"], "cp": r["COPPER"]}
-
-        # Quick sanity: do they have enough total value (in cp)?
-        need_cp = amount * DENOMS[unit]
-        have_cp = g_counts["gp"]*DENOMS["gp"] + g_counts["sp"]*DENOMS["sp"] + g_counts["cp"]
-        if have_cp < need_cp:
-            conn.close()
+        if problem == "funds":
             await ctx.reply(f"❌ You don’t have enough total funds to send {amount}{unit}.")
             return
-
-        # Helper: make change to ensure g_counts[unit] >= amount.
-        # We try (a) break higher down, then (b) combine lower up where possible.
-        def ensure_units(target: str, amt: int, counts: dict) -> list[str]:
-            notes = []
-            def break_gp_to_sp(u):
-                # 1 gp -> 10 sp
-                use = min(math.ceil(u/10), counts["gp"])
-                if use > 0:
-                    counts["gp"] -= use
-                    made = use * 10
-                    counts["sp"] += made
-                    notes.append(f"broke {use}gp → {made}sp")
-
-            def break_sp_to_cp(u):
-                # 1 sp -> 10 cp
-                use = min(math.ceil(u/10), counts["sp"])
-                if use > 0:
-                    counts["sp"] -= use
-                    made = use * 10
-                    counts["cp"] += made
-                    notes.append(f"broke {use}sp → {made}cp")
-
-            def combine_cp_to_sp(u):
-                # 10 cp -> 1 sp
-                possible = counts["cp"] // 10
-                use = min(u, possible)
-                if use > 0:
-                    counts["cp"] -= use * 10
-                    counts["sp"] += use
-                    notes.append(f"combined {use*10}cp → {use}sp")
-
-            def combine_sp_to_gp(u):
-                # 10 sp -> 1 gp
-                possible = counts["sp"] // 10
-                use = min(u, possible)
-                if use > 0:
-                    counts["sp"] -= use * 10
-                    counts["gp"] += use
-                    notes.append(f"combined {use*10}sp → {use}gp")
-
-            if target == "cp":
-                # Need cp: break sp first, then gp; also combine cp from sp if possible.
-                deficit = max(0, amt - counts["cp"])
-                if deficit > 0:
-                    break_sp_to_cp(deficit)
-                    deficit = max(0, amt - counts["cp"])
-                if deficit > 0:
-                    need_gp = math.ceil(deficit / 100)
-                    if need_gp > 0 and counts["gp"] > 0:
-                        use = min(need_gp, counts["gp"])
-                        counts["gp"] -= use
-                        made = use * 100
-                        counts["cp"] += made
-                        notes.append(f"broke {use}gp → {made}cp")
-
-            elif target == "sp":
-                # Need sp: break gp down; if still short, combine cp up to sp
-                deficit = max(0, amt - counts["sp"])
-                if deficit > 0:
-                    break_gp_to_sp(deficit)
-                    deficit = max(0, amt - counts["sp"])
-                if deficit > 0:
-                    combine_cp_to_sp(deficit)  # only exact multiples are combined
-
-            elif target == "gp":
-                # Need gp: combine sp to gp, then cp to sp then sp to gp.
-                deficit = max(0, amt - counts["gp"])
-                if deficit > 0:
-                    combine_sp_to_gp(deficit)
-                    deficit = max(0, amt - counts["gp"])
-                if deficit > 0:
-                    # First roll cp up into sp, then sp into gp
-                    combine_cp_to_sp(deficit * 10)  # we might need up to deficit*10 sp
-                    combine_sp_to_gp(deficit)
-            return notes
-
-        notes = ensure_units(unit, amount, g_counts)
-
-        # After making change, ensure we actually have enough of the requested unit
-        if g_counts[unit] < amount:
-            conn.close()
+        if problem == "change":
             await ctx.reply(f"❌ Even after making change, not enough {unit} to send {amount}{unit}.")
             return
 
-        # Apply the transfer in the requested unit (no normalization)
-        g_counts[unit] -= amount
-        r_counts[unit] += amount
-
-        try:
-            cur.execute("BEGIN IMMEDIATE")
-            cur.execute(
-                f"UPDATE {PLAYER_INFO_TABLE} SET GOLD=?, SILVER=?, COPPER=? WHERE PLAYER=?",
-                (g_counts["gp"], g_counts["sp"], g_counts["cp"], giver)
-            )
-            cur.execute(
-                f"UPDATE {PLAYER_INFO_TABLE} SET GOLD=?, SILVER=?, COPPER=? WHERE PLAYER=?",
-                (r_counts["gp"], r_counts["sp"], r_counts["cp"], receiver)
-            )
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            conn.close()
-            await ctx.reply(f"Transfer failed: {e}")
-            return
-
-        conn.close()
-
         # Build a friendly summary (include any change-making steps)
         change_line = ""
         if notes:
@@ -491,8 +697,8 @@ class PlayerInfo(commands.Cog, name="Player Info"):
             f"- {giver} → {receiver}: {amount}{unit}\n"
             f"{change_line}"
             f"- New balances:\n"
-            f"  • {giver}: {g_counts['gp']}gp {g_counts['sp']}sp {g_counts['cp']}cp\n"
-            f"  • {receiver}: {r_counts['gp']}gp {r_counts['sp']}sp {r_counts['cp']}cp"
+            f"  • {giver}: {g.gold}gp {g.silver}sp {g.copper}cp\n"
+            f"  • {receiver}: {r.gold}gp {r.silver}sp {r.copper}cp"
         )   
 
     @commands.command()
@@ -500,6 +706,59 @@ class PlayerInfo(commands.Cog, name="Player Info"):
         """Alias: gold-only transfer."""
         await self.giveMoney(ctx, receiver, amount, "gp")
 
+    # ----------------
+    # Ledger
+    # ----------------
+
+    @commands.command()
+    async def ledger(self, ctx, player_name: str = None, before: int = None):
+        """
+        Show a player's currency history, newest first. Users can only view their own.
+        Usage:
+        !ledger                     → your latest entries
+        !ledger <player>            → latest entries
+        !ledger <player> <entry id> → entries older than that id
+        """
+        players = await self.players_of(ctx.guild.id)
+        player_name = await self._target(ctx, players, player_name)
+        if player_name is None:
+            return
+        gm = is_gm(ctx)
+        if not gm and await players.identity.caller(ctx) != player_name:
+            await ctx.reply("You can only view your own ledger. GMs can view anyone's.")
+            return
+
+        rows, running = await self.db.read(ledger.page, ctx.guild.id, player_name, before)
+        if not rows:
+            await ctx.reply(f"No ledger entries for `{player_name}`" + (f" before #{before}." if before else "."))
+            return
+
+        lines = []
+        for r in rows:
+            when = datetime.fromtimestamp(r["TS"], DETROIT).strftime(DATE_FORMAT)
+            delta = r["DELTA_CP"]
+            sign = "+" if delta > 0 else ""
+            lines.append(
+                f"`#{r['ID']}` {when} **{sign}{CURRENCY.fmt(delta)}** → {CURRENCY.fmt(running)}\n"
+                f"  {r['REASON']} ({r['ACTOR']}, !{r['COMMAND']})"
+            )
+            running -= delta  # balance before this entry = after the next (older) one
+
+        embed = discord.Embed(
+            title=f"📒 Ledger: {player_name}",
+            description="\n".join(lines),
+            color=discord.Color.dark_gold()
+        )
+        if len(rows) == ledger.PAGE_SIZE:
+            name_arg = f'"{player_name}"' if " " in player_name else player_name
+            embed.set_footer(text=f"Older entries: !ledger {name_arg} {rows[-1]['ID']}")
+
+        if gm:
+            await ctx.reply(embed=embed, mention_author=False)
+        else:
+            await self.bot.outbox.send(ctx.author, embed=embed)
+            await ctx.reply("I've sent your ledger in a DM!")
+
 
     # ----------------
     # Conversion
@@ -514,8 +773,8 @@ class PlayerInfo(commands.Cog, name="Player Info"):
         !convert Gorn 30 sp gp  -> -30 sp, +3 gp (requires exact multiple of 10sp)
         """
         try:
-            f = _parse_unit(from_unit)
-            t = _parse_unit(to_unit)
+            f = CURRENCY.parse_unit(from_unit)
+            t = CURRENCY.parse_unit(to_unit)
         except ValueError as e:
             await ctx.reply(str(e))
             return
@@ -527,61 +786,44 @@ class PlayerInfo(commands.Cog, name="Player Info"):
             await ctx.reply("Amount must be positive.")
             return
 
-        conn = self.get_db_connection(DATABASE_PATH)
-        if not conn:
-            await ctx.reply("Database connection failed.")
-            return
-        cur = conn.cursor()
-
-        cur.execute(
-            f"SELECT GOLD, SILVER, COPPER FROM {PLAYER_INFO_TABLE} WHERE PLAYER = ?",
-            (player_name,)
-        )
-        row = cur.fetchone()
-        if not row:
-            conn.close()
-            await ctx.reply(f"Player `{player_name}` not found.")
-            return
-
-        counts = {
-            "gp": row["GOLD"],
-            "sp": row["SILVER"],
-            "cp": row["COPPER"],
-        }
-
-        # Ensure enough source units
-        if counts[f] < amount:
-            conn.close()
-            await ctx.reply(f"❌ {player_name} doesn’t have {amount}{f} to convert.")
-            return
-
         # Compute how many target units we add
-        if DENOMS[f] > DENOMS[t]:
+        if CURRENCY.value[f] > CURRENCY.value[t]:
             # moving down (gp->sp, sp->cp)
-            add_units = amount * (DENOMS[f] // DENOMS[t])
+            add_units = amount * CURRENCY.factor[(f, t)]
         else:
             # moving up (sp->gp, cp->sp, cp->gp) requires exact multiple
-            needed = DENOMS[t] // DENOMS[f]
+            needed = CURRENCY.factor[(t, f)]
             if amount % needed != 0:
-                conn.close()
                 await ctx.reply(f"❌ To convert {f} → {t}, use multiples of {needed}{f}.")
                 return
             add_units = amount // needed
 
-        # Apply unit move (no normalization)
-        counts[f] -= amount
-        counts[t] += add_units
+        players = await self.players_of(ctx.guild.id)
+        player_name = await players.resolve_name(ctx, player_name, fuzzy=False)  # players run it too
+        if player_name is None:
+            return
 
-        cur.execute(
-            f"UPDATE {PLAYER_INFO_TABLE} SET GOLD=?, SILVER=?, COPPER=? WHERE PLAYER=?",
-            (counts["gp"], counts["sp"], counts["cp"], player_name)
+        # Apply unit move (no normalization); the source balance is checked in the WHERE clause
+        fc, tc = CURRENCY.column[f], CURRENCY.column[t]
+        updated, blocked = await self.db.write(
+            _apply_currency_deltas, ctx.guild.id,
+            f"{fc} = {fc} - d.delta, {tc} = {tc} + d.delta * {CURRENCY.value[f]} / {CURRENCY.value[t]}",
+            f"{fc} >= d.delta",
+            {player_name: amount}, {player_name: 0}, f"converted {amount}{f} → {add_units}{t}", _actor(ctx)
         )
-        conn.commit()
-        conn.close()
+        rec = updated.get(player_name)
+        if rec is None:
+            if player_name in blocked:
+                await ctx.reply(f"❌ {player_name} doesn’t have {amount}{f} to convert.")
+            else:
+                await ctx.reply(f"Player `{player_name}` not found.")
+            return
+        players.cache.put(rec)
+        counts = CURRENCY.counts(rec)
 
         await ctx.reply(
             f"Converted {amount}{f} → {add_units}{t} for {player_name} → "
-            f"{counts['gp']}gp {counts['sp']}sp {counts['cp']}cp"
+            + " ".join(f"{counts[u]}{u}" for u in CURRENCY.units)
         )
 
 
@@ -591,50 +833,54 @@ class PlayerInfo(commands.Cog, name="Player Info"):
     # ----------------
 
     @commands.command()
-    @commands.has_role(GM_ROLE)
+    @gm_only()
     async def levelUp(self, ctx, player_name: str):
         """Increase a player's level by 1. Must have adequate QP. GM only."""
-        conn = self.get_db_connection(DATABASE_PATH)
-        if not conn:
-            await ctx.reply("Database connection failed.")
+        players = await self.players_of(ctx.guild.id)
+        player_name = await players.resolve_name(ctx, player_name)
+        if player_name is None:
             return
-        cur = conn.cursor()
+        guild_id = ctx.guild.id
+
+        def apply(conn):
+            rec = _get_player_row(conn, guild_id, player_name)
+            if not rec:
+                return None
+
+            cost = rec.level + 1  # adjust if your rule differs
+            if rec.quest_points < cost:
+                return False, rec, cost
+
+            rec.level += 1
+            rec.quest_points -= cost
+            conn.execute(
+                f"UPDATE {PLAYER_INFO_TABLE} SET LEVEL = ?, QUEST_POINTS = ? WHERE GUILD_ID = ? AND PLAYER = ?",
+                (rec.level, rec.quest_points, guild_id, player_name)
+            )
+            return True, rec, cost
 
-        cur.execute(f"SELECT LEVEL, QUEST_POINTS FROM {PLAYER_INFO_TABLE} WHERE PLAYER = ?", (player_name,))
-        row = cur.fetchone()
-        if not row:
-            conn.close()
+        result = await self.db.write(apply)
+        if result is None:
             await ctx.reply(f"Player `{player_name}` not found.")
             return
 
-        level = row["LEVEL"]
-        quest_points = row["QUEST_POINTS"]
-        new_level = level + 1
-        cost = new_level  # adjust if your rule differs
-
-        if quest_points < cost:
-            conn.close()
+        ok, rec, cost = result
+        if not ok:
             await ctx.reply(
                 f"{player_name} doesn’t have enough quest points to level up.\n"
-                f"(QP: {quest_points}, Needed: {cost}, Current Level: {level})"
+                f"(QP: {rec.quest_points}, Needed: {cost}, Current Level: {rec.level})"
             )
             return
 
-        new_qp = quest_points - cost
-        cur.execute(
-            f"UPDATE {PLAYER_INFO_TABLE} SET LEVEL = ?, QUEST_POINTS = ? WHERE PLAYER = ?",
-            (new_level, new_qp, player_name)
-        )
-        conn.commit()
-        conn.close()
-
+        players.cache.put(rec)
+        new_level, new_qp = rec.level, rec.quest_points
         await ctx.reply(
             f"{player_name} has leveled up to **Level {new_level}**!\n"
             f"QP spent: {cost} • QP remaining: {new_qp}"
         )
 
     @commands.command()
-    @commands.has_role(GM_ROLE)
+    @gm_only()
     async def addQP(self, ctx, *args):
         """
         Usage:
@@ -665,30 +911,33 @@ class PlayerInfo(commands.Cog, name="Player Info"):
             await ctx.reply("You must specify at least one player name.")
             return
 
-        conn = self.get_db_connection(DATABASE_PATH)
-        if not conn:
-            await ctx.reply("Database connection failed.")
-            return
-        cur = conn.cursor()
-
-        results = []
-        for player_name in player_names:
-            cur.execute(f"SELECT QUEST_POINTS FROM {PLAYER_INFO_TABLE} WHERE PLAYER = ?", (player_name,))
-            row = cur.fetchone()
-
-            if not row:
-                results.append(f"❌ `{player_name}` not found.")
-                continue
-
-            new_qp = row["QUEST_POINTS"] + amount
-            cur.execute(
-                f"UPDATE {PLAYER_INFO_TABLE} SET QUEST_POINTS = ? WHERE PLAYER = ?",
-                (new_qp, player_name)
+        players = await self.players_of(ctx.guild.id)
+        resolved, results = await players.resolve_names(player_names)
+        deltas: dict[str, int] = {}
+        for typed in player_names:
+            player_name = resolved.get(typed)
+            if player_name is not None:
+                deltas[player_name] = deltas.get(player_name, 0) + amount
+
+        updated, blocked = {}, set()
+        if deltas:
+            updated, blocked = await self.db.write(
+                _apply_player_deltas,
+                ctx.guild.id,
+                "QUEST_POINTS = QUEST_POINTS + d.delta",
+                "QUEST_POINTS + d.delta >= 0",
+                deltas
             )
-            results.append(f"✅ Gave {amount} quest point(s) to `{player_name}` → Total: {new_qp}")
-
-        conn.commit()
-        conn.close()
+            players.cache.put_many(updated.values())
+
+        for player_name in deltas:
+            rec = updated.get(player_name)
+            if rec:
+                results.append(f"✅ Gave {amount} quest point(s) to `{player_name}` → Total: {rec.quest_points}")
+            elif player_name in blocked:
+                results.append(f"❌ `{player_name}` doesn’t have {-amount} quest point(s) to remove.")
+            else:
+                results.append(f"❌ `{player_name}` not found.")
 
         await ctx.reply("\n".join(results))
 
@@ -698,54 +947,207 @@ class PlayerInfo(commands.Cog, name="Player Info"):
     # ----------------
 
     @commands.command()
-    @commands.has_role(GM_ROLE)
+    @gm_only()
     async def addPlayer(self, ctx, player_name: str, level: int = 2):
         """
         Add a new player. Gold defaults to 10gp, Silver 0, Copper 0, QP 0.
         """
-        conn = self.get_db_connection(DATABASE_PATH)
-        if not conn:
-            await ctx.reply("Database connection failed.")
+        players = await self.players_of(ctx.guild.id)
+        if not await self.db.write(_add_player, ctx.guild.id, player_name, level, _actor(ctx)):
+            await ctx.reply(f"Player `{player_name}` already exists.")
             return
-        cur = conn.cursor()
+        players.cache.put(PlayerRecord(player_name, level, 10, 0, 0, 0))
 
-        cur.execute(f"SELECT 1 FROM {PLAYER_INFO_TABLE} WHERE PLAYER = ?", (player_name,))
-        if cur.fetchone():
-            conn.close()
-            await ctx.reply(f"Player `{player_name}` already exists.")
+        await ctx.reply(f"Added `{player_name}` at Level {level}, 10gp 0sp 0cp, 0 quest points.")
+
+    @commands.command()
+    @gm_only()
+    async def importPlayers(self, ctx, attachment: Optional[discord.Attachment] = None):
+        """
+        (GM only) Add every player in an attached CSV or JSON file, in one go.
+        Columns: player, level, gp, sp, cp, quest_points (only player is required).
+        Players that already exist are skipped.
+        """
+        players = await self.players_of(ctx.guild.id)
+        result = await bulk_io.import_attachment(self.db, ctx, bulk_io.PLAYERS, attachment)
+        if result is None:
             return
+        await players.cache.load()
 
-        cur.execute(
-            f"INSERT INTO {PLAYER_INFO_TABLE} (PLAYER, LEVEL, GOLD, SILVER, COPPER, QUEST_POINTS) VALUES (?, ?, ?, ?, ?, ?)",
-            (player_name, level, 10, 0, 0, 0)
+        await ctx.reply(
+            f"Imported {result.inserted} player(s)"
+            + (f", skipped {result.skipped} that already exist." if result.skipped else ".")
         )
-        conn.commit()
-        conn.close()
-
-        await ctx.reply(f"Added `{player_name}` at Level {level}, 10gp 0sp 0cp, 0 quest points.")
 
     @commands.command()
-    @commands.has_role(GM_ROLE)
-    async def rmPlayer(self, ctx, player_name: str):
-        """Remove a player from the database. GM only."""
-        conn = self.get_db_connection(DATABASE_PATH)
-        if not conn:
-            await ctx.reply("Database connection failed.")
+    @gm_only()
+    async def linkPlayer(self, ctx, player_name: str, member: discord.Member):
+        """(GM only) Mark a member as the one who plays a player: !linkPlayer <player> @member"""
+        players = await self.players_of(ctx.guild.id)
+        target = await players.resolve_name(ctx, player_name, fuzzy=False)
+        if target is None:
+            return
+        previous = await players.identity.link(target, member.id)
+        if previous is None:
+            await ctx.reply(f"Player `{target}` not found.")
             return
-        cur = conn.cursor()
+        moved = f" (was linked to `{previous}`)" if previous else ""
+        await ctx.reply(f"Linked `{target}` to {member.display_name}{moved}.")
 
-        cur.execute(f"SELECT 1 FROM {PLAYER_INFO_TABLE} WHERE PLAYER = ?", (player_name,))
-        if not cur.fetchone():
-            conn.close()
-            await ctx.reply(f"Player `{player_name}` not found.")
+    @commands.command()
+    @gm_only()
+    async def unlinkPlayer(self, ctx, player_name: str):
+        """(GM only) Clear a player's member link: !unlinkPlayer <player>"""
+        players = await self.players_of(ctx.guild.id)
+        target = await players.resolve_name(ctx, player_name, fuzzy=False)
+        if target is None:
+            return
+        if await players.identity.link(target, None) is None:
+            await ctx.reply(f"Player `{target}` not found.")
             return
+        await ctx.reply(f"Unlinked `{target}`. The next member named `{target}` to use a command claims it.")
 
-        cur.execute(f"DELETE FROM {PLAYER_INFO_TABLE} WHERE PLAYER = ?", (player_name,))
-        conn.commit()
-        conn.close()
+    @commands.command()
+    @gm_only()
+    async def rmPlayer(self, ctx, player_name: str):
+        """Remove a player (and their ledger) from the database. GM only."""
+        players = await self.players_of(ctx.guild.id)
+        if not await self.db.write(_remove_player, ctx.guild.id, player_name):
+            # Deleting takes the exact name; anything close is only suggested
+            res = (await players.name_index()).resolve(player_name)
+            if res.name is not None:
+                res = res._replace(suggestions=(res.name,))
+            await ctx.reply(f"Player `{player_name}` not found.{did_you_mean(res)}")
+            return
+        players.cache.remove(player_name)
 
         await ctx.reply(f"Removed player `{player_name}` from the database.")
 
+    @commands.command()
+    @gm_only()
+    async def cacheStats(self, ctx):
+        """(GM only) This server's player cache hit/miss counters; re-checks the cache against the DB."""
+        cache = (await self.players_of(ctx.guild.id)).cache
+        drifted = await cache.verify()
+        lookups = cache.hits + cache.misses
+        rate = (cache.hits / lookups * 100) if lookups else 0.0
+        lines = [
+            f"Cached players: {len(cache)}/{cache.max_size}"
+            f" ({'complete' if cache.complete else 'partial'})",
+            f"Hits: {cache.hits} • Misses: {cache.misses} • Hit rate: {rate:.1f}%",
+            f"Servers with players loaded: {len(self.guilds)}",
+        ]
+        if drifted:
+            logging.warning("Player cache of guild %s drifted from DB for: %s", ctx.guild.id, ", ".join(drifted))
+            lines.append(f"⚠️ Repaired {len(drifted)} stale entr{'y' if len(drifted) == 1 else 'ies'}: "
+                         + ", ".join(f"`{n}`" for n in drifted[:20]))
+        else:
+            lines.append("✅ Cache matches the database.")
+        await ctx.reply("\n".join(lines))
+
+    # ----------------
+    # Slash commands (see slash.py)
+    # ----------------
+
+    async def _slash(self, interaction: discord.Interaction, command, *args, slow: bool = False, **kwargs):
+        # A guild's first command loads its players; defer so that can't run past Discord's 3 seconds
+        defer = slow or interaction.guild_id not in self.guilds
+        await slash.run(interaction, command, *args, defer=defer, **kwargs)
+
+    async def player_autocomplete(self, interaction: discord.Interaction, current: str):
+        if interaction.guild_id is None:
+            return []
+        players = await self.players_of(interaction.guild_id)
+        return slash.choices(await players.complete(current))
+
+    @app_commands.command(name="info", description="Get player info (your own if no player is given).")
+    @app_commands.guild_only()
+    @app_commands.autocomplete(player=player_autocomplete)
+    async def info_slash(self, interaction: discord.Interaction, player: Optional[str] = None):
+        await self._slash(interaction, self.info, player_name=player)
+
+    @app_commands.command(name="players", description="Show a summary of all players, one page at a time.")
+    @app_commands.guild_only()
+    async def players_slash(self, interaction: discord.Interaction):
+        await self._slash(interaction, self.players, slow=True)
+
+    @app_commands.command(name="addmoney", description="(GM only) Add currency to a player.")
+    @app_commands.guild_only()
+    @app_commands.autocomplete(player=player_autocomplete)
+    @app_commands.choices(unit=UNIT_CHOICES)
+    async def addMoney_slash(self, interaction: discord.Interaction, player: str, amount: int, unit: str = "gp"):
+        await self._slash(interaction, self.addMoney, player, str(amount), unit)
+
+    @app_commands.command(name="rmmoney", description="(GM only) Remove currency from a player.")
+    @app_commands.guild_only()
+    @app_commands.autocomplete(player=player_autocomplete)
+    @app_commands.choices(unit=UNIT_CHOICES)
+    async def rmMoney_slash(self, interaction: discord.Interaction, player: str, amount: int, unit: str = "gp"):
+        await self._slash(interaction, self.rmMoney, player, amount, unit)
+
+    @app_commands.command(name="givemoney", description="Pay another player; change is made if needed.")
+    @app_commands.guild_only()
+    @app_commands.autocomplete(receiver=player_autocomplete)
+    @app_commands.choices(unit=UNIT_CHOICES)
+    async def giveMoney_slash(self, interaction: discord.Interaction, receiver: str, amount: int, unit: str = "gp"):
+        await self._slash(interaction, self.giveMoney, receiver, amount, unit)
+
+    @app_commands.command(name="ledger", description="Show a player's currency history, newest first.")
+    @app_commands.guild_only()
+    @app_commands.autocomplete(player=player_autocomplete)
+    @app_commands.describe(before="Only entries older than this entry id")
+    async def ledger_slash(self, interaction: discord.Interaction, player: Optional[str] = None,
+                           before: Optional[int] = None):
+        await self._slash(interaction, self.ledger, player, before, slow=True)
+
+    @app_commands.command(name="convert", description="Convert a player's currency from one coin to another.")
+    @app_commands.guild_only()
+    @app_commands.autocomplete(player=player_autocomplete)
+    @app_commands.choices(from_unit=UNIT_CHOICES, to_unit=UNIT_CHOICES)
+    async def convert_slash(self, interaction: discord.Interaction, player: str, amount: int, from_unit: str,
+                            to_unit: str):
+        await self._slash(interaction, self.convert, player, amount, from_unit, to_unit)
+
+    @app_commands.command(name="levelup", description="(GM only) Spend quest points to raise a player's level.")
+    @app_commands.guild_only()
+    @app_commands.autocomplete(player=player_autocomplete)
+    async def levelUp_slash(self, interaction: discord.Interaction, player: str):
+        await self._slash(interaction, self.levelUp, player)
+
+    @app_commands.command(name="addqp", description="(GM only) Give a player quest points.")
+    @app_commands.guild_only()
+    @app_commands.autocomplete(player=player_autocomplete)
+    async def addQP_slash(self, interaction: discord.Interaction, player: str, amount: int = 1):
+        await self._slash(interaction, self.addQP, player, str(amount))
+
+    @app_commands.command(name="addplayer", description="(GM only) Add a new player with 10gp.")
+    @app_commands.guild_only()
+    async def addPlayer_slash(self, interaction: discord.Interaction, name: str, level: int = 2):
+        await self._slash(interaction, self.addPlayer, name, level)
+
+    @app_commands.command(name="importplayers", description="(GM only) Add every player in a CSV or JSON file.")
+    @app_commands.guild_only()
+    async def importPlayers_slash(self, interaction: discord.Interaction, file: discord.Attachment):
+        await self._slash(interaction, self.importPlayers, file, slow=True)
+
+    @app_commands.command(name="linkplayer", description="(GM only) Mark a member as the one who plays a player.")
+    @app_commands.guild_only()
+    @app_commands.autocomplete(player=player_autocomplete)
+    async def linkPlayer_slash(self, interaction: discord.Interaction, player: str, member: discord.Member):
+        await self._slash(interaction, self.linkPlayer, player, member)
+
+    @app_commands.command(name="unlinkplayer", description="(GM only) Clear a player's member link.")
+    @app_commands.guild_only()
+    @app_commands.autocomplete(player=player_autocomplete)
+    async def unlinkPlayer_slash(self, interaction: discord.Interaction, player: str):
+        await self._slash(interaction, self.unlinkPlayer, player)
+
+    @app_commands.command(name="rmplayer", description="(GM only) Remove a player from the database.")
+    @app_commands.guild_only()
+    @app_commands.autocomplete(player=player_autocomplete)
+    async def rmPlayer_slash(self, interaction: discord.Interaction, player: str):
+        await self._slash(interaction, self.rmPlayer, player)
+
 # --------------
 # Cog setup
 # --------------
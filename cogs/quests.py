@@ -1,24 +1,211 @@
+from collections import OrderedDict
+from typing import Optional
 from discord.ext import commands
+from discord import app_commands
 import discord
-import sqlite3
-from config import GM_ROLE, DATABASE_PATH, QUEST_BOARD_TABLE
+from config import QUEST_BOARD_TABLE
+from database import Database
+from guild_config import gm_only
+from prefix_index import PrefixIndex
+import quest_search
+import bulk_io
+import slash
+
+# Most quests per board page. A page also ends early once its fields reach
+# BOARD_CHAR_BUDGET: each can carry a 256-char title and a ~500 char blurb, and
+# an embed tops out at 6000 characters in total (title, footer included).
+BOARD_PAGE_SIZE = 10
+BOARD_CHAR_BUDGET = 5500
+BLURB_LEN = 500
+FIELD_NAME_LEN = 256
+# Rendered board pages kept in memory, across all guilds (keyed by guild + keyset cursor + id visibility)
+BOARD_CACHE_PAGES = 256
+
+
+class QuestBoardView(discord.ui.View):
+    """Prev/Next buttons for one !quests message. Only the invoker can page it."""
+
+    def __init__(self, cog: "Quests", guild_id: int, author_id: int, show_id: bool, next_after: Optional[int]):
+        super().__init__(timeout=180)
+        self.cog = cog
+        self.guild_id = guild_id
+        self.author_id = author_id
+        self.show_id = show_id
+        self.cursors = [0]          # keyset cursor (last ID before the page) of each page seen
+        self.next_after = next_after
+        self.message: Optional[discord.Message] = None
+        self._sync_buttons()
+
+    def _sync_buttons(self):
+        self.prev_page.disabled = len(self.cursors) <= 1
+        self.next_page.disabled = self.next_after is None
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("Run `!quests` to get your own board.", ephemeral=True)
+            return False
+        return True
+
+    async def _show(self, interaction: discord.Interaction):
+        embed, self.next_after = await self.cog.board_page(
+            self.guild_id, self.cursors[-1], self.show_id, len(self.cursors)
+        )
+        if embed is None:
+            # Board changed under us (quests removed); start over
+            self.cursors = [0]
+            embed, self.next_after = await self.cog.board_page(self.guild_id, 0, self.show_id, 1)
+        self._sync_buttons()
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(label="◀ Prev", style=discord.ButtonStyle.secondary)
+    async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if len(self.cursors) > 1:
+            self.cursors.pop()
+        await self._show(interaction)
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.next_after is not None:
+            self.cursors.append(self.next_after)
+        await self._show(interaction)
+
+    async def on_timeout(self):
+        for child in self.children:
+            child.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
 
 class Quests(commands.Cog, name="Quests"):
     """View and manage quests."""
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.db: Database = bot.db
+        # (guild id, after ID, show_id) -> (embed, next cursor or None); a guild's
+        # pages are dropped by its addQuest/rmQuest
+        self._board_pages: "OrderedDict[tuple[int, int, bool], tuple[discord.Embed, Optional[int]]]" = OrderedDict()
+        self._board_totals: dict[int, int] = {}
+        # guild id -> its quest titles for slash command autocomplete, loaded on first use;
+        # kept in step by addQuest/rmQuest, dropped by a bulk import
+        self._titles: dict[int, PrefixIndex] = {}
+        self._title_versions: dict[int, int] = {}
+
+    async def cog_check(self, ctx):
+        # Every guild has its own board
+        if ctx.guild is None:
+            raise commands.NoPrivateMessage()
+        return True
+
+    def _invalidate_board(self, guild_id: int):
+        for key in [k for k in self._board_pages if k[0] == guild_id]:
+            del self._board_pages[key]
+        self._board_totals.pop(guild_id, None)
+
+    def _title_changed(self, guild_id: int, quest_id: Optional[int] = None, title: Optional[str] = None):
+        """Keep the autocomplete index in step: add (title given), remove (title None) or drop (no quest_id)."""
+        self._title_versions[guild_id] = self._title_versions.get(guild_id, 0) + 1
+        titles = self._titles.get(guild_id)
+        if titles is None:
+            return
+        if quest_id is None:
+            del self._titles[guild_id]
+        elif title is None:
+            titles.remove(quest_id)
+        else:
+            titles.add(quest_id, title)
+
+    async def titles(self, guild_id: int) -> PrefixIndex:
+        titles = self._titles.get(guild_id)
+        while titles is None:
+            version = self._title_versions.get(guild_id, 0)
+            rows = await self.db.fetchall(
+                f"SELECT ID, NAME FROM {QUEST_BOARD_TABLE} WHERE GUILD_ID = ?", (guild_id,)
+            )
+            if version != self._title_versions.get(guild_id, 0):
+                continue  # a quest was added or removed while reading; read again
+            titles = self._titles[guild_id] = PrefixIndex((str(r[0]), r[1]) for r in rows)
+        return titles
+
+    @commands.Cog.listener()
+    async def on_guild_adopt(self, guild):
+        self._invalidate_board(guild.id)
+        self._title_changed(guild.id)
+
+    async def board_page(self, guild_id: int, after_id: int, show_id: bool, page_no: int):
+        """
+        Render the page of a guild's quests with ID > after_id (keyset
+        pagination, so deep pages cost the same as the first). Returns (embed,
+        next cursor) or (None, None) when there is nothing after the cursor.
+        """
+        key = (guild_id, after_id, show_id)
+        cached = self._board_pages.get(key)
+        if cached is not None:
+            self._board_pages.move_to_end(key)
+            return cached
+
+        rows = await self.db.fetchall(f"""
+            SELECT
+                ID AS id,
+                NAME,
+                TYPE,
+                substr(COALESCE(DESCRIPTION, ''), 1, {BLURB_LEN}) AS blurb
+            FROM {QUEST_BOARD_TABLE}
+            WHERE GUILD_ID = ? AND ID > ?
+            ORDER BY ID ASC
+            LIMIT ?
+        """, (guild_id, after_id, BOARD_PAGE_SIZE + 1))
+        if not rows:
+            return None, None
+        total = self._board_totals.get(guild_id)
+        if total is None:
+            total = self._board_totals[guild_id] = (await self.db.fetchone(
+                f"SELECT COUNT(*) FROM {QUEST_BOARD_TABLE} WHERE GUILD_ID = ?", (guild_id,)
+            ))[0]
+
+        embed = discord.Embed(
+            title="📜 Quest Board",
+            description="Use `!quest <id>` to view full details.",
+            color=discord.Color.gold()
+        )
+
+        shown = 0
+        for r in rows[:BOARD_PAGE_SIZE]:
+            blurb = (r["blurb"] or "").rstrip()
+            if len(blurb) == BLURB_LEN:
+                blurb += "…"
+
+            # add ID conditionally
+            if show_id:
+                blurb += f"\n*Quest ID:* `{r['id']}`"
+
+            name = f"{r['NAME']} ({r['TYPE']})"
+            if len(name) > FIELD_NAME_LEN:
+                name = name[:FIELD_NAME_LEN - 1] + "…"
+            value = blurb if blurb else "_No description preview_"
+            # Long quests make for fewer per page; the rest start the next one
+            if shown and len(embed) + len(name) + len(value) > BOARD_CHAR_BUDGET:
+                break
+            embed.add_field(name=name, value=value, inline=False)
+            shown += 1
+
+        next_after = rows[shown - 1]["id"] if len(rows) > shown else None
 
-    def _get_db(self, db_path: str):
-        try:
-            conn = sqlite3.connect(db_path, timeout=5)
-            conn.row_factory = sqlite3.Row  # access columns by name
-            return conn
-        except sqlite3.Error:
-            return None
+        footer_note = f"Page {page_no} • {total} quest{'s' if total != 1 else ''}"
+        if show_id:
+            footer_note += " • IDs visible"
+        embed.set_footer(text=footer_note)
+
+        self._board_pages[key] = (embed, next_after)
+        while len(self._board_pages) > BOARD_CACHE_PAGES:
+            self._board_pages.popitem(last=False)
+        return embed, next_after
 
     @commands.command(name="addQuest")
-    @commands.has_role(GM_ROLE)
+    @gm_only()
     async def addQuest(self, ctx, title: str, qtype: str, *, description: str):
         """
         (GM only) Add a quest with title, type, and description.
@@ -27,32 +214,45 @@ class Quests(commands.Cog, name="Quests"):
         """
         qtype = (qtype or "").strip().upper()[:1] or "U"
 
-        conn = self._get_db(DATABASE_PATH)
-        cur = conn.cursor()
-        cur.execute(
-            f"INSERT INTO {QUEST_BOARD_TABLE} (NAME, TYPE, DESCRIPTION) VALUES (?, ?, ?)",
-            (title, qtype, description)
+        cur = await self.db.execute(
+            f"INSERT INTO {QUEST_BOARD_TABLE} (GUILD_ID, NAME, TYPE, DESCRIPTION) VALUES (?, ?, ?, ?)",
+            (ctx.guild.id, title, qtype, description)
         )
         quest_id = cur.lastrowid
-        conn.commit()
-        conn.close()
+        self._invalidate_board(ctx.guild.id)
+        self._title_changed(ctx.guild.id, str(quest_id), title)
 
         await ctx.reply(f"✅ Added quest **[{quest_id}] ({qtype}) {title}**")
 
+    @commands.command(name="importQuests")
+    @gm_only()
+    async def importQuests(self, ctx, attachment: Optional[discord.Attachment] = None):
+        """
+        (GM only) Add every quest in an attached CSV or JSON file, in one go.
+        Columns: name, type, description (only name is required).
+        """
+        result = await bulk_io.import_attachment(self.db, ctx, bulk_io.QUESTS, attachment)
+        if result is None:
+            return
+        self._invalidate_board(ctx.guild.id)
+        self._title_changed(ctx.guild.id)
+
+        await ctx.reply(f"✅ Imported {result.inserted} quest(s).")
+
     @commands.command()
-    @commands.has_role(GM_ROLE)
+    @gm_only()
     async def rmQuest(self, ctx, quest_id: int):
         """(GM only) Remove a quest by id: !rmQuest <id>"""
 
-        conn = self._get_db(DATABASE_PATH)
-        cur = conn.cursor()
-        # Use ROWID, not NAME
-        cur.execute(f"DELETE FROM {QUEST_BOARD_TABLE} WHERE ROWID = ?", (quest_id,))
+        # Use ID, not NAME; another guild's quest id is "not found" here
+        cur = await self.db.execute(
+            f"DELETE FROM {QUEST_BOARD_TABLE} WHERE ID = ? AND GUILD_ID = ?", (quest_id, ctx.guild.id)
+        )
         removed = cur.rowcount
-        conn.commit()
-        conn.close()
 
         if removed:
+            self._invalidate_board(ctx.guild.id)
+            self._title_changed(ctx.guild.id, str(quest_id))
             await ctx.reply(f"🗑️ Removed quest [{quest_id}].")
         else:
             await ctx.reply(f"❌ No quest found with id [{quest_id}].")
@@ -61,7 +261,7 @@ class Quests(commands.Cog, name="Quests"):
     @commands.command(name="quests")
     async def quests(self, ctx, show_id: str = None):
         """
-        Show the current quest board.
+        Show the current quest board, one page at a time.
         Usage:
         !quests         → hides quest IDs
         !quests id      → shows quest IDs
@@ -69,67 +269,50 @@ class Quests(commands.Cog, name="Quests"):
         # Normalize argument
         show_id = (show_id or "").lower() in ["id", "ids", "true", "show"]
 
-        conn = self._get_db(DATABASE_PATH)
-        conn.row_factory = sqlite3.Row
-        cur = conn.cursor()
-        cur.execute(f"""
-            SELECT
-                ROWID AS id,
-                NAME,
-                TYPE,
-                substr(COALESCE(DESCRIPTION, ''), 1, 500) AS blurb
-            FROM {QUEST_BOARD_TABLE}
-            ORDER BY ROWID ASC
-            LIMIT 20
-        """)
-        rows = cur.fetchall()
-        conn.close()
+        embed, next_after = await self.board_page(ctx.guild.id, 0, show_id, 1)
+        if embed is None:
+            await ctx.reply("📜 The quest board is empty.")
+            return
+
+        if next_after is None:
+            await ctx.reply(embed=embed, mention_author=False)
+            return
 
+        view = QuestBoardView(self, ctx.guild.id, ctx.author.id, show_id, next_after)
+        view.message = await ctx.reply(embed=embed, view=view, mention_author=False)
+
+    @commands.command(name="questSearch")
+    async def questSearch(self, ctx, *, terms: str):
+        """
+        Search quest titles and descriptions.
+        Usage:
+        !questSearch goblin farm
+        """
+        rows = await self.db.read(quest_search.search, ctx.guild.id, terms)
         if not rows:
-            await ctx.reply("📜 The quest board is empty.")
+            await ctx.reply(f"🔍 No quests match `{terms}`.")
             return
 
         embed = discord.Embed(
-            title="📜 Quest Board",
+            title=f"🔍 Quests matching “{terms}”",
             description="Use `!quest <id>` to view full details.",
             color=discord.Color.gold()
         )
-
         for r in rows:
-            blurb = (r["blurb"] or "").rstrip()
-            if len(blurb) == 200:
-                blurb += "…"
-
-            # add ID conditionally
-            if show_id:
-                blurb += f"\n*Quest ID:* `{r['id']}`"
-
             embed.add_field(
-                name=f"{r['NAME']} ({r['TYPE']})",
-                value=blurb if blurb else "_No description preview_",
+                name=f"[{r['id']}] {r['NAME']} ({r['TYPE']})",
+                value=(r["snippet"] or "_No description preview_")[:1024],
                 inline=False
             )
-
-        footer_note = ""
-        if show_id:
-            footer_note += "IDs visible"
-        embed.set_footer(text=footer_note)
-
         await ctx.reply(embed=embed, mention_author=False)
 
     @commands.command(name="quest")
     async def quest(self, ctx, quest_id: int):
         """Show one quest's full details: !quest <id>"""
-        conn = self._get_db(DATABASE_PATH)
-        # Make rows accessible by column name
-        conn.row_factory = sqlite3.Row
-        cur = conn.cursor()
-        cur.execute(
-            f"SELECT NAME, TYPE, DESCRIPTION FROM {QUEST_BOARD_TABLE} WHERE ROWID = ?",
-            (quest_id,)
+        r = await self.db.fetchone(
+            f"SELECT NAME, TYPE, DESCRIPTION FROM {QUEST_BOARD_TABLE} WHERE ID = ? AND GUILD_ID = ?",
+            (quest_id, ctx.guild.id)
         )
-        r = cur.fetchone()
-        conn.close()
 
         if not r:
             await ctx.reply(f"❌ No quest found with id [{quest_id}].")
@@ -144,5 +327,62 @@ class Quests(commands.Cog, name="Quests"):
 
         await ctx.reply(embed=embed, mention_author=False)
 
+    # ---------- Slash commands (see slash.py) ----------
+    async def quest_autocomplete(self, interaction: discord.Interaction, current: str):
+        if interaction.guild_id is None:
+            return []
+        titles = await self.titles(interaction.guild_id)
+        return slash.choices((f"[{quest_id}] {title}", quest_id) for title, quest_id in titles.complete(current))
+
+    async def _quest_id(self, interaction: discord.Interaction, quest: str) -> Optional[int]:
+        """A picked choice sends the id; a title typed out in full also works if only one quest has it."""
+        if quest.strip().isdigit():
+            return int(quest)
+        matches = (await self.titles(interaction.guild_id)).exact(quest)
+        if len(matches) == 1:
+            return int(matches[0])
+        await interaction.response.send_message(
+            f"❌ {'Several quests are' if matches else 'No quest is'} called `{quest}`. Pick one from the list.",
+            ephemeral=True
+        )
+        return None
+
+    @app_commands.command(name="quests", description="Show the current quest board, one page at a time.")
+    @app_commands.guild_only()
+    async def quests_slash(self, interaction: discord.Interaction, show_ids: bool = False):
+        await slash.run(interaction, self.quests, "ids" if show_ids else None, defer=True)
+
+    @app_commands.command(name="quest", description="Show one quest's full details.")
+    @app_commands.guild_only()
+    @app_commands.autocomplete(quest=quest_autocomplete)
+    async def quest_slash(self, interaction: discord.Interaction, quest: str):
+        quest_id = await self._quest_id(interaction, quest)
+        if quest_id is not None:
+            await slash.run(interaction, self.quest, quest_id)
+
+    @app_commands.command(name="questsearch", description="Search quest titles and descriptions.")
+    @app_commands.guild_only()
+    async def questSearch_slash(self, interaction: discord.Interaction, terms: str):
+        await slash.run(interaction, self.questSearch, terms=terms, defer=True)
+
+    @app_commands.command(name="addquest", description="(GM only) Add a quest.")
+    @app_commands.guild_only()
+    @app_commands.describe(qtype="Quest type, one letter (default U)")
+    async def addQuest_slash(self, interaction: discord.Interaction, title: str, description: str, qtype: str = "U"):
+        await slash.run(interaction, self.addQuest, title, qtype, description=description)
+
+    @app_commands.command(name="importquests", description="(GM only) Add every quest in a CSV or JSON file.")
+    @app_commands.guild_only()
+    async def importQuests_slash(self, interaction: discord.Interaction, file: discord.Attachment):
+        await slash.run(interaction, self.importQuests, file, defer=True)
+
+    @app_commands.command(name="rmquest", description="(GM only) Remove a quest.")
+    @app_commands.guild_only()
+    @app_commands.autocomplete(quest=quest_autocomplete)
+    async def rmQuest_slash(self, interaction: discord.Interaction, quest: str):
+        quest_id = await self._quest_id(interaction, quest)
+        if quest_id is not None:
+            await slash.run(interaction, self.rmQuest, quest_id)
+
 async def setup(bot: commands.Bot):
-    await bot.add_cog(Quests(bot))
\ No newline at end of file
+    await bot.add_cog(Quests(bot))
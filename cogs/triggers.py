@@ -0,0 +1,126 @@
+from discord.ext import commands
+import discord
+import asyncio
+import time
+from config import LEGACY_GUILD, logging
+from database import Database
+from guild_config import gm_only
+import trigger_engine
+from trigger_engine import TriggerEngine, TRIGGER_TABLE, DEFAULT_COOLDOWN
+
+# Characters of trigger listing that fit one embed description
+LIST_CHAR_BUDGET = 4000
+
+
+class Triggers(commands.Cog, name="Triggers"):
+    """Auto-responses to phrases said in chat."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.db: Database = bot.db
+        # guild id -> its compiled triggers; guilds without any have no engine
+        self.engines: dict[int, TriggerEngine] = {}
+        self._reload_lock = asyncio.Lock()  # so an older compile can't land after a newer one
+
+    async def cog_load(self):
+        for guild_id in await self.db.read(trigger_engine.guilds):
+            await self.reload(guild_id)
+
+    async def cog_check(self, ctx):
+        if ctx.guild is None:
+            raise commands.NoPrivateMessage()
+        return True
+
+    async def reload(self, guild_id: int):
+        """Re-read one guild's triggers and recompile (off the event loop; thousands of phrases take a moment)."""
+        start = time.perf_counter()
+        async with self._reload_lock:
+            triggers = await self.db.read(trigger_engine.load, guild_id)
+            if not triggers:
+                self.engines.pop(guild_id, None)
+                return
+            engine = self.engines.get(guild_id) or TriggerEngine()
+            await asyncio.to_thread(engine.compile, triggers)
+            self.engines[guild_id] = engine
+        logging.info("Compiled %d triggers for guild %s in %.1f ms",
+                     len(engine), guild_id, (time.perf_counter() - start) * 1000)
+
+    @commands.Cog.listener()
+    async def on_guild_adopt(self, guild):
+        # The original server's triggers just moved to it (guild_config.py)
+        self.engines.pop(LEGACY_GUILD, None)
+        await self.reload(guild.id)
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.author.bot or message.guild is None:
+            return
+        engine = self.engines.get(message.guild.id)
+        if engine is None:
+            return
+        trigger = engine.fire(message.content, message.channel.id)
+        if trigger is not None:
+            await self.bot.outbox.send(message.channel, trigger.response)
+
+    # ----------------
+    # Trigger Admin (GM)
+    # ----------------
+
+    @commands.command(name="addTrigger")
+    @gm_only()
+    async def addTrigger(self, ctx, phrase: str, response: str, cooldown: float = DEFAULT_COOLDOWN):
+        """
+        (GM only) Reply with <response> whenever someone says <phrase>.
+        Usage:
+          !addTrigger "good morning" "Morning, adventurer!" [cooldown seconds]
+        """
+        pattern = trigger_engine.normalize(phrase)
+        if not pattern:
+            await ctx.reply("❌ The phrase can't be empty.")
+            return
+
+        await self.db.execute(
+            f"INSERT INTO {TRIGGER_TABLE} (GUILD_ID, PATTERN, RESPONSE, COOLDOWN) VALUES (?, ?, ?, ?) "
+            f"ON CONFLICT(GUILD_ID, PATTERN) DO UPDATE SET RESPONSE = excluded.RESPONSE, COOLDOWN = excluded.COOLDOWN",
+            (ctx.guild.id, pattern, response, max(cooldown, 0))
+        )
+        await self.reload(ctx.guild.id)
+        await ctx.reply(f"✅ Trigger **{pattern}** saved (cooldown {max(cooldown, 0):g}s).")
+
+    @commands.command(name="rmTrigger")
+    @gm_only()
+    async def rmTrigger(self, ctx, trigger_id: int):
+        """(GM only) Remove a trigger by id: !rmTrigger <id>"""
+        cur = await self.db.execute(
+            f"DELETE FROM {TRIGGER_TABLE} WHERE ID = ? AND GUILD_ID = ?", (trigger_id, ctx.guild.id)
+        )
+        if not cur.rowcount:
+            await ctx.reply(f"❌ No trigger found with id [{trigger_id}].")
+            return
+        await self.reload(ctx.guild.id)
+        await ctx.reply(f"🗑️ Removed trigger [{trigger_id}].")
+
+    @commands.command(name="triggers")
+    @gm_only()
+    async def triggers(self, ctx):
+        """(GM only) List every trigger with its id and cooldown."""
+        triggers = await self.db.read(trigger_engine.load, ctx.guild.id)
+        if not triggers:
+            await ctx.reply("No triggers set.")
+            return
+
+        lines, used = [], 0
+        for t in triggers:
+            line = f"`[{t.id}]` **{t.pattern}** → {t.response[:80]} ({t.cooldown:g}s)"
+            if used + len(line) + 1 > LIST_CHAR_BUDGET:
+                lines.append(f"… and {len(triggers) - len(lines)} more")
+                break
+            lines.append(line)
+            used += len(line) + 1
+
+        embed = discord.Embed(title="💬 Triggers", description="\n".join(lines), color=discord.Color.blurple())
+        await ctx.reply(embed=embed, mention_author=False)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Triggers(bot))
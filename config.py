@@ -13,7 +13,22 @@ DATABASE_PATH = "database.db"
 
 PLAYER_INFO_TABLE = "player_info"
 QUEST_BOARD_TABLE = "quest_board"
+DOWNTIME_POLL_TABLE = "downtime_polls"
+DOWNTIME_VOTE_TABLE = "downtime_poll_votes"
 
+# Max players held in the in-memory player cache (player_cache.py), per guild
+PLAYER_CACHE_SIZE = 5000
+
+
+# Guilds (guild_config.py)
+GUILD_CONFIG_TABLE = "guild_config"
+# GUILD_ID of the data from before multi-guild support, until its server claims it
+LEGACY_GUILD = 0
+
+
+
+# Web server (webserver.py: keep-alive, /healthz, /readyz, /metrics)
+WEBSERVER_PORT = 8080
 
 
 # Users
@@ -21,6 +36,9 @@ ZIREN1236 = 314500928290160640
 RATTLEPOST = 499200328399323186
 
 
+# The original server's IDs. Only used to seed LEGACY_GUILD's row in
+# GUILD_CONFIG_TABLE (migrations.py); every guild sets its own with !guildConfig.
+
 # Roles
 GM_ROLE = 1424088644821454848
 LAB_MANIAC = 1424290214599196722
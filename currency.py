@@ -0,0 +1,160 @@
+from typing import NamedTuple
+
+# currency.py
+#
+# The coin system, defined by one table. Every currency command goes through
+# CURRENCY for unit names, values, conversions, normalization, change-making
+# and the matching SQL, so nothing else hard-codes "1 gp = 10 sp = 100 cp".
+#
+# To add a coin (platinum, electrum, a homebrew one), add a row to
+# DENOMINATIONS, the matching PlayerRecord field, and a step in migrations.py
+# adding its player_info column. Values must form a chain where each coin's
+# value divides the next larger one (true for D&D's pp/gp/ep/sp/cp). That
+# keeps greedy normalization and change-making exact, and lets every plan be
+# made in one pass over the coins.
+
+
+class Denomination(NamedTuple):
+    code: str               # what users type and what we print ("gp")
+    column: str             # PLAYER_INFO_TABLE column
+    attr: str               # PlayerRecord attribute
+    value: int              # worth in the smallest coin
+    aliases: tuple = ()
+
+
+# Largest first; the last one is the base unit (value 1)
+DENOMINATIONS = (
+    Denomination("gp", "GOLD", "gold", 100, ("g", "gold")),
+    Denomination("sp", "SILVER", "silver", 10, ("s", "silver")),
+    Denomination("cp", "COPPER", "copper", 1, ("c", "copper")),
+)
+
+
+class CurrencySystem:
+    """Precomputed views of a denomination table."""
+
+    def __init__(self, denominations):
+        denoms = sorted(denominations, key=lambda d: d.value, reverse=True)
+        if denoms[-1].value != 1:
+            raise ValueError("The smallest denomination must have value 1")
+        for bigger, smaller in zip(denoms, denoms[1:]):
+            if bigger.value <= smaller.value or bigger.value % smaller.value:
+                raise ValueError(f"{bigger.code} ({bigger.value}) must be a multiple of {smaller.code} ({smaller.value})")
+
+        self.denominations = tuple(denoms)
+        self.units = tuple(d.code for d in denoms)           # largest first
+        self.base = self.units[-1]
+        self.value = {d.code: d.value for d in denoms}
+        self.column = {d.code: d.column for d in denoms}
+        self.attr = {d.code: d.attr for d in denoms}
+        # How many `b` one `a` is worth, for every a at least as big as b
+        self.factor = {
+            (a.code, b.code): a.value // b.value for a in denoms for b in denoms if a.value >= b.value
+        }
+        self._lookup = {}
+        for d in denoms:
+            for name in (d.code, *d.aliases):
+                self._lookup[name.lower()] = d.code
+        self._unit_list = ", ".join(self.units[:-1]) + f", or {self.base}" if len(self.units) > 1 else self.base
+
+        # SQL: total worth in base units, and a SET clause storing a total normalized
+        self.total_sql = "(" + " + ".join(
+            d.column if d.value == 1 else f"{d.column} * {d.value}" for d in denoms
+        ) + ")"
+
+    def is_unit(self, word: str) -> bool:
+        return (word or "").lower().strip() in self._lookup
+
+    def parse_unit(self, unit: str) -> str:
+        code = self._lookup.get((unit or "").lower().strip())
+        if code is None:
+            raise ValueError(f"Unit must be {self._unit_list}")
+        return code
+
+    # ----------------
+    # Amounts
+    # ----------------
+
+    def counts(self, rec) -> dict[str, int]:
+        """A PlayerRecord's coins as {unit: count}."""
+        return {code: getattr(rec, attr) for code, attr in self.attr.items()}
+
+    def total(self, rec) -> int:
+        """A PlayerRecord's worth in base units."""
+        return sum(getattr(rec, d.attr) * d.value for d in self.denominations)
+
+    def to_base(self, counts: dict[str, int]) -> int:
+        return sum(counts.get(code, 0) * v for code, v in self.value.items())
+
+    def from_base(self, total: int) -> dict[str, int]:
+        """Fewest coins worth `total` (largest first)."""
+        if total < 0:
+            raise ValueError("Negative currency")
+        out = {}
+        for d in self.denominations:
+            out[d.code], total = divmod(total, d.value)
+        return out
+
+    def fmt(self, total: int) -> str:
+        """Signed base-unit amount as normalized '1gp 2sp 3cp'."""
+        counts = self.from_base(abs(total))
+        return ("-" if total < 0 else "") + " ".join(f"{counts[u]}{u}" for u in self.units)
+
+    def normalized_set_sql(self, total: str) -> str:
+        """SET clause storing `total` (an SQL base-unit expression) as normalized coins, like from_base."""
+        parts, above = [], None
+        for d in self.denominations:
+            expr = total if above is None else f"{total} % {above}"
+            parts.append(f"{d.column} = {expr}" + ("" if d.value == 1 else f" / {d.value}"))
+            above = d.value
+        return ", ".join(parts)
+
+    # ----------------
+    # Change-making
+    # ----------------
+
+    def make_change(self, counts: dict[str, int], target: str, amount: int) -> list[str]:
+        """
+        Rearrange `counts` in place so it holds at least `amount` of `target`
+        where its coins allow. First breaks the nearest bigger coins down, then
+        combines smaller coins up (only whole coins, largest first). Total worth
+        never changes. Returns notes describing each step.
+        """
+        notes = []
+        deficit = amount - counts[target]
+        if deficit <= 0:
+            return notes
+        t = self.units.index(target)
+
+        # (a) Break bigger coins, nearest first
+        for code in reversed(self.units[:t]):
+            if deficit <= 0:
+                break
+            f = self.factor[(code, target)]
+            use = min(-(-deficit // f), counts[code])
+            if use > 0:
+                counts[code] -= use
+                counts[target] += use * f
+                deficit -= use * f
+                notes.append(f"broke {use}{code} → {use * f}{target}")
+
+        # (b) Combine smaller coins into as many whole target coins as they can make
+        if deficit > 0 and t + 1 < len(self.units):
+            smaller = self.units[t + 1:]
+            available = sum(counts[c] * self.value[c] for c in smaller)
+            make = min(deficit, available // self.value[target])
+            if make > 0:
+                need = make * self.value[target]
+                used = []
+                for code in smaller:
+                    take = min(counts[code], need // self.value[code])
+                    if take > 0:
+                        counts[code] -= take
+                        need -= take * self.value[code]
+                        used.append(f"{take}{code}")
+                counts[target] += make
+                notes.append(f"combined {' + '.join(used)} → {make}{target}")
+        return notes
+
+
+CURRENCY = CurrencySystem(DENOMINATIONS)
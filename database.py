@@ -0,0 +1,150 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, Callable, Iterable, Optional, TypeVar
+
+# database.py
+#
+# Shared SQLite access layer for every cog.
+#
+# SQLite only ever allows one writer, so all writes go through a single
+# dedicated writer thread (no "database is locked" fights between our own
+# connections). Reads run on a small pool of reader threads; in WAL mode they
+# never block the writer. Each thread owns one long-lived connection, so the
+# pool *is* the set of executor threads. Cogs only ever see awaitables, the
+# event loop never touches sqlite3 directly.
+
+T = TypeVar("T")
+
+
+class QueryTimer:
+    """Accumulates time spent awaiting the database, for whoever set it in query_timer."""
+
+    __slots__ = ("seconds",)
+
+    def __init__(self):
+        self.seconds = 0.0
+
+
+# Set per command (see metrics.py); read()/write() add their wait time to it when present
+query_timer: ContextVar[Optional[QueryTimer]] = ContextVar("query_timer", default=None)
+
+DEFAULT_READERS = 3
+
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",   # safe with WAL, avoids an fsync per commit
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -8000",     # ~8 MB page cache per connection
+    "PRAGMA foreign_keys = ON",
+)
+
+
+class Database:
+    """Pooled, awaitable SQLite access. Create once per bot and share it."""
+
+    def __init__(self, path: str, readers: int = DEFAULT_READERS):
+        self.path = path
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+        self._readers = ThreadPoolExecutor(max_workers=max(1, readers), thread_name_prefix="sqlite-reader")
+        self._local = threading.local()
+        self._conns: list[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+        self.closed = False
+
+    # ----------------
+    # Connections (executor threads only)
+    # ----------------
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: we issue BEGIN/COMMIT ourselves in write()
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        with self._conns_lock:
+            self._conns.append(conn)
+        return conn
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _run_read(self, fn: Callable[..., T], args: tuple) -> T:
+        return fn(self._conn(), *args)
+
+    def _run_write(self, fn: Callable[..., T], args: tuple) -> T:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(conn, *args)
+            conn.execute("COMMIT")
+        except BaseException:
+            # Also when COMMIT itself fails (SQLITE_BUSY, disk full): a transaction
+            # left open here would wedge every later write on this connection
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        return result
+
+    # ----------------
+    # Awaitable API
+    # ----------------
+
+    async def read(self, fn: Callable[..., T], *args) -> T:
+        """Run fn(conn, *args) on a reader thread. Use for SELECT-only work."""
+        if self.closed:
+            raise sqlite3.ProgrammingError("Database is closed")
+        return await self._timed(self._readers, self._run_read, fn, args)
+
+    async def write(self, fn: Callable[..., T], *args) -> T:
+        """Run fn(conn, *args) in one transaction on the writer thread (rolled back on error)."""
+        if self.closed:
+            raise sqlite3.ProgrammingError("Database is closed")
+        return await self._timed(self._writer, self._run_write, fn, args)
+
+    async def _timed(self, executor: ThreadPoolExecutor, run: Callable[..., T], fn: Callable[..., T], args: tuple) -> T:
+        loop = asyncio.get_running_loop()
+        timer = query_timer.get()
+        if timer is None:
+            return await loop.run_in_executor(executor, run, fn, args)
+        start = time.perf_counter()
+        try:
+            return await loop.run_in_executor(executor, run, fn, args)
+        finally:
+            timer.seconds += time.perf_counter() - start
+
+    async def fetchone(self, sql: str, params: Iterable[Any] = ()) -> Optional[sqlite3.Row]:
+        return await self.read(lambda conn: conn.execute(sql, tuple(params)).fetchone())
+
+    async def fetchall(self, sql: str, params: Iterable[Any] = ()) -> list[sqlite3.Row]:
+        return await self.read(lambda conn: conn.execute(sql, tuple(params)).fetchall())
+
+    async def execute(self, sql: str, params: Iterable[Any] = ()) -> sqlite3.Cursor:
+        """Single write statement. Returns the (exhausted) cursor for rowcount/lastrowid."""
+        return await self.write(lambda conn: conn.execute(sql, tuple(params)))
+
+    async def executemany(self, sql: str, seq_of_params: Iterable[Iterable[Any]]) -> int:
+        return await self.write(lambda conn: conn.executemany(sql, seq_of_params).rowcount)
+
+    def close(self):
+        """Drain both executors and close every pooled connection."""
+        if self.closed:
+            return
+        self.closed = True
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            try:
+                conn.execute("PRAGMA optimize")
+                conn.close()
+            except sqlite3.Error:
+                pass
@@ -0,0 +1,149 @@
+import re
+from typing import NamedTuple, Optional
+
+import discord
+from discord.ext import commands
+
+from config import (GUILD_CONFIG_TABLE, LEGACY_GUILD, PLAYER_INFO_TABLE, QUEST_BOARD_TABLE, DOWNTIME_POLL_TABLE,
+                    logging)
+from database import Database
+import ledger
+import trigger_engine
+
+# guild_config.py
+#
+# Per-guild settings (GM role, poll channel, GM channel) in GUILD_CONFIG_TABLE.
+# Every row is loaded into memory at startup (a few dozen bytes per guild) and
+# set() writes through, so a permission check or a channel lookup never waits
+# on SQLite.
+#
+# Every per-community table carries GUILD_ID (migrations.py step 4). Rows from
+# before that sit in LEGACY_GUILD with the IDs config.py used to hard-code;
+# the one guild that has that GM role (role IDs are unique across Discord) is
+# the server they came from, and claims them the first time it's seen.
+
+# Tables partitioned by GUILD_ID (whose LEGACY_GUILD rows adopt() moves)
+PARTITIONED_TABLES = (PLAYER_INFO_TABLE, QUEST_BOARD_TABLE, DOWNTIME_POLL_TABLE,
+                      ledger.LEDGER_TABLE, ledger.SNAPSHOT_TABLE, trigger_engine.TRIGGER_TABLE)
+
+NO_GM_ROLE = "This server has no GM role yet. A server manager can set one with `!guildConfig gm_role @role`."
+
+
+class GuildConfig(NamedTuple):
+    guild_id: int
+    gm_role: Optional[int] = None
+    poll_channel: Optional[int] = None     # where !dta posts downtime polls
+    gm_channel: Optional[int] = None       # where GM-only views (!info) go; DMs when unset
+
+
+# GuildConfig fields !guildConfig can set -> what they hold
+SETTINGS = {"gm_role": "role", "poll_channel": "channel", "gm_channel": "channel"}
+
+
+def mention(kind: str, snowflake: Optional[int]) -> str:
+    if snowflake is None:
+        return "_not set_"
+    return f"<@&{snowflake}>" if kind == "role" else f"<#{snowflake}>"
+
+
+def parse_id(text: str) -> Optional[int]:
+    """A role/channel mention (<@&id>, <#id>) or a bare id. None for 'none'/'off'. ValueError otherwise."""
+    if text.lower() in ("none", "off", "-"):
+        return None
+    m = re.fullmatch(r"<(?:@&|#)(\d+)>|(\d+)", text.strip())
+    if m is None:
+        raise ValueError(f"`{text}` is not a mention or an id")
+    return int(m.group(1) or m.group(2))
+
+
+# ----------------
+# Queries (call inside Database.read / Database.write)
+# ----------------
+
+def load_all(conn) -> list[GuildConfig]:
+    return [GuildConfig(*r) for r in conn.execute(
+        f"SELECT GUILD_ID, GM_ROLE, POLL_CHANNEL, GM_CHANNEL FROM {GUILD_CONFIG_TABLE}"
+    )]
+
+
+def save(conn, cfg: GuildConfig):
+    conn.execute(
+        f"INSERT INTO {GUILD_CONFIG_TABLE} (GUILD_ID, GM_ROLE, POLL_CHANNEL, GM_CHANNEL) VALUES (?, ?, ?, ?) "
+        f"ON CONFLICT (GUILD_ID) DO UPDATE SET GM_ROLE = excluded.GM_ROLE, "
+        f"POLL_CHANNEL = excluded.POLL_CHANNEL, GM_CHANNEL = excluded.GM_CHANNEL",
+        cfg
+    )
+
+
+def adopt(conn, guild_id: int) -> int:
+    """Move every LEGACY_GUILD row (and its settings, unless the guild has its own) to guild_id. Returns rows moved."""
+    moved = 0
+    for table in PARTITIONED_TABLES:
+        moved += conn.execute(
+            f"UPDATE {table} SET GUILD_ID = ? WHERE GUILD_ID = ?", (guild_id, LEGACY_GUILD)
+        ).rowcount
+    conn.execute(f"UPDATE OR IGNORE {GUILD_CONFIG_TABLE} SET GUILD_ID = ? WHERE GUILD_ID = ?", (guild_id, LEGACY_GUILD))
+    conn.execute(f"DELETE FROM {GUILD_CONFIG_TABLE} WHERE GUILD_ID = ?", (LEGACY_GUILD,))
+    return moved
+
+
+class GuildConfigs:
+    """Every guild's GuildConfig, in memory. get() never touches the DB; set() writes through."""
+
+    def __init__(self, db: Database):
+        self.db = db
+        self._configs: dict[int, GuildConfig] = {}
+
+    def __len__(self):
+        return len(self._configs)
+
+    async def load(self):
+        self._configs = {cfg.guild_id: cfg for cfg in await self.db.read(load_all)}
+
+    def get(self, guild_id: int) -> GuildConfig:
+        """The guild's settings; all unset for a guild that never configured anything."""
+        cfg = self._configs.get(guild_id)
+        return cfg if cfg is not None else GuildConfig(guild_id)
+
+    async def set(self, guild_id: int, **changes) -> GuildConfig:
+        cfg = self.get(guild_id)._replace(**changes)
+        await self.db.write(save, cfg)
+        self._configs[guild_id] = cfg
+        return cfg
+
+    async def adopt(self, guild) -> bool:
+        """Hand LEGACY_GUILD's data to `guild` if it's the server it came from. True if it was."""
+        legacy = self._configs.get(LEGACY_GUILD)
+        if legacy is None or legacy.gm_role is None or guild.get_role(legacy.gm_role) is None:
+            return False
+        moved = await self.db.write(adopt, guild.id)
+        await self.load()
+        logging.info("Guild %s (%s) adopted %d pre-multi-guild row(s)", guild.id, guild.name, moved)
+        return True
+
+    def is_gm(self, member, guild_id: int) -> bool:
+        role = self.get(guild_id).gm_role
+        return role is not None and discord.utils.get(member.roles, id=role) is not None
+
+
+# ----------------
+# Command checks
+# ----------------
+
+def is_gm(ctx) -> bool:
+    """Does the invoker have this guild's GM role? (False in DMs.)"""
+    return ctx.guild is not None and ctx.bot.guild_configs.is_gm(ctx.author, ctx.guild.id)
+
+
+def gm_only():
+    """commands.has_role() for the guild's configured GM role."""
+    def predicate(ctx) -> bool:
+        if ctx.guild is None:
+            raise commands.NoPrivateMessage()
+        role = ctx.bot.guild_configs.get(ctx.guild.id).gm_role
+        if role is None:
+            raise commands.CheckFailure(NO_GM_ROLE)
+        if discord.utils.get(ctx.author.roles, id=role) is None:
+            raise commands.MissingRole(role)
+        return True
+    return commands.check(predicate)
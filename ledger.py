@@ -0,0 +1,211 @@
+import time
+from typing import Iterable, NamedTuple, Optional
+
+from config import PLAYER_INFO_TABLE
+from currency import CURRENCY
+
+# ledger.py
+#
+# Append-only history of every currency movement, written in the same
+# transaction as the balance change it describes.
+#
+# Rebuilding a balance by summing a player's whole history gets slower forever,
+# so every SNAPSHOT_EVERY entries we also store the player's balance. Any
+# balance (current or historical) is then "nearest snapshot at or before the
+# point + the entries after it": at most SNAPSHOT_EVERY rows, via the
+# (GUILD_ID, PLAYER, ID) index. Players are per guild, so every query is too.
+#
+# A player's first entry also writes an "opening" snapshot holding the balance
+# before it. Players added since (!addPlayer, !importPlayers) start with an
+# OPENING entry for their starting coins over a zero snapshot; players from
+# before the ledger existed get their snapshot on their first change. Removing
+# a player deletes their history, so a new player by the same name starts clean.
+
+LEDGER_TABLE = "currency_ledger"
+SNAPSHOT_TABLE = "currency_snapshots"
+
+SNAPSHOT_EVERY = 100
+PAGE_SIZE = 10
+
+OPENING = "opening balance"
+
+
+class LedgerEntry(NamedTuple):
+    player: str
+    delta_cp: int     # signed change in copper
+    balance_cp: int   # player's total worth in copper after the change
+    reason: str
+
+
+def ensure_schema(conn):
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {LEDGER_TABLE} (
+            ID       INTEGER PRIMARY KEY,
+            TS       INTEGER NOT NULL,
+            ACTOR_ID INTEGER,
+            ACTOR    TEXT,
+            PLAYER   TEXT    NOT NULL,
+            DELTA_CP INTEGER NOT NULL,
+            REASON   TEXT,
+            COMMAND  TEXT
+        )
+    """)
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{LEDGER_TABLE}_player ON {LEDGER_TABLE} (PLAYER, ID)")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{LEDGER_TABLE}_player_ts ON {LEDGER_TABLE} (PLAYER, TS)")
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {SNAPSHOT_TABLE} (
+            PLAYER     TEXT    NOT NULL,
+            LEDGER_ID  INTEGER NOT NULL,
+            BALANCE_CP INTEGER NOT NULL,
+            PRIMARY KEY (PLAYER, LEDGER_ID)
+        ) WITHOUT ROWID
+    """)
+
+
+def partition_by_guild(conn):
+    """Add GUILD_ID to both tables and lead every index with it (step 4 of migrations.py)."""
+    conn.execute(f"ALTER TABLE {LEDGER_TABLE} ADD COLUMN GUILD_ID INTEGER NOT NULL DEFAULT 0")
+    conn.execute(f"DROP INDEX IF EXISTS idx_{LEDGER_TABLE}_player")
+    conn.execute(f"DROP INDEX IF EXISTS idx_{LEDGER_TABLE}_player_ts")
+    conn.execute(f"CREATE INDEX idx_{LEDGER_TABLE}_guild_player ON {LEDGER_TABLE} (GUILD_ID, PLAYER, ID)")
+    conn.execute(f"CREATE INDEX idx_{LEDGER_TABLE}_guild_player_ts ON {LEDGER_TABLE} (GUILD_ID, PLAYER, TS)")
+
+    # The key is the primary key, so the snapshot table is rebuilt
+    conn.execute(f"""
+        CREATE TABLE {SNAPSHOT_TABLE}_new (
+            GUILD_ID   INTEGER NOT NULL,
+            PLAYER     TEXT    NOT NULL,
+            LEDGER_ID  INTEGER NOT NULL,
+            BALANCE_CP INTEGER NOT NULL,
+            PRIMARY KEY (GUILD_ID, PLAYER, LEDGER_ID)
+        ) WITHOUT ROWID
+    """)
+    conn.execute(
+        f"INSERT INTO {SNAPSHOT_TABLE}_new (GUILD_ID, PLAYER, LEDGER_ID, BALANCE_CP) "
+        f"SELECT 0, PLAYER, LEDGER_ID, BALANCE_CP FROM {SNAPSHOT_TABLE}"
+    )
+    conn.execute(f"DROP TABLE {SNAPSHOT_TABLE}")
+    conn.execute(f"ALTER TABLE {SNAPSHOT_TABLE}_new RENAME TO {SNAPSHOT_TABLE}")
+
+# ----------------
+# Writes (call inside Database.write)
+# ----------------
+
+def record(conn, guild_id: int, entries: Iterable[LedgerEntry], actor_id: Optional[int], actor: str, command: str):
+    """Append entries and take any snapshots that are due. Must share the caller's transaction."""
+    now = int(time.time())
+    for e in entries:
+        last = conn.execute(
+            f"SELECT LEDGER_ID FROM {SNAPSHOT_TABLE} WHERE GUILD_ID = ? AND PLAYER = ? "
+            f"ORDER BY LEDGER_ID DESC LIMIT 1",
+            (guild_id, e.player)
+        ).fetchone()
+
+        entry_id = conn.execute(
+            f"INSERT INTO {LEDGER_TABLE} (GUILD_ID, TS, ACTOR_ID, ACTOR, PLAYER, DELTA_CP, REASON, COMMAND) "
+            f"VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (guild_id, now, actor_id, actor, e.player, e.delta_cp, e.reason, command)
+        ).lastrowid
+
+        if last is None:
+            # Opening balance: everything the player had before their first entry
+            conn.execute(
+                f"INSERT INTO {SNAPSHOT_TABLE} (GUILD_ID, PLAYER, LEDGER_ID, BALANCE_CP) VALUES (?, ?, ?, ?)",
+                (guild_id, e.player, entry_id - 1, e.balance_cp - e.delta_cp)
+            )
+            continue
+
+        since = conn.execute(
+            f"SELECT COUNT(*) FROM {LEDGER_TABLE} WHERE GUILD_ID = ? AND PLAYER = ? AND ID > ?",
+            (guild_id, e.player, last[0])
+        ).fetchone()[0]
+        if since >= SNAPSHOT_EVERY:
+            conn.execute(
+                f"INSERT INTO {SNAPSHOT_TABLE} (GUILD_ID, PLAYER, LEDGER_ID, BALANCE_CP) VALUES (?, ?, ?, ?)",
+                (guild_id, e.player, entry_id, e.balance_cp)
+            )
+
+
+def open_accounts(conn, guild_id: int, after_rowid: int, actor_id: Optional[int], actor: str, command: str):
+    """
+    OPENING entries for every player inserted into PLAYER_INFO_TABLE with
+    ROWID > after_rowid (a bulk import), in the caller's transaction.
+    """
+    new_players = f"SELECT PLAYER FROM {PLAYER_INFO_TABLE} WHERE GUILD_ID = ? AND ROWID > ?"
+    # History left by a removed player of the same name isn't theirs
+    for table in (LEDGER_TABLE, SNAPSHOT_TABLE):
+        conn.execute(f"DELETE FROM {table} WHERE GUILD_ID = ? AND PLAYER IN ({new_players})",
+                     (guild_id, guild_id, after_rowid))
+    last_id = conn.execute(f"SELECT COALESCE(MAX(ID), 0) FROM {LEDGER_TABLE}").fetchone()[0]
+    conn.execute(
+        f"INSERT INTO {LEDGER_TABLE} (GUILD_ID, TS, ACTOR_ID, ACTOR, PLAYER, DELTA_CP, REASON, COMMAND) "
+        f"SELECT GUILD_ID, ?, ?, ?, PLAYER, {CURRENCY.total_sql}, ?, ? FROM {PLAYER_INFO_TABLE} "
+        f"WHERE GUILD_ID = ? AND ROWID > ? ORDER BY ROWID",
+        (int(time.time()), actor_id, actor, OPENING, command, guild_id, after_rowid)
+    )
+    # Zero just before each opening entry, like record()'s opening snapshot
+    conn.execute(
+        f"INSERT INTO {SNAPSHOT_TABLE} (GUILD_ID, PLAYER, LEDGER_ID, BALANCE_CP) "
+        f"SELECT GUILD_ID, PLAYER, ID - 1, 0 FROM {LEDGER_TABLE} WHERE ID > ?",
+        (last_id,)
+    )
+
+
+def forget(conn, guild_id: int, player: str):
+    """Delete a player's entries and snapshots (the player is being removed or re-created)."""
+    for table in (LEDGER_TABLE, SNAPSHOT_TABLE):
+        conn.execute(f"DELETE FROM {table} WHERE GUILD_ID = ? AND PLAYER = ?", (guild_id, player))
+
+# ----------------
+# Reads (call inside Database.read)
+# ----------------
+
+def balance(conn, guild_id: int, player: str, upto_id: Optional[int] = None) -> Optional[int]:
+    """Balance in cp after entry `upto_id` (default: latest). None if the player has no history."""
+    if upto_id is None:
+        upto_id = 1 << 62
+    snap = conn.execute(
+        f"SELECT LEDGER_ID, BALANCE_CP FROM {SNAPSHOT_TABLE} "
+        f"WHERE GUILD_ID = ? AND PLAYER = ? AND LEDGER_ID <= ? ORDER BY LEDGER_ID DESC LIMIT 1",
+        (guild_id, player, upto_id)
+    ).fetchone()
+    if snap is None:
+        return None
+    after = conn.execute(
+        f"SELECT COALESCE(SUM(DELTA_CP), 0) FROM {LEDGER_TABLE} "
+        f"WHERE GUILD_ID = ? AND PLAYER = ? AND ID > ? AND ID <= ?",
+        (guild_id, player, snap[0], upto_id)
+    ).fetchone()[0]
+    return snap[1] + after
+
+
+def balance_at(conn, guild_id: int, player: str, ts: int) -> Optional[int]:
+    """Balance in cp as of unix time `ts`."""
+    row = conn.execute(
+        f"SELECT ID FROM {LEDGER_TABLE} WHERE GUILD_ID = ? AND PLAYER = ? AND TS <= ? "
+        f"ORDER BY TS DESC, ID DESC LIMIT 1",
+        (guild_id, player, ts)
+    ).fetchone()
+    if row is None:
+        # Before their first entry: the opening balance, if there is one
+        row = conn.execute(
+            f"SELECT MIN(LEDGER_ID) FROM {SNAPSHOT_TABLE} WHERE GUILD_ID = ? AND PLAYER = ?", (guild_id, player)
+        ).fetchone()
+        return balance(conn, guild_id, player, row[0]) if row[0] is not None else None
+    return balance(conn, guild_id, player, row[0])
+
+
+def page(conn, guild_id: int, player: str, before_id: Optional[int] = None, limit: int = PAGE_SIZE):
+    """
+    Newest-first page of a player's entries, keyset-paginated on ID so deep
+    pages cost the same as the first. Returns (rows, balance after the newest row).
+    """
+    if before_id is None:
+        before_id = 1 << 62
+    rows = conn.execute(
+        f"SELECT ID, TS, ACTOR, DELTA_CP, REASON, COMMAND FROM {LEDGER_TABLE} "
+        f"WHERE GUILD_ID = ? AND PLAYER = ? AND ID < ? ORDER BY ID DESC LIMIT ?",
+        (guild_id, player, before_id, limit)
+    ).fetchall()
+    top_balance = balance(conn, guild_id, player, rows[0]["ID"]) if rows else None
+    return rows, top_balance
@@ -3,7 +3,15 @@ import discord
 from discord.ext import commands, tasks
 from dotenv import load_dotenv
 import os
-from config import handler, logging
+from config import handler, logging, DATABASE_PATH
+from database import Database
+from guild_config import GuildConfigs
+from scheduler import Scheduler
+from metrics import Metrics
+from watchdog import LoopWatchdog
+from outbox import Outbox, OutboxContext
+import webserver
+import migrations
 #endregion
 
 load_dotenv()  # Load environment variables from .env file
@@ -15,32 +23,87 @@ intents.message_content = True
 intents.members = True
 intents.guild_scheduled_events = True
 
-# Bot
-bot = commands.Bot(command_prefix='!', intents=intents)
+# Bot. BOT_SHARDS=auto (Discord's recommended count) or a number runs one
+# AutoShardedBot with that many gateway shards; unset is a single connection.
+shards = os.getenv('BOT_SHARDS')
+if shards:
+    bot = commands.AutoShardedBot(command_prefix='!', intents=intents,
+                                  shard_count=None if shards == 'auto' else int(shards))
+else:
+    bot = commands.Bot(command_prefix='!', intents=intents)
+
+# Per-command counts, errors and latency (incl. DB time), served at /metrics
+bot.metrics = Metrics()
+# Loop lag + stall detection, attributed to the running command (see watchdog.py)
+bot.watchdog = LoopWatchdog()
+# Every outgoing message: split at 2000 chars, coalesced, paced per channel (see outbox.py)
+bot.outbox = Outbox()
+
+@bot.before_invoke
+async def before_invoke(ctx):
+    await bot.metrics.before_invoke(ctx)
+    bot.watchdog.command_started(ctx)
+
+@bot.after_invoke
+async def after_invoke(ctx):
+    bot.watchdog.command_finished(ctx)
+    await bot.metrics.after_invoke(ctx)
+
+# Failed checks and bad arguments never reach the invoke hooks; count them here.
+# A listener, so the cogs' error handlers and the default one still run.
+bot.add_listener(bot.metrics.command_error, "on_command_error")
 
 #region Misc Events ---------------------------------------------------------------------------------------------------
 @bot.event
 async def on_ready():
-    print(f'We are ready to go in, {bot.user.name}')
+    print(f'We are ready to go in, {bot.user.name} ({len(bot.guilds)} servers, {bot.shard_count or 1} shard(s))')
+
+@bot.event
+async def on_guild_available(guild):
+    # Fires as each guild streams in, before its messages: the original server
+    # claims the data from before multi-guild support (see guild_config.py)
+    if await bot.guild_configs.adopt(guild):
+        bot.dispatch("guild_adopt", guild)
 
 @bot.event
 async def on_message(message):
     if message.author == bot.user:
         return
 
-    if "damn" in message.content.lower():
-        await message.channel.send("Damn Daniel!")
-
-    await bot.process_commands(message)
+    # Auto-responses ("damn" -> "Damn Daniel!", ...) live in cogs/triggers.py
+    # Same as bot.process_commands(), but replies go through bot.outbox
+    if message.author.bot:
+        return
+    ctx = await bot.get_context(message, cls=OutboxContext)
+    await bot.invoke(ctx)
 #endregion
 
 
 @bot.event
 async def setup_hook():
+    # Shared pooled DB for every cog (see database.py)
+    bot.db = Database(DATABASE_PATH)
+    # Tables + indexes, before anything queries them (no-op when already current)
+    await migrations.run(bot.db)
+    # Every guild's settings, in memory (GM role, poll channel, ...)
+    bot.guild_configs = GuildConfigs(bot.db)
+    await bot.guild_configs.load()
+    # One persistent timer for every scheduled job (see scheduler.py)
+    bot.scheduler = Scheduler(bot.db)
+    bot.watchdog.start()
     await bot.load_extension("cogs.player_info")
     await bot.load_extension("cogs.admin_commands")
     await bot.load_extension("cogs.quests")
+    await bot.load_extension("cogs.triggers")
+    # Started after the cogs so their job handlers are registered before pending jobs re-arm
+    await bot.scheduler.start()
+    # Health/metrics endpoints on this same loop (see webserver.py)
+    bot.web = await webserver.start(bot)
 
 
 # Runs the bot
-bot.run(token, log_handler=handler, log_level=logging.DEBUG)
\ No newline at end of file
+try:
+    bot.run(token, log_handler=handler, log_level=logging.DEBUG)
+finally:
+    if hasattr(bot, "db"):
+        bot.db.close()
\ No newline at end of file
@@ -0,0 +1,136 @@
+import bisect
+import time
+
+from database import QueryTimer, query_timer
+
+# metrics.py
+#
+# Per-command counters and latency histograms, fed by the bot's global
+# before/after invoke hooks and rendered in Prometheus text format for
+# webserver.py's /metrics. DB time is whatever the command spent awaiting
+# database.Database (see database.query_timer), so wall time minus DB time
+# is roughly Discord API + Python time. discord.py skips the invoke hooks
+# when a check or a converter fails, so those calls are counted by the
+# on_command_error listener instead (Metrics.command_error).
+#
+# Hooks only bump counters in plain Python objects: no locks, no allocation
+# beyond one QueryTimer per command.
+
+# Histogram upper bounds in seconds (+Inf is implied)
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PREFIX = "rattlepost"
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket bound holding the q-th quantile (inf if it's in the +Inf bucket)."""
+        rank, seen = q * self.count, 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class CommandStats:
+    __slots__ = ("calls", "errors", "latency", "db")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = Histogram()
+        self.db = Histogram()
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """Command metrics registry. Pass before_invoke/after_invoke to the bot's hooks."""
+
+    def __init__(self):
+        self.commands: dict[str, CommandStats] = {}
+
+    async def before_invoke(self, ctx):
+        timer = QueryTimer()
+        query_timer.set(timer)
+        ctx.metrics_timer = timer
+        ctx.metrics_start = time.perf_counter()
+
+    async def after_invoke(self, ctx):
+        elapsed = time.perf_counter() - ctx.metrics_start
+        stats = self._stats(ctx.command.qualified_name)
+        stats.calls += 1
+        if ctx.command_failed:
+            stats.errors += 1
+        stats.latency.observe(elapsed)
+        stats.db.observe(ctx.metrics_timer.seconds)
+        ctx.metrics_counted = True
+        query_timer.set(None)
+
+    async def command_error(self, ctx, error):
+        """on_command_error listener: count calls that failed before the invoke hooks ran (checks, arguments)."""
+        if ctx.command is None or getattr(ctx, "metrics_counted", False):
+            return  # unknown command, or after_invoke already counted it
+        stats = self._stats(ctx.command.qualified_name)
+        stats.calls += 1
+        stats.errors += 1
+
+    def _stats(self, name: str) -> CommandStats:
+        stats = self.commands.get(name)
+        if stats is None:
+            stats = self.commands[name] = CommandStats()
+        return stats
+
+    # ----------------
+    # Prometheus export
+    # ----------------
+
+    def render(self) -> str:
+        """Prometheus text exposition (version 0.0.4) of every command seen so far."""
+        commands = sorted(self.commands.items())
+        out = []
+
+        out.append(f"# HELP {PREFIX}_command_calls_total Commands invoked.")
+        out.append(f"# TYPE {PREFIX}_command_calls_total counter")
+        for name, s in commands:
+            out.append(f'{PREFIX}_command_calls_total{{command="{_label(name)}"}} {s.calls}')
+
+        out.append(f"# HELP {PREFIX}_command_errors_total Commands that raised or were rejected (checks, arguments).")
+        out.append(f"# TYPE {PREFIX}_command_errors_total counter")
+        for name, s in commands:
+            out.append(f'{PREFIX}_command_errors_total{{command="{_label(name)}"}} {s.errors}')
+
+        for metric, attr, help_text in (
+            ("command_duration_seconds", "latency", "Command wall time, before to after invoke."),
+            ("command_db_seconds", "db", "Time each command spent awaiting SQLite."),
+        ):
+            out.append(f"# HELP {PREFIX}_{metric} {help_text}")
+            out.append(f"# TYPE {PREFIX}_{metric} histogram")
+            for name, s in commands:
+                h: Histogram = getattr(s, attr)
+                label = _label(name)
+                cumulative = 0
+                for bound, n in zip(BUCKETS, h.counts):
+                    cumulative += n
+                    out.append(f'{PREFIX}_{metric}_bucket{{command="{label}",le="{bound}"}} {cumulative}')
+                out.append(f'{PREFIX}_{metric}_bucket{{command="{label}",le="+Inf"}} {h.count}')
+                out.append(f'{PREFIX}_{metric}_sum{{command="{label}"}} {h.total:.6f}')
+                out.append(f'{PREFIX}_{metric}_count{{command="{label}"}} {h.count}')
+
+        return "\n".join(out) + "\n"
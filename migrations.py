@@ -0,0 +1,200 @@
+import time
+
+from config import (PLAYER_INFO_TABLE, QUEST_BOARD_TABLE, DOWNTIME_POLL_TABLE, DOWNTIME_VOTE_TABLE,
+                    GUILD_CONFIG_TABLE, LEGACY_GUILD, GM_ROLE, THE_CROSSROADS, DM_HUSH_HUT, logging)
+from database import Database
+import ledger
+from player_identity import name_key
+import quest_search
+import scheduler
+import trigger_engine
+
+# migrations.py
+#
+# Every table, column and index the bot uses, as numbered steps. The database
+# remembers how far it got in PRAGMA user_version; at startup run() applies the
+# missing steps in ONE write transaction (all or nothing, version bump
+# included) and, when the database is already current, does nothing but read
+# that pragma.
+#
+# Steps are append-only: once a step has shipped, never edit it, add a new one.
+# Step 1 is the schema as it stood before versioning (every statement
+# IF NOT EXISTS, so it also adopts older databases); the ensure_schema
+# functions it calls are part of it and are frozen the same way, as are the
+# partition_by_guild functions step 4 calls and the functions later steps call.
+
+
+class MigrationError(RuntimeError):
+    pass
+
+
+def _baseline(conn):
+    """Create every table (adopts pre-versioning databases as they are)."""
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {PLAYER_INFO_TABLE} (
+            PLAYER       TEXT    NOT NULL,
+            LEVEL        INTEGER NOT NULL DEFAULT 2,
+            GOLD         INTEGER NOT NULL DEFAULT 0,
+            QUEST_POINTS INTEGER NOT NULL DEFAULT 0,
+            SILVER       INTEGER NOT NULL DEFAULT 0,
+            COPPER       INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    # Databases from before sp/cp existed only have GOLD
+    cols = {r[1].upper() for r in conn.execute(f"PRAGMA table_info({PLAYER_INFO_TABLE})")}
+    for column in ("SILVER", "COPPER"):
+        if column not in cols:
+            conn.execute(f"ALTER TABLE {PLAYER_INFO_TABLE} ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {QUEST_BOARD_TABLE} (
+            NAME        TEXT NOT NULL,
+            TYPE        TEXT NOT NULL DEFAULT 'U',
+            DESCRIPTION TEXT NOT NULL DEFAULT ''
+        )
+    """)
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {DOWNTIME_POLL_TABLE} (
+            MESSAGE_ID INTEGER PRIMARY KEY,
+            CHANNEL_ID INTEGER NOT NULL,
+            AUTHOR_ID  INTEGER NOT NULL,
+            CLOSES_AT  REAL    NOT NULL,
+            CLOSED     INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {DOWNTIME_VOTE_TABLE} (
+            MESSAGE_ID INTEGER NOT NULL,
+            USER_ID    INTEGER NOT NULL,
+            EMOJI      TEXT    NOT NULL,
+            PRIMARY KEY (MESSAGE_ID, USER_ID, EMOJI)
+        ) WITHOUT ROWID
+    """)
+    ledger.ensure_schema(conn)
+    scheduler.ensure_schema(conn)
+    trigger_engine.ensure_schema(conn)
+    quest_search.ensure_schema(conn)
+
+
+def _player_index(conn):
+    """Unique index on player names, plus one for open polls."""
+    dupes = [r[0] for r in conn.execute(
+        f"SELECT PLAYER FROM {PLAYER_INFO_TABLE} GROUP BY PLAYER HAVING COUNT(*) > 1 LIMIT 10"
+    )]
+    if dupes:
+        raise MigrationError(
+            f"{PLAYER_INFO_TABLE} has duplicate players ({', '.join(dupes)}); "
+            f"merge or rename them, then restart"
+        )
+    # Every command looks players up by name; ORDER BY PLAYER (the roster) walks it too
+    conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{PLAYER_INFO_TABLE}_player ON {PLAYER_INFO_TABLE} (PLAYER)")
+    # Startup, /readyz and poll reconciliation only ever want the open polls
+    conn.execute(
+        f"CREATE INDEX IF NOT EXISTS idx_{DOWNTIME_POLL_TABLE}_open "
+        f"ON {DOWNTIME_POLL_TABLE} (MESSAGE_ID) WHERE CLOSED = 0"
+    )
+
+
+def _player_identity(conn):
+    """DISCORD_ID and NAME_KEY columns on players, both indexed (see player_identity.py)."""
+    conn.execute(f"ALTER TABLE {PLAYER_INFO_TABLE} ADD COLUMN DISCORD_ID INTEGER")
+    conn.execute(f"ALTER TABLE {PLAYER_INFO_TABLE} ADD COLUMN NAME_KEY TEXT")
+    conn.executemany(
+        f"UPDATE {PLAYER_INFO_TABLE} SET NAME_KEY = ? WHERE ROWID = ?",
+        [(name_key(r[1]), r[0]) for r in conn.execute(f"SELECT ROWID, PLAYER FROM {PLAYER_INFO_TABLE}")]
+    )
+    # One player per member; unlinked rows (NULL) don't count
+    conn.execute(
+        f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{PLAYER_INFO_TABLE}_discord_id "
+        f"ON {PLAYER_INFO_TABLE} (DISCORD_ID) WHERE DISCORD_ID IS NOT NULL"
+    )
+    # Not unique: "Bob" and "bob" can both exist, lookups then need the exact name
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{PLAYER_INFO_TABLE}_name_key ON {PLAYER_INFO_TABLE} (NAME_KEY)")
+
+
+def _guilds(conn):
+    """Per-guild settings, and GUILD_ID on every per-community table (see guild_config.py)."""
+    conn.execute(f"""
+        CREATE TABLE {GUILD_CONFIG_TABLE} (
+            GUILD_ID     INTEGER PRIMARY KEY,
+            GM_ROLE      INTEGER,
+            POLL_CHANNEL INTEGER,
+            GM_CHANNEL   INTEGER
+        )
+    """)
+    # Existing rows become LEGACY_GUILD's, with the settings they were written under
+    conn.execute(
+        f"INSERT INTO {GUILD_CONFIG_TABLE} (GUILD_ID, GM_ROLE, POLL_CHANNEL, GM_CHANNEL) VALUES (?, ?, ?, ?)",
+        (LEGACY_GUILD, GM_ROLE, THE_CROSSROADS, DM_HUSH_HUT)
+    )
+    for table in (PLAYER_INFO_TABLE, QUEST_BOARD_TABLE, DOWNTIME_POLL_TABLE):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN GUILD_ID INTEGER NOT NULL DEFAULT {LEGACY_GUILD}")
+
+    # Names, member links and name keys are unique / looked up within a guild
+    for name in ("player", "discord_id", "name_key"):
+        conn.execute(f"DROP INDEX IF EXISTS idx_{PLAYER_INFO_TABLE}_{name}")
+    conn.execute(
+        f"CREATE UNIQUE INDEX idx_{PLAYER_INFO_TABLE}_guild_player ON {PLAYER_INFO_TABLE} (GUILD_ID, PLAYER)"
+    )
+    conn.execute(
+        f"CREATE UNIQUE INDEX idx_{PLAYER_INFO_TABLE}_guild_discord_id "
+        f"ON {PLAYER_INFO_TABLE} (GUILD_ID, DISCORD_ID) WHERE DISCORD_ID IS NOT NULL"
+    )
+    conn.execute(
+        f"CREATE INDEX idx_{PLAYER_INFO_TABLE}_guild_name_key ON {PLAYER_INFO_TABLE} (GUILD_ID, NAME_KEY)"
+    )
+    # (GUILD_ID, ROWID): one guild's board in id order, for keyset paging and COUNT(*)
+    conn.execute(f"CREATE INDEX idx_{QUEST_BOARD_TABLE}_guild ON {QUEST_BOARD_TABLE} (GUILD_ID)")
+
+    ledger.partition_by_guild(conn)
+    trigger_engine.partition_by_guild(conn)
+    quest_search.partition_by_guild(conn)
+
+
+def _job_retries(conn):
+    """Attempt counts on scheduled jobs, so failed ones back off (see scheduler.py)."""
+    scheduler.add_attempts(conn)
+
+
+def _quest_ids(conn):
+    """An explicit ID INTEGER PRIMARY KEY on quests, for ids and the search index (see quest_search.py)."""
+    quest_search.add_quest_ids(conn)
+
+
+# Step N takes the database to user_version N
+MIGRATIONS = [
+    _baseline,
+    _player_index,
+    _player_identity,
+    _guilds,
+    _job_retries,
+    _quest_ids,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def version(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn) -> int:
+    """Apply every missing step in the caller's transaction. Returns the version it started from."""
+    current = version(conn)
+    if current > SCHEMA_VERSION:
+        raise MigrationError(f"Database is at schema v{current}, newer than this bot (v{SCHEMA_VERSION})")
+    for step in MIGRATIONS[current:]:
+        step(conn)
+    # PRAGMA takes no parameters; SCHEMA_VERSION is ours
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return current
+
+
+async def run(db: Database):
+    """Bring the database up to SCHEMA_VERSION and log how long that took."""
+    start = time.perf_counter()
+    current = await db.read(version)
+    if current == SCHEMA_VERSION:
+        logging.info("Schema v%d is current (checked in %.1f ms)", current, (time.perf_counter() - start) * 1000)
+        return
+    current = await db.write(migrate)
+    logging.info("Migrated schema v%d -> v%d in %.1f ms", current, SCHEMA_VERSION, (time.perf_counter() - start) * 1000)
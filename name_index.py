@@ -0,0 +1,162 @@
+import heapq
+import math
+from collections import Counter, defaultdict
+from typing import Iterable, NamedTuple, Optional
+
+from player_identity import name_key
+
+# name_index.py
+#
+# Typo-tolerant lookup of player names, all in memory. Every name is split into
+# the trigrams of its NAME_KEY (see player_identity.py), padded like pg_trgm
+# ("gorn" -> "  g", " go", "gor", "orn", "rn "), and each trigram maps to the
+# set of names containing it. Similarity is Jaccard over trigram sets.
+#
+# A query only scores names that share one of its rarest trigrams: a name with
+# similarity >= t must share at least m = ceil(t * k) of the query's k
+# trigrams, so it has to contain one of any k - m + 1 of them. Shared trigrams
+# are then counted with set intersections against each of the query's posting
+# sets, so no name is compared trigram by trigram. CANDIDATE_CAP bounds the
+# work for queries made of very common trigrams (short names on a big roster):
+# past it, only names sharing the rarest trigrams are scored, which in practice
+# still finds the same best matches (benchmarks/name_index_bench.py).
+#
+# resolve() decides what a command does with a typed name:
+#   - exact name, or the one name with that NAME_KEY: use it
+#   - one clear fuzzy winner (AUTO_RESOLVE_SCORE, ahead by AUTO_RESOLVE_MARGIN):
+#     use it, and the command says it corrected the name
+#   - otherwise: not found, with up to SUGGESTIONS "did you mean" names
+
+SUGGESTIONS = 3
+# A bit under pg_trgm's default 0.3, so one wrong letter in a four-letter name
+# ("Glub") still suggests the player. AUTO_RESOLVE_SCORE - AUTO_RESOLVE_MARGIN
+# must not be below it, or a close runner-up could go unseen and a name be
+# auto-resolved.
+SUGGEST_SCORE = 0.25
+AUTO_RESOLVE_SCORE = 0.5
+AUTO_RESOLVE_MARGIN = 0.2
+CANDIDATE_CAP = 1000
+
+
+def trigrams(key: str) -> frozenset:
+    padded = f"  {key} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class Resolution(NamedTuple):
+    name: Optional[str]             # the player to use, or None
+    corrected: bool                 # name differs from what was typed (beyond case/spacing)
+    suggestions: tuple[str, ...]    # closest names when unresolved
+
+
+class NameIndex:
+    """Trigram index over player names. Not thread-safe; owned by the event loop."""
+
+    def __init__(self, names: Iterable[str] = ()):
+        self._grams: dict[str, frozenset] = {}               # name -> its trigrams
+        self._postings: dict[str, set[str]] = defaultdict(set)  # trigram -> names
+        self._by_key: dict[str, set[str]] = defaultdict(set)    # NAME_KEY -> names
+        self.rebuild(names)
+
+    def __len__(self):
+        return len(self._grams)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._grams
+
+    # ----------------
+    # Upkeep
+    # ----------------
+
+    def rebuild(self, names: Iterable[str]):
+        self._grams.clear()
+        self._postings.clear()
+        self._by_key.clear()
+        for name in names:
+            self.add(name)
+
+    def add(self, name: str):
+        if name in self._grams:
+            return
+        key = name_key(name)
+        grams = trigrams(key)
+        self._grams[name] = grams
+        self._by_key[key].add(name)
+        for g in grams:
+            self._postings[g].add(name)
+
+    def remove(self, name: str):
+        grams = self._grams.pop(name, None)
+        if grams is None:
+            return
+        key = name_key(name)
+        self._drop(self._by_key, key, name)
+        for g in grams:
+            self._drop(self._postings, g, name)
+
+    @staticmethod
+    def _drop(index: dict, k: str, name: str):
+        names = index[k]
+        names.discard(name)
+        if not names:
+            del index[k]
+
+    # ----------------
+    # Lookups
+    # ----------------
+
+    def search(self, query: str, limit: int = SUGGESTIONS, threshold: float = SUGGEST_SCORE) -> list[tuple[str, float]]:
+        """Up to `limit` (name, similarity) pairs scoring >= threshold, best first."""
+        q = trigrams(name_key(query))
+        k = len(q)
+        need = max(1, math.ceil(threshold * k))
+        postings = sorted((self._postings[g] for g in q if g in self._postings), key=len)
+
+        candidates: set[str] = set()
+        for names in postings[:k - need + 1]:
+            if candidates and len(candidates) + len(names) > CANDIDATE_CAP:
+                break
+            candidates |= names
+
+        shared = Counter()
+        for names in postings:
+            shared.update(candidates & names)
+        scored = []
+        for name, n in shared.items():
+            if n >= need:
+                score = n / (k + len(self._grams[name]) - n)
+                if score >= threshold:
+                    scored.append((score, name))
+        # Ties go to the alphabetically first name, so results are stable
+        return [(name, score) for score, name in heapq.nsmallest(limit, scored, key=lambda s: (-s[0], s[1]))]
+
+    def resolve(self, query: str) -> Resolution:
+        if query in self._grams:
+            return Resolution(query, False, ())
+        same_key = self._by_key.get(name_key(query), ())
+        if len(same_key) == 1:
+            return Resolution(next(iter(same_key)), False, ())
+        if same_key:
+            # "bob" with both "Bob" and "BOB" on the roster: only the exact name will do
+            return Resolution(None, False, tuple(sorted(same_key))[:SUGGESTIONS])
+
+        matches = self.search(query, SUGGESTIONS)
+        if matches:
+            best, score = matches[0]
+            runner_up = matches[1][1] if len(matches) > 1 else 0.0
+            if score >= AUTO_RESOLVE_SCORE and score - runner_up >= AUTO_RESOLVE_MARGIN:
+                return Resolution(best, True, ())
+        return Resolution(None, False, tuple(name for name, _ in matches))
+
+    def resolve_many(self, queries: Iterable[str]) -> dict[str, Resolution]:
+        """resolve() for every distinct name a command was given, in one pass."""
+        return {q: self.resolve(q) for q in dict.fromkeys(queries)}
+
+
+def did_you_mean(res: Resolution) -> str:
+    """' Did you mean `A` or `B`?' for an unresolved name, or ''."""
+    if not res.suggestions:
+        return ""
+    names = [f"`{s}`" for s in res.suggestions]
+    listed = names[0] if len(names) == 1 else ", ".join(names[:-1]) + " or " + names[-1]
+    return f" Did you mean {listed}?"
@@ -0,0 +1,266 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from discord.ext import commands
+
+from config import logging
+
+# outbox.py
+#
+# Every message the bot sends goes through one Outbox (bot.outbox): command
+# replies through OutboxContext, the cogs' own channel/DM sends through
+# outbox.send(). Per destination (a channel, or a member's DMs):
+#   - text over Discord's 2000-character limit is split on line breaks
+#   - plain-text messages queued back to back are joined into one send, up to
+#     the limit, when they go to the same place (same reply target, same
+#     mention settings)
+#   - sends are paced by a token bucket per route, since Discord limits
+#     message creation per channel (about 5 per 5 seconds), and by one bucket
+#     for the whole bot (50 requests a second). A bucket lets through at most
+#     burst + rate * T sends in any T seconds, so each is sized to fit inside
+#     the limit's window, not just its average rate.
+# So a burst waits its turn instead of running into 429s, and text queued
+# while it waits coalesces: a backlog drains as fewer, fuller messages.
+#
+# discord.py still sleeps and retries on any 429 that gets through (another
+# process on the same token, a limit Discord lowered). Interaction replies
+# (slash commands) are only split; they don't count against channel routes.
+
+MESSAGE_LIMIT = 2000
+ROUTE_RATE = 0.4        # sends per second per route, refilled continuously: 3 + 0.4 * 5s = 5 per 5s
+ROUTE_BURST = 3
+GLOBAL_RATE = 40.0      # 10 + 40 * 1s = 50 per second
+GLOBAL_BURST = 10
+# send() options a joined message can carry; anything else (embed, file, view, ...) goes alone
+MERGEABLE = ("reference", "mention_author", "allowed_mentions", "silent")
+# send() options that are a message on their own; without one, there must be text
+PAYLOAD = ("embed", "embeds", "file", "files", "stickers", "poll", "view")
+
+
+def _check_not_empty(content: Optional[str], kwargs: dict):
+    """Discord rejects a message with no text and nothing else (400); fail before queueing one."""
+    if (content is None or not content.strip()) and not any(kwargs.get(k) for k in PAYLOAD):
+        raise ValueError("Cannot send an empty message")
+
+
+def chunks(text: str, limit: int = MESSAGE_LIMIT) -> list[str]:
+    """Split text into pieces of at most `limit` characters, between lines where possible."""
+    if len(text) <= limit:
+        return [text]
+    out: list[str] = []
+    current: Optional[str] = None
+    for line in text.split("\n"):
+        while len(line) > limit:
+            # A line longer than a whole message: break it at a space if there is one
+            if current is not None:
+                out.append(current)
+                current = None
+            cut = line.rfind(" ", 0, limit + 1)
+            if cut <= 0:
+                out.append(line[:limit])
+                line = line[limit:]
+            else:
+                out.append(line[:cut])
+                line = line[cut + 1:]
+        if current is None:
+            current = line
+        elif len(current) + 1 + len(line) <= limit:
+            current += "\n" + line
+        else:
+            out.append(current)
+            current = line
+    if current is not None:
+        out.append(current)
+    # Discord rejects blank messages; a run of empty lines at a boundary isn't worth a send
+    return [c for c in out if c.strip()]
+
+
+class TokenBucket:
+    """`rate` tokens a second, holding at most `burst`."""
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float]):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until a token is free (0 if one is now)."""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def full(self) -> bool:
+        self._refill()
+        return self.tokens >= self.burst
+
+
+class _Pending:
+    __slots__ = ("destination", "content", "kwargs", "key", "future")
+
+    def __init__(self, destination, content: Optional[str], kwargs: dict, future: asyncio.Future):
+        self.destination = destination
+        self.content = content
+        self.kwargs = kwargs
+        self.future = future
+        self.key = _merge_key(content, kwargs)
+
+
+def _merge_key(content: Optional[str], kwargs: dict):
+    """Messages with equal keys may be joined; None never is."""
+    if content is None or any(k not in MERGEABLE for k in kwargs):
+        return None
+    ref = kwargs.get("reference")
+    ref_id = None if ref is None else getattr(ref, "message_id", None) or getattr(ref, "id", None)
+    mentions = kwargs.get("allowed_mentions")
+    return ref_id, kwargs.get("mention_author"), None if mentions is None else id(mentions), kwargs.get("silent")
+
+
+class Outbox:
+    """
+    Rate-limited, coalescing queue in front of Messageable.send(). One worker
+    task per route with anything queued; idle routes cost nothing. `clock` and
+    `sleep` can be swapped (benchmarks/outbox_bench.py runs on scaled time).
+    """
+
+    def __init__(self, route_rate: float = ROUTE_RATE, route_burst: int = ROUTE_BURST,
+                 global_rate: float = GLOBAL_RATE, global_burst: int = GLOBAL_BURST,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], Awaitable] = asyncio.sleep):
+        self.route_rate = route_rate
+        self.route_burst = route_burst
+        self.clock = clock
+        self.sleep = sleep
+        self._global = TokenBucket(global_rate, global_burst, clock)
+        self._routes: dict[int, TokenBucket] = {}
+        self._queues: dict[int, deque[_Pending]] = {}
+        self._workers: dict[int, asyncio.Task] = {}
+        # Counters for !perf and the benchmark
+        self.queued = 0         # messages accepted, after splitting
+        self.sent = 0           # API calls made
+        self.failed = 0         # API calls that raised
+
+    def backlog(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    async def send(self, destination, content=None, **kwargs):
+        """
+        destination.send(content, **kwargs), queued. Returns the Message that
+        carries the embeds/files/view (the last piece, if the text was split).
+        Raises whatever the send raised, or ValueError for an empty message.
+        """
+        content = None if content is None else str(content)
+        _check_not_empty(content, kwargs)
+        pieces = (chunks(content) or [content[:MESSAGE_LIMIT]]) if content else [content]
+        if len(pieces) == 1:
+            return await self._enqueue(destination, pieces[0], kwargs)
+
+        # The reply reference goes on the first piece; embeds, files and views on the last
+        text_only = {k: v for k, v in kwargs.items() if k in ("allowed_mentions", "silent")}
+        futures = []
+        for i, piece in enumerate(pieces):
+            if i == 0:
+                piece_kwargs = {k: v for k, v in kwargs.items() if k in MERGEABLE}
+            elif i == len(pieces) - 1:
+                piece_kwargs = {k: v for k, v in kwargs.items() if k not in ("reference", "mention_author")}
+            else:
+                piece_kwargs = text_only
+            futures.append(self._enqueue(destination, piece, piece_kwargs))
+        return (await asyncio.gather(*futures))[-1]
+
+    def _enqueue(self, destination, content: Optional[str], kwargs: dict) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        route = destination.id
+        self._queues.setdefault(route, deque()).append(_Pending(destination, content, kwargs, future))
+        self.queued += 1
+        if route not in self._workers:
+            self._workers[route] = asyncio.create_task(self._drain(route))
+        return future
+
+    async def flush(self):
+        """Wait until everything queued so far has been sent."""
+        while self._workers:
+            await asyncio.gather(*self._workers.values(), return_exceptions=True)
+
+    # ----------------
+    # Workers
+    # ----------------
+
+    async def _acquire(self, bucket: TokenBucket):
+        while (wait := bucket.wait_time()) > 0:
+            await self.sleep(wait)
+        bucket.take()
+
+    def _batch(self, queue: deque) -> list[_Pending]:
+        """The next send: the head, plus whatever queued behind it can be joined onto it."""
+        batch = [queue.popleft()]
+        key = batch[0].key
+        if key is None:
+            return batch
+        length = len(batch[0].content)
+        while queue and queue[0].key == key and length + 1 + len(queue[0].content) <= MESSAGE_LIMIT:
+            length += 1 + len(queue[0].content)
+            batch.append(queue.popleft())
+        return batch
+
+    async def _drain(self, route: int):
+        queue = self._queues[route]
+        bucket = self._routes.get(route)
+        if bucket is None:
+            bucket = self._routes[route] = TokenBucket(self.route_rate, self.route_burst, self.clock)
+        try:
+            while queue:
+                await self._acquire(bucket)
+                await self._acquire(self._global)
+                # Batched only now, so whatever queued during the wait rides along
+                batch = self._batch(queue)
+                head = batch[0]
+                content = head.content if len(batch) == 1 else "\n".join(p.content for p in batch)
+                self.sent += 1
+                try:
+                    message = await head.destination.send(content, **head.kwargs)
+                except Exception as e:
+                    self.failed += 1
+                    for p in batch:
+                        if not p.future.done():
+                            p.future.set_exception(e)
+                    continue
+                for p in batch:
+                    if not p.future.done():
+                        p.future.set_result(message)
+        except Exception:
+            logging.exception("Outbox worker for route %s failed", route)
+            for p in queue:
+                if not p.future.done():
+                    p.future.set_exception(RuntimeError("outbox worker failed"))
+            queue.clear()
+        finally:
+            del self._workers[route]
+            del self._queues[route]
+            # A bucket that has refilled is the same as a new one; don't keep one per channel ever used
+            for r in [r for r, b in self._routes.items() if r not in self._workers and b.full()]:
+                del self._routes[r]
+
+
+class OutboxContext(commands.Context):
+    """Context whose send()/reply() go through bot.outbox (interaction replies are only split)."""
+
+    async def send(self, content=None, **kwargs):
+        if self.interaction is None:
+            return await self.bot.outbox.send(self.channel, content, **kwargs)
+        content = None if content is None else str(content)
+        _check_not_empty(content, kwargs)
+        pieces = (chunks(content) or [content[:MESSAGE_LIMIT]]) if content else [content]
+        for piece in pieces[:-1]:
+            await super().send(piece, ephemeral=kwargs.get("ephemeral", False))
+        return await super().send(pieces[-1], **kwargs)
@@ -0,0 +1,183 @@
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+from database import Database
+
+# player_cache.py
+#
+# Write-through, in-process copy of one guild's rows of PLAYER_INFO_TABLE.
+# Loaded when the Player Info cog first serves that guild; every command that mutates a player hands the new
+# values back with put()/remove() after its transaction commits, so read-only
+# commands can answer straight from memory.
+#
+# The cache is bounded (LRU). While every row fits it is "complete" and a miss
+# means the player really doesn't exist; once it overflows a miss falls back to
+# SQLite.
+#
+# Listeners registered with subscribe() hear about every committed change:
+# (name, record) for an insert/update, (name, None) for a delete, and
+# (None, None) when the whole table may have changed (load() / verify() repairs).
+
+COLUMNS = "PLAYER, LEVEL, GOLD, SILVER, COPPER, QUEST_POINTS"
+
+
+class PlayerRecord:
+    """One player_info row. Much smaller than sqlite3.Row, and mutable."""
+
+    __slots__ = ("player", "level", "gold", "silver", "copper", "quest_points")
+
+    def __init__(self, player: str, level: int, gold: int, silver: int, copper: int, quest_points: int):
+        self.player = player
+        self.level = level
+        self.gold = gold
+        self.silver = silver
+        self.copper = copper
+        self.quest_points = quest_points
+
+    @classmethod
+    def from_row(cls, row) -> "PlayerRecord":
+        return cls(row["PLAYER"], row["LEVEL"], row["GOLD"], row["SILVER"], row["COPPER"], row["QUEST_POINTS"])
+
+    def as_tuple(self) -> tuple:
+        return (self.player, self.level, self.gold, self.silver, self.copper, self.quest_points)
+
+    def __eq__(self, other):
+        return isinstance(other, PlayerRecord) and self.as_tuple() == other.as_tuple()
+
+    def __repr__(self):
+        return f"PlayerRecord{self.as_tuple()!r}"
+
+
+class PlayerCache:
+    """Bounded LRU of one guild's PlayerRecords keyed by PLAYER, with hit/miss counters."""
+
+    def __init__(self, db: Database, table: str, max_size: int, guild_id: int):
+        self.db = db
+        self.table = table
+        self.max_size = max_size
+        self.guild_id = guild_id
+        self._records: "OrderedDict[str, PlayerRecord]" = OrderedDict()
+        self.complete = False   # True while the cache holds every row in the table
+        self.hits = 0
+        self.misses = 0
+        self._listeners: list[Callable[[Optional[str], Optional[PlayerRecord]], None]] = []
+
+    def __len__(self):
+        return len(self._records)
+
+    async def load(self):
+        """(Re)load the table. Only the first max_size rows are kept."""
+        rows = await self.db.fetchall(
+            f"SELECT {COLUMNS} FROM {self.table} WHERE GUILD_ID = ? ORDER BY PLAYER ASC LIMIT ?",
+            (self.guild_id, self.max_size + 1)
+        )
+        self._records = OrderedDict((r["PLAYER"], PlayerRecord.from_row(r)) for r in rows[:self.max_size])
+        self.complete = len(rows) <= self.max_size
+        self._notify(None, None)
+
+    # ----------------
+    # Reads
+    # ----------------
+
+    def peek(self, name: str) -> Optional[PlayerRecord]:
+        """Cache-only lookup, no counters and no DB fallback."""
+        return self._records.get(name)
+
+    async def get(self, name: str) -> Optional[PlayerRecord]:
+        rec = self._records.get(name)
+        if rec is not None:
+            self.hits += 1
+            self._records.move_to_end(name)
+            return rec
+        if self.complete:
+            # Every row is cached, so this is a definite "no such player"
+            self.hits += 1
+            return None
+
+        self.misses += 1
+        row = await self.db.fetchone(
+            f"SELECT {COLUMNS} FROM {self.table} WHERE GUILD_ID = ? AND PLAYER = ?", (self.guild_id, name)
+        )
+        if row is None:
+            return None
+        rec = PlayerRecord.from_row(row)
+        self._insert(rec)
+        return rec
+
+    async def all(self) -> list[PlayerRecord]:
+        """Every player, sorted by name. Served from memory when the cache is complete."""
+        if self.complete:
+            self.hits += 1
+            return sorted(self._records.values(), key=lambda r: r.player)
+        self.misses += 1
+        rows = await self.db.fetchall(
+            f"SELECT {COLUMNS} FROM {self.table} WHERE GUILD_ID = ? ORDER BY PLAYER ASC", (self.guild_id,)
+        )
+        return [PlayerRecord.from_row(r) for r in rows]
+
+    # ----------------
+    # Change notification
+    # ----------------
+
+    def subscribe(self, listener: Callable[[Optional[str], Optional[PlayerRecord]], None]):
+        self._listeners.append(listener)
+
+    def _notify(self, name: Optional[str], rec: Optional[PlayerRecord]):
+        for listener in self._listeners:
+            listener(name, rec)
+
+    # ----------------
+    # Write-through
+    # ----------------
+
+    def _insert(self, rec: PlayerRecord):
+        self._records[rec.player] = rec
+        self._records.move_to_end(rec.player)
+        while len(self._records) > self.max_size:
+            self._records.popitem(last=False)
+            self.complete = False
+
+    def put(self, rec: PlayerRecord):
+        """Record the committed state of one player (insert or update)."""
+        self._insert(rec)
+        self._notify(rec.player, rec)
+
+    def put_many(self, recs: Iterable[PlayerRecord]):
+        for rec in recs:
+            self._insert(rec)
+            self._notify(rec.player, rec)
+
+    def remove(self, name: str):
+        self._records.pop(name, None)
+        self._notify(name, None)
+
+    # ----------------
+    # Consistency
+    # ----------------
+
+    async def verify(self) -> list[str]:
+        """
+        Compare every cached record against SQLite and repair drift in place.
+        Returns the names that were wrong (stale, missing or deleted).
+        """
+        rows = await self.db.fetchall(f"SELECT {COLUMNS} FROM {self.table} WHERE GUILD_ID = ?", (self.guild_id,))
+        fresh = {r["PLAYER"]: PlayerRecord.from_row(r) for r in rows}
+
+        drifted = []
+        for name, rec in list(self._records.items()):
+            actual = fresh.get(name)
+            if actual is None:
+                drifted.append(name)
+                self._records.pop(name)
+            elif actual != rec:
+                drifted.append(name)
+                self._records[name] = actual
+        if self.complete:
+            for name, rec in fresh.items():
+                if name not in self._records:
+                    drifted.append(name)
+                    self._insert(rec)
+        self.complete = len(fresh) <= self.max_size and len(self._records) == len(fresh)
+        if drifted:
+            self._notify(None, None)
+        return drifted
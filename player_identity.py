@@ -0,0 +1,197 @@
+import unicodedata
+from collections import OrderedDict
+from typing import Optional
+
+from config import PLAYER_INFO_TABLE, PLAYER_CACHE_SIZE, logging
+from database import Database
+from player_cache import PlayerCache, PlayerRecord
+
+# player_identity.py
+#
+# Who is a Discord member in player_info? Each player row can carry the
+# DISCORD_ID of the member who plays it, plus NAME_KEY, a normalized,
+# case-folded copy of PLAYER. Both are indexed (see migrations.py), so:
+#   - "which player is the author?" is one indexed lookup on DISCORD_ID, then
+#     a dict hit for every later command from that member, whatever their
+#     nickname says by then
+#   - a typed name ("bob", "BOB ") finds "Bob" by its NAME_KEY (see name_index.py,
+#     which also catches typos)
+#
+# Members nobody has linked yet are matched once by their Discord username
+# and, if exactly one unlinked player has that name, linked to it on the spot.
+# Only the username: it is unique across Discord, while anyone can set a
+# nickname (display name) to a player's name before its owner first shows up,
+# and a link made from that would lock the owner out. Everyone else is linked
+# by a GM with !linkPlayer (and fixed with !unlinkPlayer).
+#
+# All of this is per guild: a member plays (at most) one player in each guild
+# they share with the bot.
+
+
+def name_key(name: str) -> str:
+    """Stored in NAME_KEY: NFKC, case-folded, whitespace collapsed. Changing this needs a migration."""
+    return " ".join(unicodedata.normalize("NFKC", name).casefold().split())
+
+
+# ----------------
+# Queries (call inside Database.read / Database.write)
+# ----------------
+
+def _lookup_member(conn, guild_id: int, member_id: int, keys: tuple):
+    """(player, needs_claim) for a member, or (None, False)."""
+    row = conn.execute(
+        f"SELECT PLAYER FROM {PLAYER_INFO_TABLE} WHERE GUILD_ID = ? AND DISCORD_ID = ?", (guild_id, member_id)
+    ).fetchone()
+    if row is not None:
+        return row[0], False
+    if not keys:
+        return None, False
+    marks = ", ".join("?" for _ in keys)
+    rows = conn.execute(
+        f"SELECT DISTINCT PLAYER FROM {PLAYER_INFO_TABLE} "
+        f"WHERE GUILD_ID = ? AND NAME_KEY IN ({marks}) AND DISCORD_ID IS NULL LIMIT 2",
+        (guild_id, *keys)
+    ).fetchall()
+    if len(rows) == 1:
+        return rows[0][0], True
+    return None, False
+
+
+def _claim(conn, guild_id: int, player: str, member_id: int) -> bool:
+    """Link player to member unless either side got linked in the meantime."""
+    if conn.execute(
+        f"SELECT 1 FROM {PLAYER_INFO_TABLE} WHERE GUILD_ID = ? AND DISCORD_ID = ?", (guild_id, member_id)
+    ).fetchone():
+        return False
+    return conn.execute(
+        f"UPDATE {PLAYER_INFO_TABLE} SET DISCORD_ID = ? WHERE GUILD_ID = ? AND PLAYER = ? AND DISCORD_ID IS NULL",
+        (member_id, guild_id, player)
+    ).rowcount == 1
+
+
+def link(conn, guild_id: int, player: str, member_id: Optional[int]) -> Optional[str]:
+    """
+    Point `player` at member_id (None unlinks). A member plays one player, so
+    any row they were linked to is unlinked. Returns that previous player's
+    name, "" if there was none, or None if `player` doesn't exist.
+    """
+    previous = ""
+    if member_id is not None:
+        row = conn.execute(
+            f"UPDATE {PLAYER_INFO_TABLE} SET DISCORD_ID = NULL "
+            f"WHERE GUILD_ID = ? AND DISCORD_ID = ? AND PLAYER != ? RETURNING PLAYER",
+            (guild_id, member_id, player)
+        ).fetchone()
+        previous = row[0] if row else ""
+    cur = conn.execute(
+        f"UPDATE {PLAYER_INFO_TABLE} SET DISCORD_ID = ? WHERE GUILD_ID = ? AND PLAYER = ?",
+        (member_id, guild_id, player)
+    )
+    if cur.rowcount == 0:
+        raise LookupError(player)  # rolls back the unlink above
+    return previous
+
+
+class PlayerIdentity:
+    """Member -> player in the cache's guild, cached per member id. Invalidated through PlayerCache notifications."""
+
+    def __init__(self, db: Database, cache: PlayerCache, max_size: int = PLAYER_CACHE_SIZE):
+        self.db = db
+        self.cache = cache
+        self.guild_id = cache.guild_id
+        self.max_size = max_size
+        self._members: "OrderedDict[int, str]" = OrderedDict()
+        self._players: dict[str, int] = {}     # reverse of _members
+        self._strangers: set[int] = set()      # resolved to no player (until a player is added)
+        cache.subscribe(self._on_player_change)
+
+    # ----------------
+    # Resolution
+    # ----------------
+
+    async def caller(self, ctx) -> Optional[str]:
+        """The invoking member's player name, resolved once per command."""
+        if not hasattr(ctx, "player_name"):
+            ctx.player_name = await self.resolve(ctx.author)
+        return ctx.player_name
+
+    async def resolve(self, member) -> Optional[str]:
+        player = self._members.get(member.id)
+        if player is not None:
+            self._members.move_to_end(member.id)
+            return player
+        if member.id in self._strangers:
+            return None
+
+        # Pre-2023 usernames ("name#1234") aren't unique, so those never claim
+        unique = getattr(member, "discriminator", "0") in ("0", None)
+        keys = (name_key(str(member.name)),) if unique else ()
+        player, claim = await self.db.read(_lookup_member, self.guild_id, member.id, keys)
+        if claim:
+            if await self.db.write(_claim, self.guild_id, player, member.id):
+                logging.info("Linked member %s (%s) to player %s by name in guild %s",
+                             member.id, member.display_name, player, self.guild_id)
+            else:
+                player, _ = await self.db.read(_lookup_member, self.guild_id, member.id, ())
+        if player is None:
+            if len(self._strangers) >= self.max_size:
+                self._strangers.clear()
+            self._strangers.add(member.id)
+            return None
+        self._remember(member.id, player)
+        return player
+
+    # ----------------
+    # Links
+    # ----------------
+
+    async def link(self, player: str, member_id: Optional[int]) -> Optional[str]:
+        """GM link/unlink. Same return as link()."""
+        try:
+            previous = await self.db.write(link, self.guild_id, player, member_id)
+        except LookupError:
+            return None
+        self.forget_player(player)
+        if previous:
+            self.forget_player(previous)
+        if member_id is not None:
+            self.forget_member(member_id)
+        return previous
+
+    # ----------------
+    # Cache upkeep
+    # ----------------
+
+    def _remember(self, member_id: int, player: str):
+        old = self._players.pop(player, None)
+        if old is not None:
+            self._members.pop(old, None)
+        self._members[member_id] = player
+        self._players[player] = member_id
+        while len(self._members) > self.max_size:
+            _, dropped = self._members.popitem(last=False)
+            self._players.pop(dropped, None)
+
+    def forget_member(self, member_id: int):
+        player = self._members.pop(member_id, None)
+        if player is not None:
+            self._players.pop(player, None)
+        self._strangers.discard(member_id)
+
+    def forget_player(self, player: str):
+        member_id = self._players.pop(player, None)
+        if member_id is not None:
+            self._members.pop(member_id, None)
+        self._strangers.clear()
+
+    def _on_player_change(self, name: Optional[str], rec: Optional[PlayerRecord]):
+        if name is None:
+            # Whole table may have changed (reload, import)
+            self._members.clear()
+            self._players.clear()
+            self._strangers.clear()
+        elif rec is None:
+            self.forget_player(name)
+        elif name not in self._players:
+            # Possibly a new player some stranger could now claim
+            self._strangers.clear()
@@ -0,0 +1,39 @@
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+
+# player_locks.py
+#
+# Per-player asyncio locks. A command that reads a player's balance, decides
+# something (e.g. how to make change) and writes it back holds that player's
+# lock throughout, so two such commands on the same player run one after the
+# other instead of interleaving. Several players are always locked in sorted
+# order, so two transfers A->B and B->A can't deadlock.
+#
+# Locks live only while someone holds or waits on them (weak values), so the
+# registry doesn't grow with the number of players ever seen.
+
+
+class PlayerLocks:
+    def __init__(self):
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    def _lock(self, name: str) -> asyncio.Lock:
+        lock = self._locks.get(name)
+        if lock is None:
+            lock = self._locks[name] = asyncio.Lock()
+        return lock
+
+    @asynccontextmanager
+    async def hold(self, *names: str):
+        """Hold the locks of every named player (duplicates ignored), acquired in sorted order."""
+        locks = [self._lock(n) for n in sorted(set(names))]
+        acquired = []
+        try:
+            for lock in locks:
+                await lock.acquire()
+                acquired.append(lock)
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
@@ -0,0 +1,107 @@
+import bisect
+from typing import Hashable, Iterable
+
+from player_identity import name_key
+
+# prefix_index.py
+#
+# Autocomplete for slash command options (player names, quest titles), all in
+# memory: Discord asks again on every keystroke and drops answers that take
+# over 3 seconds, so a suggestion must never wait on SQLite.
+#
+# Every label is keyed by its NAME_KEY (see player_identity.py), and a
+# multi-word label also by the key from each later word on, so "Sir Gorn" is
+# found by "sir g" and by "gorn". Keys sit in two sorted lists (whole labels,
+# later words); a prefix is a bisect and a forward scan of at most `limit`
+# matches. Whole-label matches come first, then later-word ones.
+#
+# Labels don't have to be unique: entries carry the value the option sends
+# (a player name, a quest id), and results are distinct values.
+
+CHOICES = 25    # most autocomplete choices Discord will show
+
+
+def word_keys(key: str) -> list[str]:
+    """The key from each word after the first on: "sir gorn the bold" -> "gorn the bold", "the bold", "bold"."""
+    return [key[i + 1:] for i, c in enumerate(key) if c == " "]
+
+
+class PrefixIndex:
+    """Sorted prefix index of label -> value. Not thread-safe; owned by the event loop."""
+
+    def __init__(self, items: Iterable[tuple[Hashable, str]] = ()):
+        self._labels: dict = {}                     # value -> label
+        self._whole: list[tuple[str, Hashable]] = []  # (label key, value), sorted
+        self._words: list[tuple[str, Hashable]] = []  # (later-word key, value), sorted
+        self.rebuild(items)
+
+    def __len__(self):
+        return len(self._labels)
+
+    # ----------------
+    # Upkeep
+    # ----------------
+
+    def rebuild(self, items: Iterable[tuple[Hashable, str]]):
+        self._labels = dict(items)
+        self._whole, self._words = [], []
+        for value, label in self._labels.items():
+            key = name_key(label)
+            self._whole.append((key, value))
+            self._words.extend((k, value) for k in word_keys(key))
+        self._whole.sort()
+        self._words.sort()
+
+    def add(self, value: Hashable, label: str):
+        if value in self._labels:
+            if self._labels[value] == label:
+                return
+            self.remove(value)
+        self._labels[value] = label
+        key = name_key(label)
+        bisect.insort(self._whole, (key, value))
+        for k in word_keys(key):
+            bisect.insort(self._words, (k, value))
+
+    def remove(self, value: Hashable):
+        label = self._labels.pop(value, None)
+        if label is None:
+            return
+        key = name_key(label)
+        self._drop(self._whole, (key, value))
+        for k in word_keys(key):
+            self._drop(self._words, (k, value))
+
+    @staticmethod
+    def _drop(entries: list, entry: tuple):
+        i = bisect.bisect_left(entries, entry)
+        if i < len(entries) and entries[i] == entry:
+            del entries[i]
+
+    # ----------------
+    # Lookups
+    # ----------------
+
+    def complete(self, text: str, limit: int = CHOICES) -> list[tuple[str, Hashable]]:
+        """Up to `limit` (label, value) pairs whose label, or a later word of it, starts with `text`."""
+        prefix = name_key(text)
+        found: dict = {}
+        for entries in (self._whole, self._words):
+            i = bisect.bisect_left(entries, (prefix,))
+            while i < len(entries) and len(found) < limit:
+                key, value = entries[i]
+                if not key.startswith(prefix):
+                    break
+                found.setdefault(value, self._labels[value])
+                i += 1
+        return [(label, value) for value, label in found.items()]
+
+    def exact(self, text: str) -> list[Hashable]:
+        """Values whose whole label has the same NAME_KEY as `text` (a title typed out instead of picked)."""
+        key = name_key(text)
+        i = bisect.bisect_left(self._whole, (key,))
+        out = []
+        while i < len(self._whole) and self._whole[i][0] == key:
+            out.append(self._whole[i][1])
+            i += 1
+        return out
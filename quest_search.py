@@ -0,0 +1,218 @@
+import re
+from contextlib import contextmanager
+
+from config import QUEST_BOARD_TABLE
+
+# quest_search.py
+#
+# Full-text search over the quest board. QUEST_SEARCH_TABLE is an FTS5 index
+# over quest_board's NAME/DESCRIPTION ("external content": it stores only the
+# index, the text stays in quest_board). Triggers keep it in step with every
+# INSERT/UPDATE/DELETE, so no command has to remember to maintain it.
+#
+# quest_board's GUILD_ID is indexed too, as a third column: search() matches
+# the guild's id token AND the terms, so FTS5 only ranks that guild's hits
+# instead of every guild's and filtering afterwards.
+#
+# The index is keyed on quest_board.ID (an INTEGER PRIMARY KEY, and the quest
+# id users see). An implicit ROWID could be renumbered by VACUUM, silently
+# pointing the index and every quest id at other rows.
+
+QUEST_SEARCH_TABLE = "quest_search"
+RESULT_LIMIT = 10
+
+# bm25 column weights: a hit in the title counts far more than one in the body
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+GUILD_WEIGHT = 0.0
+
+
+def ensure_schema(conn):
+    """Create the FTS index + sync triggers (idempotent). Builds the index the first time."""
+    existed = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (QUEST_SEARCH_TABLE,)
+    ).fetchone()
+
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {QUEST_SEARCH_TABLE} USING fts5(
+            NAME, DESCRIPTION,
+            content='{QUEST_BOARD_TABLE}', content_rowid='rowid',
+            tokenize='porter unicode61'
+        )
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {QUEST_SEARCH_TABLE}_ai AFTER INSERT ON {QUEST_BOARD_TABLE} BEGIN
+            INSERT INTO {QUEST_SEARCH_TABLE} (rowid, NAME, DESCRIPTION)
+            VALUES (new.rowid, new.NAME, new.DESCRIPTION);
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {QUEST_SEARCH_TABLE}_ad AFTER DELETE ON {QUEST_BOARD_TABLE} BEGIN
+            INSERT INTO {QUEST_SEARCH_TABLE} ({QUEST_SEARCH_TABLE}, rowid, NAME, DESCRIPTION)
+            VALUES ('delete', old.rowid, old.NAME, old.DESCRIPTION);
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {QUEST_SEARCH_TABLE}_au AFTER UPDATE ON {QUEST_BOARD_TABLE} BEGIN
+            INSERT INTO {QUEST_SEARCH_TABLE} ({QUEST_SEARCH_TABLE}, rowid, NAME, DESCRIPTION)
+            VALUES ('delete', old.rowid, old.NAME, old.DESCRIPTION);
+            INSERT INTO {QUEST_SEARCH_TABLE} (rowid, NAME, DESCRIPTION)
+            VALUES (new.rowid, new.NAME, new.DESCRIPTION);
+        END
+    """)
+
+    if not existed:
+        conn.execute(f"INSERT INTO {QUEST_SEARCH_TABLE} ({QUEST_SEARCH_TABLE}) VALUES ('rebuild')")
+
+
+def _guild_triggers(conn):
+    """The sync triggers as step 4 of migrations.py created them (frozen)."""
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {QUEST_SEARCH_TABLE}_ai AFTER INSERT ON {QUEST_BOARD_TABLE} BEGIN
+            INSERT INTO {QUEST_SEARCH_TABLE} (rowid, NAME, DESCRIPTION, GUILD_ID)
+            VALUES (new.rowid, new.NAME, new.DESCRIPTION, new.GUILD_ID);
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {QUEST_SEARCH_TABLE}_ad AFTER DELETE ON {QUEST_BOARD_TABLE} BEGIN
+            INSERT INTO {QUEST_SEARCH_TABLE} ({QUEST_SEARCH_TABLE}, rowid, NAME, DESCRIPTION, GUILD_ID)
+            VALUES ('delete', old.rowid, old.NAME, old.DESCRIPTION, old.GUILD_ID);
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {QUEST_SEARCH_TABLE}_au AFTER UPDATE ON {QUEST_BOARD_TABLE} BEGIN
+            INSERT INTO {QUEST_SEARCH_TABLE} ({QUEST_SEARCH_TABLE}, rowid, NAME, DESCRIPTION, GUILD_ID)
+            VALUES ('delete', old.rowid, old.NAME, old.DESCRIPTION, old.GUILD_ID);
+            INSERT INTO {QUEST_SEARCH_TABLE} (rowid, NAME, DESCRIPTION, GUILD_ID)
+            VALUES (new.rowid, new.NAME, new.DESCRIPTION, new.GUILD_ID);
+        END
+    """)
+
+
+def _create_triggers(conn):
+    """The sync triggers as they are now. bulk_insert() restores its trigger from here."""
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {QUEST_SEARCH_TABLE}_ai AFTER INSERT ON {QUEST_BOARD_TABLE} BEGIN
+            INSERT INTO {QUEST_SEARCH_TABLE} (rowid, NAME, DESCRIPTION, GUILD_ID)
+            VALUES (new.ID, new.NAME, new.DESCRIPTION, new.GUILD_ID);
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {QUEST_SEARCH_TABLE}_ad AFTER DELETE ON {QUEST_BOARD_TABLE} BEGIN
+            INSERT INTO {QUEST_SEARCH_TABLE} ({QUEST_SEARCH_TABLE}, rowid, NAME, DESCRIPTION, GUILD_ID)
+            VALUES ('delete', old.ID, old.NAME, old.DESCRIPTION, old.GUILD_ID);
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {QUEST_SEARCH_TABLE}_au AFTER UPDATE ON {QUEST_BOARD_TABLE} BEGIN
+            INSERT INTO {QUEST_SEARCH_TABLE} ({QUEST_SEARCH_TABLE}, rowid, NAME, DESCRIPTION, GUILD_ID)
+            VALUES ('delete', old.ID, old.NAME, old.DESCRIPTION, old.GUILD_ID);
+            INSERT INTO {QUEST_SEARCH_TABLE} (rowid, NAME, DESCRIPTION, GUILD_ID)
+            VALUES (new.ID, new.NAME, new.DESCRIPTION, new.GUILD_ID);
+        END
+    """)
+
+
+def _drop_index(conn):
+    for suffix in ("ai", "ad", "au"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {QUEST_SEARCH_TABLE}_{suffix}")
+    conn.execute(f"DROP TABLE IF EXISTS {QUEST_SEARCH_TABLE}")
+
+
+def partition_by_guild(conn):
+    """Re-create the index with GUILD_ID as a column (step 4 of migrations.py, after quest_board gets it)."""
+    _drop_index(conn)
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE {QUEST_SEARCH_TABLE} USING fts5(
+            NAME, DESCRIPTION, GUILD_ID,
+            content='{QUEST_BOARD_TABLE}', content_rowid='rowid',
+            tokenize='porter unicode61'
+        )
+    """)
+    _guild_triggers(conn)
+    conn.execute(f"INSERT INTO {QUEST_SEARCH_TABLE} ({QUEST_SEARCH_TABLE}) VALUES ('rebuild')")
+
+
+def add_quest_ids(conn):
+    """
+    Rebuild quest_board with ID INTEGER PRIMARY KEY (each quest keeps its old
+    ROWID as its id) and key the index on it (step 6 of migrations.py).
+    """
+    _drop_index(conn)
+    conn.execute(f"""
+        CREATE TABLE {QUEST_BOARD_TABLE}_new (
+            ID          INTEGER PRIMARY KEY,
+            NAME        TEXT    NOT NULL,
+            TYPE        TEXT    NOT NULL DEFAULT 'U',
+            DESCRIPTION TEXT    NOT NULL DEFAULT '',
+            GUILD_ID    INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute(
+        f"INSERT INTO {QUEST_BOARD_TABLE}_new (ID, NAME, TYPE, DESCRIPTION, GUILD_ID) "
+        # Boards created before migrations.py may hold NULLs (the old reads COALESCEd them)
+        f"SELECT ROWID, COALESCE(NAME, ''), COALESCE(TYPE, 'U'), COALESCE(DESCRIPTION, ''), GUILD_ID "
+        f"FROM {QUEST_BOARD_TABLE}"
+    )
+    conn.execute(f"DROP TABLE {QUEST_BOARD_TABLE}")
+    conn.execute(f"ALTER TABLE {QUEST_BOARD_TABLE}_new RENAME TO {QUEST_BOARD_TABLE}")
+    # (GUILD_ID, ID): one guild's board in id order, for keyset paging and COUNT(*)
+    conn.execute(f"CREATE INDEX idx_{QUEST_BOARD_TABLE}_guild ON {QUEST_BOARD_TABLE} (GUILD_ID)")
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE {QUEST_SEARCH_TABLE} USING fts5(
+            NAME, DESCRIPTION, GUILD_ID,
+            content='{QUEST_BOARD_TABLE}', content_rowid='ID',
+            tokenize='porter unicode61'
+        )
+    """)
+    _create_triggers(conn)
+    conn.execute(f"INSERT INTO {QUEST_SEARCH_TABLE} ({QUEST_SEARCH_TABLE}) VALUES ('rebuild')")
+
+
+@contextmanager
+def bulk_insert(conn):
+    """
+    For big batches of new quests, inside the caller's transaction: the block
+    inserts with the per-row index trigger dropped, then every new row is
+    indexed by one INSERT ... SELECT (~5x faster at 100k rows) and the trigger
+    comes back. On error the transaction's rollback restores the trigger.
+    """
+    last = conn.execute(f"SELECT COALESCE(MAX(ID), 0) FROM {QUEST_BOARD_TABLE}").fetchone()[0]
+    conn.execute(f"DROP TRIGGER IF EXISTS {QUEST_SEARCH_TABLE}_ai")
+    yield
+    conn.execute(f"""
+        INSERT INTO {QUEST_SEARCH_TABLE} (rowid, NAME, DESCRIPTION, GUILD_ID)
+        SELECT ID, NAME, DESCRIPTION, GUILD_ID FROM {QUEST_BOARD_TABLE} WHERE ID > ?
+    """, (last,))
+    _create_triggers(conn)
+
+
+def to_match_query(terms: str) -> str:
+    """
+    Turn free text into a safe FTS5 query: every word must match, each as a
+    prefix ("gob" finds "goblins"). User input never reaches FTS5 syntax.
+    """
+    words = re.findall(r"\w+", terms)
+    return " ".join(f'"{w}"*' for w in words)
+
+
+def search(conn, guild_id: int, terms: str, limit: int = RESULT_LIMIT):
+    """One guild's ranked matches as rows of (id, NAME, TYPE, snippet). Empty list for a blank query."""
+    query = to_match_query(terms)
+    if not query:
+        return []
+    # The terms only count in the text columns: a number typed by a player mustn't hit the id
+    query = f'GUILD_ID : "{int(guild_id)}" AND {{NAME DESCRIPTION}} : ({query})'
+    return conn.execute(f"""
+        SELECT
+            q.ID AS id,
+            q.NAME,
+            q.TYPE,
+            snippet({QUEST_SEARCH_TABLE}, 1, '**', '**', '…', 16) AS snippet
+        FROM {QUEST_SEARCH_TABLE} s
+        JOIN {QUEST_BOARD_TABLE} q ON q.ID = s.rowid
+        WHERE {QUEST_SEARCH_TABLE} MATCH ?
+          AND rank MATCH 'bm25({NAME_WEIGHT}, {DESCRIPTION_WEIGHT}, {GUILD_WEIGHT})'
+        ORDER BY rank
+        LIMIT ?
+    """, (query, limit)).fetchall()
@@ -0,0 +1,123 @@
+import bisect
+from itertools import count
+from typing import Callable, Iterable
+
+from player_cache import PlayerRecord
+
+# roster.py
+#
+# The !players roster, pre-split into pages that fit one Discord embed
+# (max 25 fields, 6000 characters overall). One Roster per view type, since
+# GMs and players see different field text.
+#
+# Entries are kept sorted by player name. When one player changes, only the
+# page holding them (and the one before) is re-chunked, stopping as soon as a page
+# boundary lines up with an old one again (chunking is greedy, so everything
+# after that point is unchanged). Every page carries a token; a page keeps its
+# token until its content changes, so callers can cache rendered embeds by it.
+
+FIELD_LIMIT = 25
+# Embed limit is 6000; leave room for the title, footer and page counter
+PAGE_CHAR_BUDGET = 5500
+
+_tokens = count(1)
+
+
+class RosterPage:
+    __slots__ = ("start", "end", "first", "token")
+
+    def __init__(self, start: int, end: int, first: str):
+        self.start = start    # index of the first entry (inclusive)
+        self.end = end        # index past the last entry
+        self.first = first    # name of the first entry
+        self.token = next(_tokens)
+
+
+class Roster:
+    """Sorted (name, field text) entries chunked into embed-sized pages."""
+
+    def __init__(self, render: Callable[[PlayerRecord], str]):
+        self.render = render
+        self.names: list[str] = []
+        self.values: list[str] = []
+        self._sizes: list[int] = []
+        self.pages: list[RosterPage] = []
+
+    def __len__(self):
+        return len(self.names)
+
+    def load(self, records: Iterable[PlayerRecord]):
+        entries = sorted(((r.player, self.render(r)) for r in records), key=lambda e: e[0])
+        self.names = [n for n, _ in entries]
+        self.values = [v for _, v in entries]
+        self._sizes = [len(n) + len(v) for n, v in entries]
+        self.pages = []
+        self._rechunk(0, 0, -1)
+
+    def page(self, index: int) -> list[tuple[str, str]]:
+        pg = self.pages[index]
+        return list(zip(self.names[pg.start:pg.end], self.values[pg.start:pg.end]))
+
+    # ----------------
+    # Incremental updates
+    # ----------------
+
+    def upsert(self, rec: PlayerRecord):
+        value = self.render(rec)
+        i = bisect.bisect_left(self.names, rec.player)
+        if i < len(self.names) and self.names[i] == rec.player:
+            if self.values[i] == value:
+                return  # nothing visible changed (e.g. hidden player view)
+            self.values[i] = value
+            self._sizes[i] = len(rec.player) + len(value)
+        else:
+            self.names.insert(i, rec.player)
+            self.values.insert(i, value)
+            self._sizes.insert(i, len(rec.player) + len(value))
+        self._changed_at(i)
+
+    def remove(self, name: str):
+        i = bisect.bisect_left(self.names, name)
+        if i < len(self.names) and self.names[i] == name:
+            del self.names[i], self.values[i], self._sizes[i]
+            self._changed_at(i)
+
+    def _changed_at(self, i: int):
+        # Start from the page holding entry i-1: a change at i can decide whether
+        # entry i still fits on the end of that page.
+        p = bisect.bisect_right([pg.start for pg in self.pages], i - 1) - 1
+        p = max(p, 0)
+        self._rechunk(p, self.pages[p].start if self.pages else 0, i)
+
+    def _rechunk(self, p: int, start: int, changed: int):
+        """
+        Greedily re-chunk entries from `start` (page p) until, past the changed
+        index, we meet the first entry of an old page again.
+        """
+        old = self.pages[p:]
+        old_by_first = {pg.first: k for k, pg in enumerate(old)}
+        new_pages: list[RosterPage] = []
+
+        i, n = start, len(self.names)
+        while i < n:
+            k = old_by_first.get(self.names[i])
+            if i > changed and k is not None and k > 0:
+                # Same first entry and same entries after it: the rest is identical, just shifted
+                shift = i - old[k].start
+                for pg in old[k:]:
+                    pg.start += shift
+                    pg.end += shift
+                self.pages = self.pages[:p] + new_pages + old[k:]
+                return
+
+            j, chars = i, 0
+            while j < n and j - i < FIELD_LIMIT and (j == i or chars + self._sizes[j] <= PAGE_CHAR_BUDGET):
+                chars += self._sizes[j]
+                j += 1
+            new_pages.append(RosterPage(i, j, self.names[i]))
+            i = j
+
+        self.pages = self.pages[:p] + new_pages
+
+    def tokens(self) -> set[int]:
+        return {pg.token for pg in self.pages}
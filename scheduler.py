@@ -0,0 +1,195 @@
+import asyncio
+import heapq
+import json
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from config import logging
+from database import Database
+
+# scheduler.py
+#
+# Persistent one-shot job scheduler. Jobs live in SQLite, so anything scheduled
+# survives a restart/redeploy: start() reloads every pending job and re-arms it
+# (jobs that came due while the bot was down fire straight away).
+#
+# One timer task drives every job from a min-heap ordered by due time, so a
+# hundred open polls are a hundred heap entries and a single wakeup, not a
+# hundred sleeping coroutines.
+#
+# Handlers are registered per job kind and receive the job's JSON payload.
+# A job is marked done once its handler has returned, so delivery is
+# at-least-once. A handler that raises is retried with exponential backoff
+# (RETRY_BASE, doubling, at most RETRY_MAX apart); the new due time and the
+# attempt count are persisted, so a restart doesn't retry early. After
+# MAX_ATTEMPTS failures the job is given up on: logged and marked done, so a
+# failure no retry can fix doesn't come back every hour forever.
+
+JOBS_TABLE = "scheduled_jobs"
+
+Handler = Callable[[dict], Awaitable[Any]]
+
+RETRY_BASE = 30.0       # seconds after the first failure
+RETRY_MAX = 3600.0
+MAX_ATTEMPTS = 12       # ~6 hours of retries
+
+
+def ensure_schema(conn):
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {JOBS_TABLE} (
+            ID      INTEGER PRIMARY KEY,
+            KIND    TEXT    NOT NULL,
+            RUN_AT  REAL    NOT NULL,
+            PAYLOAD TEXT    NOT NULL DEFAULT '{{}}',
+            DONE    INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{JOBS_TABLE}_pending ON {JOBS_TABLE} (DONE, RUN_AT)")
+
+
+def add_attempts(conn):
+    """Count failed runs per job, for retry backoff (step 5 of migrations.py)."""
+    conn.execute(f"ALTER TABLE {JOBS_TABLE} ADD COLUMN ATTEMPTS INTEGER NOT NULL DEFAULT 0")
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds to wait before retrying a job that has failed `attempts` times."""
+    return min(RETRY_MAX, RETRY_BASE * 2 ** (attempts - 1))
+
+
+class Scheduler:
+    """Heap-driven timer for persisted jobs. `clock` returns unix seconds (swap in a fake for tests)."""
+
+    def __init__(self, db: Database, clock: Callable[[], float] = time.time):
+        self.db = db
+        self.clock = clock
+        self._handlers: dict[str, Handler] = {}
+        self._heap: list[tuple[float, int, str, dict]] = []
+        self._cancelled: set[int] = set()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._running: set[asyncio.Task] = set()
+
+    def register(self, kind: str, handler: Handler):
+        """Route due jobs of `kind` to handler(payload). Register before start()."""
+        self._handlers[kind] = handler
+
+    def pending(self, kind: Optional[str] = None) -> int:
+        """Number of armed jobs (optionally of one kind)."""
+        return sum(1 for _, job_id, k, _ in self._heap
+                   if job_id not in self._cancelled and (kind is None or k == kind))
+
+    def wake(self):
+        """Re-check the heap now (e.g. after advancing a fake clock)."""
+        self._wakeup.set()
+
+    # ----------------
+    # Lifecycle
+    # ----------------
+
+    async def start(self):
+        rows = await self.db.fetchall(
+            f"SELECT ID, KIND, RUN_AT, PAYLOAD FROM {JOBS_TABLE} WHERE DONE = 0"
+        )
+        for r in rows:
+            heapq.heappush(self._heap, (r["RUN_AT"], r["ID"], r["KIND"], json.loads(r["PAYLOAD"])))
+        if rows:
+            logging.info("Scheduler re-armed %d pending job(s)", len(rows))
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="scheduler")
+
+    async def stop(self):
+        if self._task:
+            # wait_for() can swallow a cancel that lands as the wakeup fires (3.11); the flag can't be missed
+            self._stopping = True
+            self.wake()
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # ----------------
+    # Jobs
+    # ----------------
+
+    async def schedule(self, kind: str, run_at: float, payload: Optional[dict] = None) -> int:
+        """Persist a job due at unix time `run_at` and arm it. Returns the job id."""
+        payload = payload or {}
+        cur = await self.db.execute(
+            f"INSERT INTO {JOBS_TABLE} (KIND, RUN_AT, PAYLOAD) VALUES (?, ?, ?)",
+            (kind, run_at, json.dumps(payload))
+        )
+        job_id = cur.lastrowid
+        heapq.heappush(self._heap, (run_at, job_id, kind, payload))
+        self.wake()
+        return job_id
+
+    async def cancel(self, job_id: int):
+        self._cancelled.add(job_id)
+        await self.db.execute(f"UPDATE {JOBS_TABLE} SET DONE = 1 WHERE ID = ?", (job_id,))
+        self.wake()
+
+    async def _run(self):
+        while not self._stopping:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            run_at, job_id, kind, payload = self._heap[0]
+            delay = run_at - self.clock()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._heap)
+            if job_id in self._cancelled:
+                self._cancelled.discard(job_id)
+                continue
+            # Run handlers as their own tasks so a slow one never delays the next job
+            task = asyncio.create_task(self._fire(job_id, kind, payload), name=f"job-{kind}-{job_id}")
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _fire(self, job_id: int, kind: str, payload: dict):
+        handler = self._handlers.get(kind)
+        if handler is None:
+            # Leave it pending; it will be re-armed on the next start
+            logging.warning("No handler registered for job kind %r (job %d)", kind, job_id)
+            return
+        try:
+            await handler(payload)
+        except Exception:
+            await self._retry(job_id, kind, payload)
+            return
+        await self.db.execute(f"UPDATE {JOBS_TABLE} SET DONE = 1 WHERE ID = ?", (job_id,))
+
+    async def _retry(self, job_id: int, kind: str, payload: dict):
+        """Push a failed job back, RETRY_BASE doubling per failure (capped at RETRY_MAX), up to MAX_ATTEMPTS."""
+        row = await self.db.fetchone(f"SELECT ATTEMPTS, DONE FROM {JOBS_TABLE} WHERE ID = ?", (job_id,))
+        if row is None or row["DONE"] or job_id in self._cancelled:
+            # Cancelled while it ran
+            self._cancelled.discard(job_id)
+            logging.exception("Scheduled job %d (%s) failed; it was cancelled meanwhile", job_id, kind)
+            return
+        attempts = row["ATTEMPTS"] + 1
+        if attempts >= MAX_ATTEMPTS:
+            logging.exception("Scheduled job %d (%s) failed %d times; giving up", job_id, kind, attempts)
+            await self.db.execute(
+                f"UPDATE {JOBS_TABLE} SET ATTEMPTS = ?, DONE = 1 WHERE ID = ?", (attempts, job_id)
+            )
+            return
+        run_at = self.clock() + retry_delay(attempts)
+        logging.exception("Scheduled job %d (%s) failed (attempt %d), retrying at %.0f",
+                          job_id, kind, attempts, run_at)
+        await self.db.execute(
+            f"UPDATE {JOBS_TABLE} SET ATTEMPTS = ?, RUN_AT = ? WHERE ID = ? AND DONE = 0", (attempts, run_at, job_id)
+        )
+        heapq.heappush(self._heap, (run_at, job_id, kind, payload))
+        self.wake()
@@ -0,0 +1,88 @@
+from typing import Hashable, Iterable
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from config import logging
+from outbox import OutboxContext
+
+# slash.py
+#
+# Slash command equivalents of the prefix commands. The cogs' app commands are
+# thin: they name their options (with autocomplete from prefix_index.py) and
+# hand them to run(), which calls the matching !command's callback with a
+# Context built from the interaction. So a /command goes through the same
+# checks (cog_check, gm_only), invoke hooks (metrics, watchdog) and cog error
+# handlers as the !command, and its ctx.reply()s answer the interaction.
+#
+# Discord wants an answer within 3 seconds of a slash command; commands that
+# can take longer (building the roster, a guild's first load) defer first,
+# which shows "thinking..." and makes every reply a followup.
+#
+# New app commands reach Discord with !syncCommands (admin_commands.py).
+
+FAILED = "Something went wrong running that command."
+DONE = "✅ Done."
+
+
+def choices(pairs: Iterable[tuple[str, Hashable]]) -> list[app_commands.Choice]:
+    """Autocomplete choices from (label, value) pairs; Discord caps both at 100 characters."""
+    return [app_commands.Choice(name=label[:100], value=value) for label, value in pairs
+            if not isinstance(value, str) or len(value) <= 100]
+
+
+class SlashContext(OutboxContext):
+    """Notes whether the command answered, so run() can close an interaction it left open."""
+
+    answered = False
+
+    async def send(self, *args, **kwargs):
+        message = await super().send(*args, **kwargs)
+        self.answered = True
+        return message
+
+
+async def _tell(interaction: discord.Interaction, message: str):
+    if interaction.response.is_done():
+        await interaction.followup.send(message, ephemeral=True)
+    else:
+        await interaction.response.send_message(message, ephemeral=True)
+
+
+async def run(interaction: discord.Interaction, command: commands.Command, *args, defer: bool = False, **kwargs):
+    """Invoke a prefix command's callback for a slash command, as Command.invoke would for a message."""
+    if defer:
+        await interaction.response.defer(thinking=True)
+    ctx = await SlashContext.from_interaction(interaction)
+    ctx.command = command
+    ctx.invoked_with = command.name
+    ctx.args, ctx.kwargs = [command.cog, ctx, *args], kwargs
+    bot = ctx.bot
+    bot.dispatch("command", ctx)
+    try:
+        if not await command.can_run(ctx):
+            raise commands.CheckFailure(f"The check functions for command {command.qualified_name} failed.")
+        await command.call_before_hooks(ctx)
+        try:
+            await command.callback(command.cog, ctx, *args, **kwargs)
+        except commands.CommandError:
+            ctx.command_failed = True
+            raise
+        except Exception as e:
+            ctx.command_failed = True
+            raise commands.CommandInvokeError(e) from e
+        finally:
+            await command.call_after_hooks(ctx)
+    except commands.CommandError as error:
+        await command.dispatch_error(ctx, error)
+        if isinstance(error, commands.CheckFailure):
+            await _tell(interaction, str(error))
+        elif not ctx.answered:
+            logging.error("/%s failed", command.qualified_name, exc_info=error)
+            await _tell(interaction, FAILED)
+    else:
+        bot.dispatch("command_completion", ctx)
+        if not ctx.answered:
+            # e.g. a GM's /info, posted to the GM channel
+            await _tell(interaction, DONE)
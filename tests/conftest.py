@@ -0,0 +1,26 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+import pytest
+
+# tests/conftest.py
+#
+# Tests run from anywhere with plain `python -m pytest`. Repo modules are
+# imported from the repo root; config.py opens discord.log in the working
+# directory, so the whole session runs from a temp dir instead of the repo.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp(prefix="rattlepost-tests-"))
+
+
+def run(coro):
+    """Await a coroutine from a plain (sync) test."""
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "test.db")
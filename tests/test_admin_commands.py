@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+from conftest import run
+from config import DOWNTIME_POLL_TABLE, DOWNTIME_VOTE_TABLE
+from database import Database
+
+GUILD = 10**17
+POLL, CHANNEL, AUTHOR = 900, 800, 700
+
+
+class FakeOutbox:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, destination, content=None, **kwargs):
+        self.sent.append((destination, content))
+
+
+class DeletedPollChannel:
+    """A channel whose poll message was deleted before the poll closed."""
+
+    id = CHANNEL
+    guild = None
+
+    def __init__(self):
+        self.deletes = 0
+
+    async def fetch_message(self, message_id):
+        import discord
+        raise discord.NotFound(SimpleNamespace(status=404, reason="Not Found"), "Unknown Message")
+
+    def get_partial_message(self, message_id):
+        async def delete():
+            self.deletes += 1
+        return SimpleNamespace(delete=delete)
+
+
+def test_deleted_poll_closes_on_its_saved_votes(db_path):
+    from cogs.admin_commands import ACTIONS, AdminCommands, _emoji_key
+    import migrations
+
+    channel, outbox = DeletedPollChannel(), FakeOutbox()
+    author = SimpleNamespace(id=AUTHOR)
+
+    async def noop():
+        pass
+
+    async def fetch_user(user_id):
+        return author
+
+    async def scenario():
+        db = Database(db_path)
+        try:
+            await migrations.run(db)
+            await db.execute(
+                f"INSERT INTO {DOWNTIME_POLL_TABLE} (MESSAGE_ID, CHANNEL_ID, AUTHOR_ID, CLOSES_AT, GUILD_ID) "
+                "VALUES (?, ?, ?, 0, ?)", (POLL, CHANNEL, AUTHOR, GUILD)
+            )
+            await db.executemany(
+                f"INSERT INTO {DOWNTIME_VOTE_TABLE} (MESSAGE_ID, USER_ID, EMOJI) VALUES (?, ?, ?)",
+                [(POLL, 1, _emoji_key(ACTIONS[0][0])), (POLL, 2, _emoji_key(ACTIONS[1][0]))]
+            )
+            bot = SimpleNamespace(
+                db=db, scheduler=SimpleNamespace(register=lambda kind, handler: None), outbox=outbox,
+                wait_until_ready=noop, get_channel=lambda cid: channel, fetch_user=fetch_user,
+            )
+            cog = AdminCommands(bot)
+            await cog.cog_load()     # restarted: the poll's tally can't be trusted, so it tries to refetch
+            await cog.close_weekly_job({"message_id": POLL, "channel_id": CHANNEL, "author_id": AUTHOR})
+            closed = await db.fetchone(f"SELECT CLOSED FROM {DOWNTIME_POLL_TABLE} WHERE MESSAGE_ID = ?", (POLL,))
+            return closed[0], cog.tallies
+        finally:
+            db.close()
+
+    closed, tallies = run(scenario())
+    assert closed == 1 and POLL not in tallies
+    assert channel.deletes == 0
+    (to, summary), (notice_to, notice) = outbox.sent
+    assert to is author and "<@1>" in summary and "<@2>" in summary
+    assert notice_to is channel and "have closed" in notice
@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+from conftest import run
+from config import QUEST_BOARD_TABLE
+from database import Database
+
+GUILD = 10**17
+
+
+class FakeAttachment:
+    def __init__(self, filename: str, data: bytes):
+        self.filename, self.size, self._data = filename, len(data), data
+
+    async def read(self) -> bytes:
+        return self._data
+
+
+class FakeCtx:
+    """A slash command's context: the file comes as an option, the message has none."""
+
+    def __init__(self):
+        self.guild = SimpleNamespace(id=GUILD)
+        self.author = SimpleNamespace(id=1, display_name="GM")
+        self.command = "importquests"
+        self.message = SimpleNamespace(attachments=[])
+        self.replies = []
+
+    async def reply(self, content=None, **kwargs):
+        self.replies.append(content)
+
+
+def test_import_uses_the_attachment_it_is_given(db_path):
+    import bulk_io
+    import migrations
+
+    async def scenario():
+        db = Database(db_path)
+        try:
+            await migrations.run(db)
+            ctx = FakeCtx()
+            missing = await bulk_io.import_attachment(db, ctx, bulk_io.QUESTS)
+            file = FakeAttachment("quests.csv", b"name,type,description\nRat cellar,U,Rats\nBandits,C,\n")
+            result = await bulk_io.import_attachment(db, ctx, bulk_io.QUESTS, file)
+            count = await db.fetchone(f"SELECT COUNT(*) FROM {QUEST_BOARD_TABLE} WHERE GUILD_ID = ?", (GUILD,))
+            return missing, result, count[0], ctx.replies
+        finally:
+            db.close()
+
+    missing, result, count, replies = run(scenario())
+    assert missing is None and len(replies) == 1 and "Attach" in replies[0]
+    assert result.inserted == 2 and count == 2
@@ -0,0 +1,126 @@
+import asyncio
+import random
+from types import SimpleNamespace
+
+from conftest import run
+from config import PLAYER_INFO_TABLE
+from currency import CURRENCY
+from database import Database
+
+GUILD = 10**17
+ACTOR = (1, "GM", "test")
+PLAYERS = [f"Player{i:02d}" for i in range(20)]
+
+
+def test_concurrent_transfers_and_awards_conserve_coins(db_path):
+    from cogs.player_info import _add_player, _apply_currency_deltas, _transfer
+    import ledger
+    import migrations
+
+    rng = random.Random(17)
+    outcomes = []
+    add_total = f"({CURRENCY.total_sql} + d.delta)"
+    sub_total = f"({CURRENCY.total_sql} - d.delta)"
+
+    async def transfer():
+        giver, receiver = rng.sample(PLAYERS, 2)
+        problem, *_ = await db.write(_transfer, GUILD, giver, receiver, rng.randint(1, 12), rng.choice(CURRENCY.units), ACTOR)
+        outcomes.append(problem)
+        return 0
+
+    async def award(sign: int):
+        # addMoney / rmMoney: several players at once, rmMoney refused where it would overdraw
+        deltas = {p: rng.randint(1, 800) for p in rng.sample(PLAYERS, rng.randint(1, 5))}
+        new_total = add_total if sign > 0 else sub_total
+        updated, _ = await db.write(
+            _apply_currency_deltas, GUILD, CURRENCY.normalized_set_sql(new_total), f"{new_total} >= 0",
+            deltas, {p: sign * d for p, d in deltas.items()}, "test", ACTOR
+        )
+        return sign * sum(deltas[p] for p in updated)
+
+    def state(conn):
+        rows = conn.execute(f"SELECT PLAYER, GOLD, SILVER, COPPER, {CURRENCY.total_sql} "
+                            f"FROM {PLAYER_INFO_TABLE} WHERE GUILD_ID = ?", (GUILD,)).fetchall()
+        return rows, {r[0]: ledger.balance(conn, GUILD, r[0]) for r in rows}
+
+    async def scenario():
+        await migrations.run(db)
+        for name in PLAYERS:
+            await db.write(_add_player, GUILD, name, 2, ACTOR)
+        start = sum(r[4] for r in (await db.read(state))[0])
+        jobs = [transfer() for _ in range(600)] + [award(1) for _ in range(150)] + [award(-1) for _ in range(150)]
+        rng.shuffle(jobs)
+        changed = sum(await asyncio.gather(*jobs))
+        rows, balances = await db.read(state)
+        return start, changed, rows, balances
+
+    db = Database(db_path)
+    try:
+        start, changed, rows, balances = run(scenario())
+    finally:
+        db.close()
+
+    assert set(outcomes) <= {None, "funds", "change"} and outcomes.count(None) > 100 and "funds" in outcomes
+    assert len(rows) == len(PLAYERS)
+    assert sum(r[4] for r in rows) == start + changed
+    assert all(min(r[1:4]) >= 0 for r in rows), [tuple(r) for r in rows if min(r[1:4]) < 0]
+    assert balances == {r[0]: r[4] for r in rows}
+
+
+class MemberCtx:
+    """Just enough of a Context for giveMoney run by a linked member."""
+
+    def __init__(self, guild, member_id: int, cog):
+        self.guild = guild
+        self.author = SimpleNamespace(id=member_id, display_name=f"member{member_id}", name=f"member{member_id}")
+        self.command = "giveMoney"
+        self.cog = cog
+        self.replies = []
+
+    async def reply(self, content=None, **kwargs):
+        self.replies.append(content)
+
+    send = reply
+
+
+def test_opposite_give_money_through_the_cog(db_path):
+    """A->B and B->A giveMoney at once: the ordered player locks never deadlock, and the cache stays right."""
+    from cogs.player_info import PlayerInfo, _add_player, _get_player_row
+
+    rng = random.Random(17)
+    names = PLAYERS[:4]
+    guild = SimpleNamespace(id=GUILD)
+
+    async def scenario():
+        import migrations
+        await migrations.run(db)
+        for name in names:
+            await db.write(_add_player, GUILD, name, 2, ACTOR)
+        cog = PlayerInfo(SimpleNamespace(db=db))
+        players = await cog.players_of(GUILD)
+        for member_id, name in enumerate(names, 1):
+            await players.identity.link(name, member_id)
+
+        async def give(giver: int, receiver: int):
+            ctx = MemberCtx(guild, giver, cog)
+            await cog.giveMoney.callback(cog, ctx, names[receiver - 1], rng.randint(1, 30), rng.choice(CURRENCY.units))
+            return ctx.replies
+
+        pairs = [(1, 2), (2, 1)] * 150 + [tuple(rng.sample(range(1, len(names) + 1), 2)) for _ in range(200)]
+        rng.shuffle(pairs)
+        replies = await asyncio.wait_for(asyncio.gather(*(give(g, r) for g, r in pairs)), timeout=30)
+        stored = await db.read(lambda conn: {n: _get_player_row(conn, GUILD, n) for n in names})
+        cached = {n: await players.cache.get(n) for n in names}
+        return [line for lines in replies for line in lines], stored, cached
+
+    db = Database(db_path)
+    try:
+        replies, stored, cached = run(scenario())
+    finally:
+        db.close()
+
+    done = sum(line.startswith("💸") for line in replies)
+    assert done > 100 and all(line.startswith(("💸", "❌")) for line in replies), replies[:5]
+    assert sum(CURRENCY.total(rec) for rec in stored.values()) == len(names) * CURRENCY.to_base({"gp": 10})
+    assert all(min(CURRENCY.counts(rec).values()) >= 0 for rec in stored.values())
+    assert cached == stored
@@ -0,0 +1,72 @@
+import itertools
+import random
+import sqlite3
+
+import pytest
+
+from currency import CURRENCY, CurrencySystem, Denomination
+
+# D&D's full set, including electrum: a longer chain with a coin that isn't a power of ten
+FIVE_COINS = CurrencySystem((
+    Denomination("pp", "PLATINUM", "platinum", 1000),
+    Denomination("gp", "GOLD", "gold", 100),
+    Denomination("ep", "ELECTRUM", "electrum", 50),
+    Denomination("sp", "SILVER", "silver", 10),
+    Denomination("cp", "COPPER", "copper", 1),
+))
+SYSTEMS = pytest.mark.parametrize("system", [CURRENCY, FIVE_COINS], ids=["gp-sp-cp", "pp-gp-ep-sp-cp"])
+
+
+def purses(system, rng, n=400):
+    """Random coin counts, with plenty of empty slots and a few large piles."""
+    for _ in range(n):
+        yield {u: rng.choice((0, 0, rng.randint(1, 9), rng.randint(10, 500))) for u in system.units}
+
+
+@SYSTEMS
+def test_make_change_conserves_worth_and_pays_when_it_can(system):
+    rng = random.Random(18)
+    for target in system.units:
+        for counts in purses(system, rng):
+            worth = system.to_base(counts)
+            amount = rng.randint(1, worth // system.value[target] + 3)
+            before = dict(counts)
+            notes = system.make_change(counts, target, amount)
+            assert system.to_base(counts) == worth, (target, amount, before, counts)
+            assert all(c >= 0 for c in counts.values()), (target, amount, before, counts)
+            enough = worth >= amount * system.value[target]
+            assert (counts[target] >= amount) == enough, (target, amount, before, counts)
+            if before[target] >= amount:
+                assert counts == before and notes == []
+
+
+@SYSTEMS
+def test_every_unit_pair_converts_exactly(system):
+    """What !convert does for each (from, to): worth kept, the source never goes negative."""
+    rng = random.Random(18)
+    for f, t in itertools.permutations(system.units, 2):
+        for counts in purses(system, rng, n=100):
+            amount = rng.randint(0, counts[f])
+            if system.value[f] > system.value[t]:
+                added = amount * system.factor[(f, t)]
+            else:
+                amount -= amount % system.factor[(t, f)]   # moving up takes exact multiples
+                added = amount // system.factor[(t, f)]
+            after = dict(counts, **{f: counts[f] - amount, t: counts[t] + added})
+            assert system.to_base(after) == system.to_base(counts), (f, t, amount, counts)
+            assert min(after.values()) >= 0
+
+
+@SYSTEMS
+def test_normalized_sql_matches_from_base(system):
+    rng = random.Random(18)
+    conn = sqlite3.connect(":memory:")
+    columns = [d.column for d in system.denominations]
+    conn.execute(f"CREATE TABLE purse (TOTAL INTEGER, {', '.join(c + ' INTEGER' for c in columns)})")
+    totals = [0, 1, 9, 10, 99, 100, 101] + [rng.randint(0, 10**7) for _ in range(300)]
+    conn.executemany("INSERT INTO purse (TOTAL) VALUES (?)", [(t,) for t in totals])
+    conn.execute(f"UPDATE purse SET {system.normalized_set_sql('TOTAL')}")
+    for total, *coins in conn.execute(f"SELECT TOTAL, {', '.join(columns)} FROM purse"):
+        assert dict(zip(system.units, coins)) == system.from_base(total)
+        assert conn.execute(f"SELECT {system.total_sql} FROM (SELECT ? AS {columns[0]}"
+                            + "".join(f", ? AS {c}" for c in columns[1:]) + ")", coins).fetchone()[0] == total
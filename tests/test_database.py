@@ -0,0 +1,42 @@
+import sqlite3
+
+import pytest
+
+from conftest import run
+from database import Database
+
+
+def test_write_rolls_back_on_error(db_path):
+    async def scenario():
+        db = Database(db_path)
+        await db.execute("CREATE TABLE t (x INTEGER)")
+
+        def insert_then_fail(conn):
+            conn.execute("INSERT INTO t VALUES (1)")
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            await db.write(insert_then_fail)
+        rows = await db.fetchall("SELECT x FROM t")
+        db.close()
+        return rows
+
+    assert run(scenario()) == []
+
+
+def test_failed_commit_rolls_back(db_path):
+    # A deferred foreign key is only checked at COMMIT, so COMMIT itself raises
+    async def scenario():
+        db = Database(db_path)
+        await db.execute("CREATE TABLE parent (id INTEGER PRIMARY KEY)")
+        await db.execute("CREATE TABLE child (pid INTEGER REFERENCES parent(id) DEFERRABLE INITIALLY DEFERRED)")
+        with pytest.raises(sqlite3.IntegrityError):
+            await db.execute("INSERT INTO child VALUES (5)")
+        # The writer connection must not be left inside the failed transaction
+        await db.execute("INSERT INTO parent VALUES (1)")
+        parents = await db.fetchall("SELECT id FROM parent")
+        children = await db.fetchall("SELECT pid FROM child")
+        db.close()
+        return [r[0] for r in parents], children
+
+    assert run(scenario()) == ([1], [])
@@ -0,0 +1,63 @@
+import io
+
+from conftest import run
+from config import PLAYER_INFO_TABLE
+from currency import CURRENCY
+from database import Database
+
+GUILD = 10**17
+ACTOR = (1, "GM", "test")
+
+
+def balances(conn):
+    """{player: (balance from PLAYER_INFO_TABLE, balance from the ledger)}"""
+    import ledger
+    rows = conn.execute(f"SELECT PLAYER, {CURRENCY.total_sql} FROM {PLAYER_INFO_TABLE} WHERE GUILD_ID = ?", (GUILD,))
+    return {player: (total, ledger.balance(conn, GUILD, player)) for player, total in rows.fetchall()}
+
+
+async def with_db(db_path, scenario):
+    import migrations
+    db = Database(db_path)
+    try:
+        await migrations.run(db)
+        return await scenario(db)
+    finally:
+        db.close()
+
+
+def test_new_players_open_their_ledger(db_path):
+    from cogs.player_info import _add_player
+    import bulk_io
+
+    async def scenario(db):
+        assert await db.write(_add_player, GUILD, "Gorn", 2, ACTOR)
+        assert not await db.write(_add_player, GUILD, "Gorn", 2, ACTOR)
+        roster = b"player,gp,sp,cp\nAnya,3,4,5\nBram,0,0,0\nGorn,99,0,0\n"
+        result = await db.write(bulk_io.import_rows, bulk_io.PLAYERS, GUILD, io.BytesIO(roster), "csv", ACTOR)
+        assert (result.inserted, result.skipped) == (2, 1)
+        return await db.read(balances)
+
+    found = run(with_db(db_path, scenario))
+    assert found == {"Gorn": (1000, 1000), "Anya": (345, 345), "Bram": (0, 0)}
+
+
+def test_readded_player_starts_a_fresh_history(db_path):
+    from cogs.player_info import _add_player, _apply_currency_deltas, _remove_player
+    import ledger
+
+    async def scenario(db):
+        await db.write(_add_player, GUILD, "Gorn", 2, ACTOR)
+        new_total = f"({CURRENCY.total_sql} + d.delta)"
+        await db.write(_apply_currency_deltas, GUILD, CURRENCY.normalized_set_sql(new_total), f"{new_total} >= 0",
+                       {"Gorn": 550}, {"Gorn": 550}, "test", ACTOR)
+        assert await db.write(_remove_player, GUILD, "Gorn")
+        assert not await db.write(_remove_player, GUILD, "Gorn")
+        assert await db.read(ledger.balance, GUILD, "Gorn") is None
+        await db.write(_add_player, GUILD, "Gorn", 2, ACTOR)
+        rows, _ = await db.read(ledger.page, GUILD, "Gorn")
+        return await db.read(balances), [r["REASON"] for r in rows]
+
+    found, reasons = run(with_db(db_path, scenario))
+    assert found == {"Gorn": (1000, 1000)}
+    assert reasons == ["opening balance"]
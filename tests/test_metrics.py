@@ -0,0 +1,74 @@
+import asyncio
+from unittest.mock import MagicMock
+
+from conftest import run
+
+
+def make_bot():
+    """A bot wired like main.py: invoke hooks plus the on_command_error listener."""
+    import discord
+    from discord.ext import commands
+    from metrics import Metrics
+
+    bot = commands.Bot(command_prefix="!", intents=discord.Intents.none())
+    bot.loop = asyncio.get_running_loop()   # normally set at login; dispatch() needs it
+    bot.metrics = Metrics()
+    bot.before_invoke(bot.metrics.before_invoke)
+    bot.after_invoke(bot.metrics.after_invoke)
+    bot.add_listener(bot.metrics.command_error, "on_command_error")
+
+    @bot.command()
+    async def ok(ctx, amount: int):
+        pass
+
+    @bot.command()
+    async def boom(ctx):
+        raise RuntimeError("boom")
+
+    @bot.command()
+    @commands.check(lambda ctx: False)
+    async def denied(ctx):
+        pass
+
+    async def quiet(ctx, error):
+        pass  # the default handler prints a traceback per failure
+    bot.on_command_error = quiet
+    return bot
+
+
+async def invoke(bot, text: str):
+    from discord.ext import commands
+    from discord.ext.commands.view import StringView
+
+    view = StringView(text)
+    name = view.get_word()
+    ctx = commands.Context(message=MagicMock(), bot=bot, view=view, prefix="!")
+    ctx.invoked_with = name
+    ctx.command = bot.all_commands.get(name)
+    await bot.invoke(ctx)
+    await asyncio.sleep(0.01)  # let the dispatched on_command_error listeners run
+
+
+def counts(bot, name):
+    stats = bot.metrics.commands.get(name)
+    return (stats.calls, stats.errors, stats.latency.count) if stats else None
+
+
+def test_failures_before_the_hooks_are_counted_once():
+    async def scenario():
+        bot = make_bot()
+        await invoke(bot, "ok 5")
+        await invoke(bot, "ok five")        # converter failure: hooks never run
+        await invoke(bot, "ok")             # missing argument
+        await invoke(bot, "boom")           # raised inside the command: after_invoke counts it
+        await invoke(bot, "denied")         # check failure
+        await invoke(bot, "nosuchcommand")
+        return bot
+
+    bot = run(scenario())
+    assert counts(bot, "ok") == (3, 2, 1)
+    assert counts(bot, "boom") == (1, 1, 1)
+    assert counts(bot, "denied") == (1, 1, 0)
+    assert "nosuchcommand" not in bot.metrics.commands
+    text = bot.metrics.render()
+    assert 'rattlepost_command_errors_total{command="denied"} 1' in text
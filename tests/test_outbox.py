@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from conftest import run
+
+
+class FakeChannel:
+    id = 1
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append((content, kwargs))
+        return len(self.sent)
+
+
+def test_chunks_fit_and_keep_the_text():
+    from outbox import MESSAGE_LIMIT, chunks
+    text = "\n".join(f"line {i} " + "y" * (i % 150) for i in range(300)) + "\n" + "word " * 900
+    pieces = chunks(text)
+    assert len(pieces) > 1
+    assert all(0 < len(p) <= MESSAGE_LIMIT and p.strip() for p in pieces)
+    assert "".join(text.split()) == "".join("".join(pieces).split())
+    assert chunks("short") == ["short"]
+
+
+def test_empty_messages_are_refused_before_queueing():
+    from outbox import Outbox
+
+    async def scenario():
+        outbox, channel = Outbox(), FakeChannel()
+        for content in (None, "", "  \n "):
+            with pytest.raises(ValueError):
+                await outbox.send(channel, content)
+        await outbox.send(channel, None, embed=object())     # an embed alone is a message
+        await outbox.send(channel, " ", file=object())
+        await outbox.send(channel, "hi")
+        await outbox.flush()
+        await asyncio.sleep(0)
+        return outbox.queued, channel.sent
+
+    queued, sent = run(scenario())
+    assert queued == 3
+    assert [content for content, _ in sent] == [None, " ", "hi"]
@@ -0,0 +1,35 @@
+from types import SimpleNamespace
+
+from conftest import run
+from database import Database
+
+GUILD = 10**17
+ACTOR = (1, "GM", "test")
+
+
+def member(member_id: int, name: str, display_name: str, discriminator: str = "0"):
+    return SimpleNamespace(id=member_id, name=name, display_name=display_name, discriminator=discriminator)
+
+
+def test_only_the_username_claims_an_unlinked_player(db_path):
+    from cogs.player_info import GuildPlayers, _add_player
+    import migrations
+
+    async def scenario():
+        db = Database(db_path)
+        try:
+            await migrations.run(db)
+            for name in ("Gorn", "Anya", "Bram"):
+                await db.write(_add_player, GUILD, name, 2, ACTOR)
+            identity = (await GuildPlayers(db, GUILD).ready()).identity
+            return [
+                await identity.resolve(member(1, "mallory", "Gorn")),       # nickname only: no takeover
+                await identity.resolve(member(2, "gorn", "Gorn the Bold")),  # the owner's username
+                await identity.resolve(member(3, "anya", "Anya", "4821")),  # legacy, non-unique username
+                await identity.resolve(member(1, "mallory", "Gorn")),
+                await identity.resolve(member(4, "bram", "someone")),
+            ]
+        finally:
+            db.close()
+
+    assert run(scenario()) == [None, "Gorn", None, None, "Bram"]
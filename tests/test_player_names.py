@@ -0,0 +1,39 @@
+from conftest import run
+from database import Database
+
+GUILD = 10**17
+ACTOR = (1, "GM", "test")
+
+
+class FakeCtx:
+    def __init__(self):
+        self.replies = []
+
+    async def reply(self, content=None, **kwargs):
+        self.replies.append(content)
+
+
+def test_misspelled_name_is_only_suggested_without_fuzzy(db_path):
+    from cogs.player_info import GuildPlayers, _add_player
+    import migrations
+
+    async def scenario():
+        db = Database(db_path)
+        try:
+            await migrations.run(db)
+            for name in ("Gornak", "Anya", "Bramble"):
+                await db.write(_add_player, GUILD, name, 2, ACTOR)
+            players = await GuildPlayers(db, GUILD).ready()
+            ctx = FakeCtx()
+            found = [
+                await players.resolve_name(ctx, "gornak", fuzzy=False),   # case only: not a correction
+                await players.resolve_name(ctx, "Gornakk"),
+                await players.resolve_name(ctx, "Gornakk", fuzzy=False),
+            ]
+            return found, ctx.replies
+        finally:
+            db.close()
+
+    found, replies = run(scenario())
+    assert found == ["Gornak", "Gornak", None]
+    assert len(replies) == 1 and "Gornakk" in replies[0] and "Gornak" in replies[0]
@@ -0,0 +1,89 @@
+import io
+import sqlite3
+
+from conftest import run
+from config import QUEST_BOARD_TABLE
+from database import Database
+
+GUILD = 10**17
+
+
+def migrate_to(conn, version: int):
+    import migrations
+    conn.execute("BEGIN")
+    for step in migrations.MIGRATIONS[migrations.version(conn):version]:
+        step(conn)
+    conn.execute(f"PRAGMA user_version = {version}")
+    conn.execute("COMMIT")
+
+
+def board(conn) -> dict[int, str]:
+    return dict(conn.execute(f"SELECT ID, NAME FROM {QUEST_BOARD_TABLE}").fetchall())
+
+
+def search_ids(conn, terms: str) -> set[int]:
+    import quest_search
+    return {r[0] for r in quest_search.search(conn, GUILD, terms)}
+
+
+def test_quest_ids_survive_the_rebuild_and_vacuum(db_path):
+    import quest_search
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    migrate_to(conn, 5)
+    for i in range(20):
+        conn.execute(f"INSERT INTO {QUEST_BOARD_TABLE} (GUILD_ID, NAME, DESCRIPTION) VALUES (?, ?, ?)",
+                     (GUILD, f"Quest {i}", f"{'goblin' if i % 2 else 'dragon'} trouble number{i}"))
+    # Gaps: ids an implicit ROWID table may renumber on VACUUM
+    conn.execute(f"DELETE FROM {QUEST_BOARD_TABLE} WHERE ROWID % 3 = 0")
+    before = dict(conn.execute(f"SELECT ROWID, NAME FROM {QUEST_BOARD_TABLE}").fetchall())
+    goblins = {rowid for rowid, name in before.items() if int(name.split()[1]) % 2}
+
+    migrate_to(conn, 6)
+    assert board(conn) == before
+    assert search_ids(conn, "goblin") == goblins
+
+    conn.execute("VACUUM")
+    assert board(conn) == before
+    assert search_ids(conn, "goblin") == goblins
+    conn.execute(f"INSERT INTO {quest_search.QUEST_SEARCH_TABLE} ({quest_search.QUEST_SEARCH_TABLE}, rank) "
+                 f"VALUES ('integrity-check', 1)")
+
+    # New quests and deletes keep the index in step
+    new_id = conn.execute(f"INSERT INTO {QUEST_BOARD_TABLE} (GUILD_ID, NAME, DESCRIPTION) VALUES (?, ?, ?)",
+                          (GUILD, "Wyrm hunt", "a goblin king")).lastrowid
+    conn.execute(f"DELETE FROM {QUEST_BOARD_TABLE} WHERE ID = ?", (min(goblins),))
+    assert search_ids(conn, "goblin") == goblins - {min(goblins)} | {new_id}
+    conn.close()
+
+
+def test_legacy_board_with_nulls_migrates(db_path):
+    import migrations
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    # The pre-migrations bot's table: no NOT NULL, and rows written with missing fields
+    conn.execute(f"CREATE TABLE {QUEST_BOARD_TABLE} (NAME TEXT, TYPE TEXT, DESCRIPTION TEXT)")
+    conn.executemany(f"INSERT INTO {QUEST_BOARD_TABLE} VALUES (?, ?, ?)",
+                     [("Rat cellar", "U", None), ("Goblin camp", None, "goblin raiders"), (None, "C", None)])
+    migrate_to(conn, len(migrations.MIGRATIONS))
+    rows = conn.execute(f"SELECT ID, NAME, TYPE, DESCRIPTION FROM {QUEST_BOARD_TABLE} ORDER BY ID").fetchall()
+    assert rows == [(1, "Rat cellar", "U", ""), (2, "Goblin camp", "U", "goblin raiders"), (3, "", "C", "")]
+    conn.close()
+
+
+def test_imported_quests_are_searchable(db_path):
+    import bulk_io
+    import migrations
+
+    async def scenario():
+        db = Database(db_path)
+        await migrations.run(db)
+        csv = b"name,description\n" + b"".join(b"Quest %d,goblin camp %d\n" % (i, i) for i in range(50))
+        result = await db.write(bulk_io.import_rows, bulk_io.QUESTS, GUILD, io.BytesIO(csv), "csv")
+        ids = await db.read(lambda conn: set(board(conn)))
+        found = await db.read(search_ids, "goblin")
+        db.close()
+        return result.inserted, ids, found
+
+    inserted, ids, found = run(scenario())
+    assert inserted == 50
+    # search() returns at most RESULT_LIMIT rows, all of them real quest ids
+    assert found and found <= ids
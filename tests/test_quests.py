@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+
+from conftest import run
+from config import QUEST_BOARD_TABLE
+from database import Database
+
+GUILD = 10**17
+
+
+def walk_board(db_path, quests: list[tuple[str, str]]):
+    """Insert (name, description) quests, then page the whole board with IDs shown."""
+    from cogs.quests import Quests
+    import migrations
+
+    async def scenario():
+        db = Database(db_path)
+        try:
+            await migrations.run(db)
+            await db.executemany(
+                f"INSERT INTO {QUEST_BOARD_TABLE} (GUILD_ID, NAME, TYPE, DESCRIPTION) VALUES (?, ?, 'U', ?)",
+                [(GUILD, name, description) for name, description in quests]
+            )
+            cog = Quests(SimpleNamespace(db=db))
+            pages, after = [], 0
+            while after is not None:
+                embed, after = await cog.board_page(GUILD, after, True, len(pages) + 1)
+                pages.append(embed)
+            return pages
+        finally:
+            db.close()
+
+    return run(scenario())
+
+
+def test_board_pages_fit_an_embed(db_path):
+    from cogs.quests import BOARD_PAGE_SIZE
+    quests = [(f"{i:03d} " + "The Long and Winding Road to the Sunken Citadel " * 6, "d" * 900) for i in range(30)]
+    pages = walk_board(db_path, quests)
+    assert all(len(embed) <= 6000 for embed in pages), [len(embed) for embed in pages]
+    assert all(len(f.name) <= 256 and len(f.value) <= 1024 for embed in pages for f in embed.fields)
+    assert 1 < max(len(embed.fields) for embed in pages) < BOARD_PAGE_SIZE
+    # Every quest shows up once, in order
+    assert [f.name[:3] for embed in pages for f in embed.fields] == [f"{i:03d}" for i in range(30)]
+
+
+def test_short_quests_fill_whole_pages(db_path):
+    from cogs.quests import BOARD_PAGE_SIZE
+    pages = walk_board(db_path, [(f"Quest {i}", "rats") for i in range(25)])
+    assert [len(embed.fields) for embed in pages] == [BOARD_PAGE_SIZE, BOARD_PAGE_SIZE, 5]
+    assert pages[-1].footer.text == "Page 3 • 25 quests • IDs visible"
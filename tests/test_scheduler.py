@@ -0,0 +1,227 @@
+import asyncio
+import random
+
+from conftest import run
+from database import Database
+
+START = 1_700_000_000.0
+
+
+class FakeClock:
+    def __init__(self, now: float = START):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def until(condition, timeout: float = 2.0):
+    """Let the scheduler's tasks run until condition() holds."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "timed out"
+        await asyncio.sleep(0.005)
+
+
+async def advance(scheduler, clock: FakeClock, seconds: float):
+    clock.now += seconds
+    scheduler.wake()
+    await asyncio.sleep(0.01)
+
+
+async def open_db(path: str) -> Database:
+    import migrations
+    db = Database(path)
+    await migrations.run(db)
+    return db
+
+
+async def job_rows(db):
+    from scheduler import JOBS_TABLE
+    return {r["ID"]: dict(r) for r in await db.fetchall(f"SELECT ID, RUN_AT, DONE, ATTEMPTS FROM {JOBS_TABLE}")}
+
+
+def test_jobs_rearmed_on_start_and_overdue_fire_immediately(db_path):
+    from scheduler import Scheduler
+
+    async def scenario():
+        db = await open_db(db_path)
+        clock = FakeClock()
+        first = Scheduler(db, clock)
+        await first.start()
+        overdue = await first.schedule("ping", START + 60, {"n": 1})
+        later = await first.schedule("ping", START + 3600, {"n": 2})
+        await first.stop()      # the bot goes down before either is due
+
+        clock.now += 600        # ...and comes back after the first was due
+        fired = []
+        second = Scheduler(db, clock)
+
+        async def handler(payload):
+            fired.append(payload["n"])
+
+        second.register("ping", handler)
+        await second.start()
+        assert second.pending() == 2
+        await until(lambda: fired == [1])
+        await until(lambda: second.pending() == 1)
+
+        await advance(second, clock, 3000)
+        await until(lambda: fired == [1, 2])
+        rows = await job_rows(db)
+        await second.stop()
+        db.close()
+        return rows[overdue]["DONE"], rows[later]["DONE"]
+
+    assert run(scenario()) == (1, 1)
+
+
+def test_cancel(db_path):
+    from scheduler import Scheduler
+
+    async def scenario():
+        db = await open_db(db_path)
+        clock = FakeClock()
+        scheduler = Scheduler(db, clock)
+        fired = []
+
+        async def handler(payload):
+            fired.append(payload["n"])
+
+        scheduler.register("ping", handler)
+        await scheduler.start()
+        kept = await scheduler.schedule("ping", START + 10, {"n": 1})
+        dropped = await scheduler.schedule("ping", START + 5, {"n": 2})
+        await scheduler.cancel(dropped)
+        assert scheduler.pending() == 1
+
+        await advance(scheduler, clock, 60)
+        await until(lambda: fired == [1])
+        await asyncio.sleep(0.05)
+        rows = await job_rows(db)
+        await scheduler.stop()
+
+        # A restart doesn't bring it back either
+        restarted = Scheduler(db, clock)
+        await restarted.start()
+        pending = restarted.pending()
+        await restarted.stop()
+        db.close()
+        return fired, rows[kept]["DONE"], rows[dropped]["DONE"], pending
+
+    assert run(scenario()) == ([1], 1, 1, 0)
+
+
+def test_many_jobs_fire_in_due_order(db_path):
+    from scheduler import Scheduler
+
+    async def scenario():
+        db = await open_db(db_path)
+        clock = FakeClock()
+        scheduler = Scheduler(db, clock)
+        fired = []
+
+        async def handler(payload):
+            fired.append(payload["n"])
+            await asyncio.sleep(0)
+
+        scheduler.register("ping", handler)
+        await scheduler.start()
+        rng = random.Random(1)
+        due = {n: START + rng.uniform(1, 1000) for n in range(300)}
+        await asyncio.gather(*(scheduler.schedule("ping", at, {"n": n}) for n, at in due.items()))
+
+        # Half-way: exactly the jobs due by then have fired, in due order
+        await advance(scheduler, clock, 500)
+        early = sorted((n for n, at in due.items() if at <= START + 500), key=due.get)
+        await until(lambda: len(fired) == len(early))
+        assert fired == early
+
+        await advance(scheduler, clock, 600)
+        await until(lambda: len(fired) == len(due))
+        await asyncio.sleep(0.05)
+        rows = await job_rows(db)
+        await scheduler.stop()
+        db.close()
+        return fired, sorted(due, key=due.get), rows
+
+    fired, expected, rows = run(scenario())
+    assert fired == expected
+    assert all(r["DONE"] for r in rows.values())
+
+
+def test_failed_job_is_retried_with_backoff(db_path):
+    from scheduler import RETRY_BASE, Scheduler
+
+    async def scenario():
+        db = await open_db(db_path)
+        clock = FakeClock()
+        scheduler = Scheduler(db, clock)
+        calls = []
+
+        async def flaky(payload):
+            calls.append(clock())
+            if len(calls) < 3:
+                raise RuntimeError("Discord is down")
+
+        scheduler.register("close", flaky)
+        await scheduler.start()
+        job = await scheduler.schedule("close", START + 10)
+        await advance(scheduler, clock, 10)
+        await until(lambda: len(calls) == 1)
+        await until(lambda: scheduler.pending() == 1)
+        after_first = (await job_rows(db))[job]
+
+        # Not before the backoff is up
+        await advance(scheduler, clock, RETRY_BASE - 1)
+        assert len(calls) == 1
+        await advance(scheduler, clock, 1)
+        await until(lambda: len(calls) == 2)
+        await until(lambda: scheduler.pending() == 1)
+        # The second retry waits twice as long
+        await advance(scheduler, clock, RETRY_BASE * 2)
+        await until(lambda: len(calls) == 3)
+        await asyncio.sleep(0.05)
+        final = (await job_rows(db))[job]
+        await scheduler.stop()
+        db.close()
+        return after_first, final, calls
+
+    after_first, final, calls = run(scenario())
+    assert (after_first["DONE"], after_first["ATTEMPTS"]) == (0, 1)
+    assert after_first["RUN_AT"] == START + 10 + RETRY_BASE
+    assert (final["DONE"], final["ATTEMPTS"]) == (1, 2)
+    assert [c - START for c in calls] == [10, 10 + RETRY_BASE, 10 + RETRY_BASE * 3]
+
+
+def test_job_is_given_up_after_max_attempts(db_path):
+    from scheduler import MAX_ATTEMPTS, RETRY_MAX, Scheduler
+
+    async def scenario():
+        db = await open_db(db_path)
+        clock = FakeClock()
+        scheduler = Scheduler(db, clock)
+        calls = []
+
+        async def broken(payload):
+            calls.append(clock())
+            raise RuntimeError("message deleted")
+
+        scheduler.register("close", broken)
+        await scheduler.start()
+        job = await scheduler.schedule("close", START + 10)
+        for n in range(1, MAX_ATTEMPTS + 3):
+            await advance(scheduler, clock, RETRY_MAX)
+            await until(lambda: len(calls) >= min(n, MAX_ATTEMPTS))
+        await asyncio.sleep(0.05)
+        row = (await job_rows(db))[job]
+        pending = scheduler.pending()
+        await scheduler.stop()
+        db.close()
+        return len(calls), row, pending
+
+    calls, row, pending = run(scenario())
+    assert calls == MAX_ATTEMPTS
+    assert (row["DONE"], row["ATTEMPTS"]) == (1, MAX_ATTEMPTS)
+    assert pending == 0
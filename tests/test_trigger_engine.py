@@ -0,0 +1,36 @@
+from trigger_engine import Trigger, TriggerEngine
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def engine_with(*patterns: str, cooldown: float = 30) -> tuple[TriggerEngine, FakeClock]:
+    clock = FakeClock()
+    engine = TriggerEngine(channel_cooldown=0, clock=clock)
+    engine.compile(Trigger(i, p, f"reply to {p}", cooldown) for i, p in enumerate(patterns, 1))
+    return engine, clock
+
+
+def test_message_whitespace_is_normalized_like_patterns():
+    engine, _ = engine_with("damn it")
+    assert [t.pattern for t in engine.matches("Damn \n  IT all")] == ["damn it"]
+    assert engine.fire("oh damn\tit", channel_id=1).pattern == "damn it"
+
+
+def test_overlapping_triggers_are_tried_when_the_first_is_cooling_down():
+    engine, clock = engine_with("damn it", "damn", "it all", "nit")
+    assert [t.pattern for t in engine.matches("damn it all")] == ["damn it", "damn", "it all"]
+
+    # Each fire uses up the trigger it returns; the rest are still found
+    fired = [engine.fire("damn it all", channel_id=1) for _ in range(4)]
+    assert [t.pattern if t else None for t in fired] == ["damn it", "damn", "it all", None]
+    assert engine.fire("damn it all", channel_id=2).pattern == "damn it"   # cooldowns are per channel
+
+    clock.now += 30
+    assert engine.fire("damn it all", channel_id=1).pattern == "damn it"
+    assert engine.fire("a unit test", channel_id=1).pattern == "nit"
@@ -0,0 +1,194 @@
+import re
+import time
+from typing import Callable, Iterable, Iterator, Optional
+
+# trigger_engine.py
+#
+# Auto-responses ("say X, the bot answers Y"). Triggers live in TRIGGER_TABLE
+# and are compiled into ONE regex shaped like a trie of every phrase, so a
+# message is scanned once in C no matter how many triggers exist (instead of
+# one `phrase in text` per trigger). Matching is case-insensitive and by
+# substring, like the original hard-coded "damn" check; messages get the same
+# normalize() as patterns, so runs of whitespace don't matter either.
+#
+# Cooldowns keep a busy channel from turning into a wall of bot replies:
+#   - per channel: at most one auto-response every CHANNEL_COOLDOWN seconds
+#   - per trigger: each trigger's own COOLDOWN, tracked per channel
+#
+# Each guild has its own triggers (GUILD_ID) and so its own TriggerEngine.
+
+TRIGGER_TABLE = "message_triggers"
+
+CHANNEL_COOLDOWN = 2.0
+DEFAULT_COOLDOWN = 30
+
+# Seeded when the table is first created, so the bot keeps its one classic response
+DEFAULT_TRIGGERS = [("damn", "Damn Daniel!", 0)]
+
+
+def ensure_schema(conn):
+    """Create the trigger table (idempotent). Seeds DEFAULT_TRIGGERS the first time."""
+    existed = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (TRIGGER_TABLE,)
+    ).fetchone()
+
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {TRIGGER_TABLE} (
+            ID       INTEGER PRIMARY KEY,
+            PATTERN  TEXT    NOT NULL UNIQUE,
+            RESPONSE TEXT    NOT NULL,
+            COOLDOWN REAL    NOT NULL DEFAULT {DEFAULT_COOLDOWN}
+        )
+    """)
+
+    if not existed:
+        conn.executemany(
+            f"INSERT INTO {TRIGGER_TABLE} (PATTERN, RESPONSE, COOLDOWN) VALUES (?, ?, ?)",
+            DEFAULT_TRIGGERS
+        )
+
+
+def partition_by_guild(conn):
+    """Add GUILD_ID, with patterns unique per guild (step 4 of migrations.py)."""
+    conn.execute(f"""
+        CREATE TABLE {TRIGGER_TABLE}_new (
+            ID       INTEGER PRIMARY KEY,
+            GUILD_ID INTEGER NOT NULL DEFAULT 0,
+            PATTERN  TEXT    NOT NULL,
+            RESPONSE TEXT    NOT NULL,
+            COOLDOWN REAL    NOT NULL DEFAULT {DEFAULT_COOLDOWN},
+            UNIQUE (GUILD_ID, PATTERN)
+        )
+    """)
+    conn.execute(
+        f"INSERT INTO {TRIGGER_TABLE}_new (ID, PATTERN, RESPONSE, COOLDOWN) "
+        f"SELECT ID, PATTERN, RESPONSE, COOLDOWN FROM {TRIGGER_TABLE}"
+    )
+    conn.execute(f"DROP TABLE {TRIGGER_TABLE}")
+    conn.execute(f"ALTER TABLE {TRIGGER_TABLE}_new RENAME TO {TRIGGER_TABLE}")
+
+
+def load(conn, guild_id: int) -> list["Trigger"]:
+    rows = conn.execute(
+        f"SELECT ID, PATTERN, RESPONSE, COOLDOWN FROM {TRIGGER_TABLE} WHERE GUILD_ID = ? ORDER BY ID", (guild_id,)
+    ).fetchall()
+    return [Trigger(*r) for r in rows]
+
+
+def guilds(conn) -> list[int]:
+    """Every guild with at least one trigger."""
+    return [r[0] for r in conn.execute(f"SELECT DISTINCT GUILD_ID FROM {TRIGGER_TABLE}")]
+
+
+def normalize(pattern: str) -> str:
+    return " ".join(pattern.casefold().split())
+
+
+class Trigger:
+    __slots__ = ("id", "pattern", "response", "cooldown")
+
+    def __init__(self, id: int, pattern: str, response: str, cooldown: float):
+        self.id = id
+        self.pattern = normalize(pattern)
+        self.response = response
+        self.cooldown = cooldown
+
+
+def _trie_regex(patterns: Iterable[str]) -> str:
+    """
+    One alternation shaped like a trie of the patterns, e.g. {"cat", "car", "cart"}
+    -> "ca(?:t|r(?:t)?)". Shared prefixes are tested once, and at any position
+    the longest phrase wins.
+    """
+    trie: dict = {}
+    for p in patterns:
+        node = trie
+        for ch in p:
+            node = node.setdefault(ch, {})
+        node[""] = True  # end of a phrase
+
+    def emit(node: dict) -> str:
+        terminal = "" in node
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            return f"(?:{body})?"
+        return body
+
+    return emit(trie)
+
+
+class TriggerEngine:
+    """Compiled trigger set + cooldown bookkeeping. compile() swaps in a new set atomically."""
+
+    def __init__(self, channel_cooldown: float = CHANNEL_COOLDOWN, clock: Callable[[], float] = time.monotonic):
+        self.channel_cooldown = channel_cooldown
+        self.clock = clock
+        # (regex or None, pattern -> Trigger)
+        self._compiled: tuple[Optional[re.Pattern], dict[str, Trigger]] = (None, {})
+        self._channel_last: dict[int, float] = {}
+        self._trigger_last: dict[tuple[int, int], float] = {}
+
+    def __len__(self):
+        return len(self._compiled[1])
+
+    def compile(self, triggers: Iterable[Trigger]):
+        """Build the combined regex. Safe to run in a worker thread; readers see old or new, never half."""
+        by_pattern = {t.pattern: t for t in triggers if t.pattern}
+        regex = re.compile(_trie_regex(by_pattern)) if by_pattern else None
+        ids = {t.id for t in by_pattern.values()}
+        self._compiled = (regex, by_pattern)
+        # Forget cooldowns of triggers that no longer exist
+        self._trigger_last = {k: v for k, v in self._trigger_last.items() if k[0] in ids}
+
+    @staticmethod
+    def _scan(regex: re.Pattern, by_pattern: dict[str, Trigger], text: str) -> Iterator[Trigger]:
+        """
+        Every trigger in text, in order of where it starts; longest first where
+        several start at the same place. Lazy: the caller stops at the first it
+        can use. Resumes one character after each match, so overlapping triggers
+        are all seen (finditer would skip those inside a match).
+        """
+        text = normalize(text)
+        m = regex.search(text)
+        while m is not None:
+            # Every phrase matching here is a prefix of the longest one
+            found = m.group()
+            for end in range(len(found), 0, -1):
+                t = by_pattern.get(found[:end])
+                if t is not None:
+                    yield t
+            m = regex.search(text, m.start() + 1)
+
+    def matches(self, text: str) -> list[Trigger]:
+        """Distinct triggers found in text, in order of appearance (no cooldowns applied)."""
+        regex, by_pattern = self._compiled
+        if regex is None:
+            return []
+        found: dict[int, Trigger] = {}
+        for t in self._scan(regex, by_pattern, text):
+            found.setdefault(t.id, t)
+        return list(found.values())
+
+    def fire(self, text: str, channel_id: int) -> Optional[Trigger]:
+        """
+        The first trigger in text that is off cooldown for this channel, or None.
+        Starts the channel and trigger cooldowns when one fires.
+        """
+        regex, by_pattern = self._compiled
+        if regex is None:
+            return None
+        now = self.clock()
+        if now - self._channel_last.get(channel_id, float("-inf")) < self.channel_cooldown:
+            return None  # channel is cooling down; skip the scan entirely
+
+        for t in self._scan(regex, by_pattern, text):
+            key = (t.id, channel_id)
+            if now - self._trigger_last.get(key, float("-inf")) < t.cooldown:
+                continue
+            self._trigger_last[key] = now
+            self._channel_last[channel_id] = now
+            return t
+        return None
@@ -0,0 +1,152 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Optional
+from config import logging
+
+# watchdog.py
+#
+# Event-loop health. Two cheap pieces:
+#
+#   - A lag sampler task: wakes every INTERVAL seconds and records how late it
+#     woke up. Anything beyond a few ms means some callback held the loop.
+#   - A stall detector thread: every CHECK_INTERVAL it posts a no-op onto the
+#     loop and waits. If the loop hasn't run it within STALL_THRESHOLD, the loop
+#     is stuck *right now*, so the thread grabs the loop thread's stack and the
+#     command (or task) that is running, logs it and keeps it for !perf.
+#
+# Commands are attributed via command_started()/command_finished(), called from
+# the bot's before/after invoke hooks. Nothing is captured unless a stall
+# happens, so this stays on in production. asyncio's own debug mode (which also
+# reports slow callbacks, but slows every coroutine) is opt-in via ASYNCIO_DEBUG.
+
+INTERVAL = 0.5
+CHECK_INTERVAL = 0.1
+STALL_THRESHOLD = 0.25
+STALL_HISTORY = 20
+STACK_DEPTH = 12
+ASYNCIO_DEBUG = False
+
+
+class Stall:
+    __slots__ = ("at", "duration", "command", "task", "stack")
+
+    def __init__(self, at: float, command: Optional[str], task: Optional[str], stack: str):
+        self.at = at                # wall-clock time the stall was detected
+        self.duration = None        # seconds, filled in once the loop runs again
+        self.command = command      # "cog.command" running when it stalled, if any
+        self.task = task            # asyncio task name otherwise
+        self.stack = stack
+
+    @property
+    def culprit(self) -> str:
+        return self.command or self.task or "unknown"
+
+
+class LoopWatchdog:
+    """Loop lag sampler + stall detector. start() inside the loop, stop() on shutdown."""
+
+    def __init__(self, interval: float = INTERVAL, stall_threshold: float = STALL_THRESHOLD,
+                 check_interval: float = CHECK_INTERVAL):
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.check_interval = check_interval
+        self.last_lag = 0.0     # seconds late on the most recent wake-up
+        self.max_lag = 0.0      # worst since start
+        self.samples = 0
+        self.stalls: deque[Stall] = deque(maxlen=STALL_HISTORY)
+        self.stall_count = 0
+        # Task -> "cog.command" for commands currently running
+        self._running: dict[asyncio.Task, str] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        if ASYNCIO_DEBUG:
+            self._loop.set_debug(True)
+            self._loop.slow_callback_duration = self.stall_threshold
+        self._task = self._loop.create_task(self._run(), name="loop-watchdog")
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._detect, name="loop-stall-detector", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    # ----------------
+    # Command attribution (called from the bot's invoke hooks)
+    # ----------------
+
+    def command_started(self, ctx):
+        task = asyncio.current_task()
+        if task is not None:
+            cog = ctx.cog.qualified_name if ctx.cog else "-"
+            self._running[task] = f"{cog}.{ctx.command.qualified_name}"
+
+    def command_finished(self, ctx):
+        task = asyncio.current_task()
+        if task is not None:
+            self._running.pop(task, None)
+
+    # ----------------
+    # Lag sampler (on the loop)
+    # ----------------
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(time.perf_counter() - start - self.interval, 0.0)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            self.samples += 1
+
+    # ----------------
+    # Stall detector (own thread)
+    # ----------------
+
+    def _detect(self):
+        while not self._stopping.wait(self.check_interval):
+            ran = threading.Event()
+            posted = time.perf_counter()
+            try:
+                self._loop.call_soon_threadsafe(ran.set)
+            except RuntimeError:
+                return  # loop closed
+            if ran.wait(self.stall_threshold):
+                continue
+
+            stall = self._capture()
+            self.stalls.append(stall)
+            self.stall_count += 1
+            logging.warning(
+                "Event loop stalled >%.0f ms in %s\n%s",
+                self.stall_threshold * 1000, stall.culprit, stall.stack
+            )
+            # Wait for the loop to come back so we know how long it was out
+            while not ran.wait(1.0):
+                if self._stopping.is_set():
+                    return
+            stall.duration = time.perf_counter() - posted
+            logging.warning("Event loop stall in %s lasted %.0f ms", stall.culprit, stall.duration * 1000)
+
+    def _capture(self) -> Stall:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame, limit=STACK_DEPTH)) if frame is not None else ""
+        # Reading the loop's current task from another thread is a plain dict lookup
+        task = asyncio.current_task(self._loop)
+        command = self._running.get(task) if task is not None else None
+        return Stall(time.time(), command, task.get_name() if task is not None else None, stack)
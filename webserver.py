@@ -1,14 +1,114 @@
-from flask import Flask
-from threading import Thread
+import asyncio
+import math
+import time
+from aiohttp import web
+import discord
+from discord.ext import commands
+from config import WEBSERVER_PORT, DOWNTIME_POLL_TABLE, logging
+from metrics import CONTENT_TYPE
 
-app = Flask('')
-@app.route('/')
-def home():
-    return "Hello. I am alive!"
+# webserver.py
+#
+# Keep-alive + health endpoints, served by aiohttp on the bot's own event loop
+# (no extra thread or web framework; aiohttp already ships with discord.py).
+#
+#   /         plain "I am alive"
+#   /healthz  JSON snapshot: gateway latency, last heartbeat ACK (per shard when
+#             sharded), loop lag, DB, open polls
+#   /readyz   200 when connected to the gateway, 503 otherwise
+#   /metrics  Prometheus command metrics (metrics.py)
 
-def run():
-    app.run(host='0.0.0.0', port=8080)
+# How long /healthz waits on SQLite before calling the DB unhealthy
+DB_PING_TIMEOUT = 2.0
 
-def keep_alive():
-    t = Thread(target=run)
-    t.start()
\ No newline at end of file
+
+def _websockets(bot: commands.Bot) -> dict:
+    """shard id -> its gateway websocket; {None: bot.ws} for an unsharded bot."""
+    if isinstance(bot, discord.AutoShardedClient):
+        # ShardInfo has no public accessor for its websocket either
+        return {sid: getattr(getattr(info, "_parent", None), "ws", None) for sid, info in bot.shards.items()}
+    return {None: bot.ws}
+
+
+def _heartbeat_age(ws):
+    """Seconds since the gateway last ACKed a heartbeat (None before the first one)."""
+    # discord.py has no public accessor for this; read it defensively
+    keep_alive = getattr(ws, "_keep_alive", None)
+    last_ack = getattr(keep_alive, "_last_ack", None)
+    return None if last_ack is None else round(time.perf_counter() - last_ack, 3)
+
+
+def _gateway_up(bot: commands.Bot) -> bool:
+    sockets = _websockets(bot)
+    return (bot.is_ready() and not bot.is_closed() and bool(sockets)
+            and all(ws is not None for ws in sockets.values()) and math.isfinite(bot.latency))
+
+
+async def _db_status(bot: commands.Bot) -> dict:
+    start = time.perf_counter()
+    try:
+        row = await asyncio.wait_for(
+            bot.db.fetchone(f"SELECT COUNT(*) FROM {DOWNTIME_POLL_TABLE} WHERE CLOSED = 0"),
+            DB_PING_TIMEOUT
+        )
+    except Exception as e:
+        return {"ok": False, "error": type(e).__name__, "open_polls": None}
+    return {"ok": True, "ping_ms": round((time.perf_counter() - start) * 1000, 2), "open_polls": row[0]}
+
+
+def create_app(bot: commands.Bot) -> web.Application:
+    async def home(request):
+        return web.Response(text="Hello. I am alive!")
+
+    async def healthz(request):
+        db = await _db_status(bot)
+        gateway = _gateway_up(bot)
+        sockets = _websockets(bot)
+        body = {
+            "ok": gateway and db["ok"],
+            "gateway": {
+                "connected": gateway,
+                "latency_ms": round(bot.latency * 1000, 1) if math.isfinite(bot.latency) else None,
+                "last_heartbeat_ack_s": max((a for a in map(_heartbeat_age, sockets.values()) if a is not None),
+                                            default=None),
+            },
+            "loop_lag_ms": {
+                "last": round(bot.watchdog.last_lag * 1000, 2),
+                "max": round(bot.watchdog.max_lag * 1000, 2),
+            },
+            "db": db,
+            "open_polls": db.pop("open_polls"),
+        }
+        if None not in sockets:
+            body["gateway"]["shards"] = {
+                sid: {
+                    "latency_ms": round(ws.latency * 1000, 1) if ws is not None and math.isfinite(ws.latency) else None,
+                    "last_heartbeat_ack_s": _heartbeat_age(ws),
+                }
+                for sid, ws in sockets.items()
+            }
+        return web.json_response(body, status=200 if body["ok"] else 503)
+
+    async def readyz(request):
+        if _gateway_up(bot):
+            return web.Response(text="ready")
+        return web.Response(text="gateway disconnected", status=503)
+
+    async def metrics(request):
+        return web.Response(body=bot.metrics.render().encode(), headers={"Content-Type": CONTENT_TYPE})
+
+    app = web.Application()
+    app.router.add_get("/", home)
+    app.router.add_get("/healthz", healthz)
+    app.router.add_get("/readyz", readyz)
+    app.router.add_get("/metrics", metrics)
+    return app
+
+
+async def start(bot: commands.Bot, port: int = WEBSERVER_PORT) -> web.AppRunner:
+    """Serve create_app(bot) on the running loop. Call runner.cleanup() to stop."""
+    runner = web.AppRunner(create_app(bot), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "0.0.0.0", port).start()
+    logging.info("Web server listening on :%d", port)
+    return runner